@@ -1,84 +1,225 @@
+import os
+import threading
+from datetime import datetime, timedelta
+
 import dash
-from dash import dcc, html
+from dash import dcc, html, Input, Output
 import plotly.express as px
 import requests
 import pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+API_URL = os.getenv("DASHBOARD_API_URL", "http://localhost:8000")
+REFRESH_SECONDS = int(os.getenv("DASHBOARD_REFRESH_SECONDS", "30"))
 
 app = dash.Dash(__name__)
 
-def fetch_shipments():
-    url = "http://localhost:8000/shipments/"
-    try:
-        response = requests.get(url)
+
+class ApiClient:
+    """
+    Pooled, authenticated client for the Digital Aid API
+
+    One keep-alive session with timeouts and retries on connection errors.
+    Authenticates with DASHBOARD_API_TOKEN, or logs in with
+    DASHBOARD_USERNAME / DASHBOARD_PASSWORD and logs in again once when
+    the token expires.
+    """
+
+    def __init__(self, base_url=API_URL, timeout=(3.05, 15), page_size=1000):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.page_size = page_size
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4, pool_maxsize=4,
+            max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504], allowed_methods=["GET"])
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        token = os.getenv("DASHBOARD_API_TOKEN")
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+
+    def login(self):
+        username, password = os.getenv("DASHBOARD_USERNAME"), os.getenv("DASHBOARD_PASSWORD")
+        if not username or not password:
+            return False
+        response = self.session.post(
+            f"{self.base_url}/auth/login", json={"username": username, "password": password}, timeout=self.timeout
+        )
+        response.raise_for_status()
+        self.session.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+        return True
+
+    def get(self, path, params=None):
+        if "Authorization" not in self.session.headers:
+            self.login()
+        response = self.session.get(f"{self.base_url}{path}", params=params, timeout=self.timeout)
+        if response.status_code in (401, 403) and self.login():
+            response = self.session.get(f"{self.base_url}{path}", params=params, timeout=self.timeout)
         response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        print(f"Error fetching shipments: {e}")
-        return []
-
-# Fetch shipment data
-shipments = fetch_shipments()
-df_shipments = pd.DataFrame(shipments)
-
-# Ensure latitude and longitude columns exist and fill missing values
-if 'latitude' not in df_shipments.columns:
-    df_shipments['latitude'] = -1.9441  # Kigali latitude
-else:
-    df_shipments['latitude'] = df_shipments['latitude'].fillna(-1.9441)
-
-if 'longitude' not in df_shipments.columns:
-    df_shipments['longitude'] = 30.0619  # Kigali longitude
-else:
-    df_shipments['longitude'] = df_shipments['longitude'].fillna(30.0619)
-
-# KPI calculations
-total_shipments = len(df_shipments)
-delivered_shipments = df_shipments[df_shipments.get('status', '') == 'delivered'].shape[0] if 'status' in df_shipments.columns else 0
-dispatched_shipments = df_shipments[df_shipments.get('status', '') == 'dispatched'].shape[0] if 'status' in df_shipments.columns else 0
-delayed_shipments = df_shipments[df_shipments.get('status', '') == 'delayed'].shape[0] if 'status' in df_shipments.columns else 0
-
-# Map figure (using scatter_map)
-fig = px.scatter_map(
-    df_shipments,
-    lat="latitude",
-    lon="longitude",
-    hover_name="id" if "id" in df_shipments.columns else None,
-    hover_data=["status"] if "status" in df_shipments.columns else None,
-    zoom=6,
-    title="Shipment Locations"
-)
-
-# Trend chart: Daily shipments over time (if 'created_at' exists)
-trend_fig = None
-if 'created_at' in df_shipments.columns:
-    df_shipments['created_at'] = pd.to_datetime(df_shipments['created_at'])
-    daily_counts = df_shipments.groupby(df_shipments['created_at'].dt.date).size().reset_index(name='shipments')
-    trend_fig = px.line(daily_counts, x='created_at', y='shipments', title='Daily Shipments Over Time')
+        return response
+
+    def iter_shipments(self, since=None):
+        """
+        All shipments (or those changed since a time), page by page via X-Next-Cursor
+        """
+        params = {"limit": self.page_size}
+        if since is not None:
+            params["since"] = since.isoformat()
+        while True:
+            response = self.get("/shipments/", params)
+            yield from response.json()
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+            params["after_id"] = cursor
+
+    def map_clusters(self, zoom=6):
+        return self.get("/shipments/map-clusters", {"zoom": zoom}).json()
+
+
+class ShipmentSnapshot:
+    """
+    Shared shipment snapshot, refreshed in the background
+
+    The first refresh loads every shipment; later ones only ask for
+    shipments changed since the last watermark (minus a small overlap for
+    clock skew) and merge them in. Every full_sync_every refreshes a full
+    reload drops deleted shipments. Figures and KPIs are rebuilt by the
+    refresh thread, so callbacks only read the current snapshot and page
+    loads never wait on the API.
+    """
+
+    def __init__(self, client, refresh_seconds=REFRESH_SECONDS, full_sync_every=20, overlap=timedelta(minutes=1)):
+        self.client = client
+        self.refresh_seconds = refresh_seconds
+        self.full_sync_every = full_sync_every
+        self.overlap = overlap
+        self.shipments = {}
+        self.watermark = None
+        self.refreshes = 0
+        self.view = None
+        self.error = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def refresh(self):
+        started = datetime.utcnow()
+        full = self.watermark is None or self.refreshes % self.full_sync_every == 0
+        since = None if full else self.watermark - self.overlap
+        changed = {shipment["id"]: shipment for shipment in self.client.iter_shipments(since)}
+        shipments = changed if full else {**self.shipments, **changed}
+        clusters = self.client.map_clusters()
+
+        self.view = build_view(shipments, clusters)
+        self.shipments = shipments
+        self.watermark = started
+        self.refreshes += 1
+        self.error = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="dashboard-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error refreshing dashboard data: {e}")
+                self.error = str(e)
+            self._stop.wait(self.refresh_seconds)
+
+
+def build_view(shipments, clusters):
+    """
+    KPIs and figures for one snapshot
+    """
+    df_shipments = pd.DataFrame(list(shipments.values()), columns=["id", "status", "timestamp"])
+    statuses = df_shipments["status"].fillna("").str.lower()
+
+    df_clusters = pd.DataFrame(clusters, columns=["latitude", "longitude", "count", "statuses", "id"])
+    df_clusters["status"] = df_clusters["statuses"].map(lambda counts: max(counts, key=counts.get) if counts else None)
+    # Map figure: server-side clusters instead of one marker per shipment
+    map_fig = px.scatter_map(
+        df_clusters,
+        lat="latitude",
+        lon="longitude",
+        size="count",
+        color="status",
+        hover_data=["count", "statuses"],
+        zoom=6,
+        title="Shipment Locations"
+    )
+
+    # Trend chart: Daily shipments over time
+    trend_fig = None
+    created = pd.to_datetime(df_shipments["timestamp"]).dropna()
+    if not created.empty:
+        daily_counts = created.groupby(created.dt.date).size().reset_index(name="shipments")
+        daily_counts.columns = ["created_at", "shipments"]
+        trend_fig = px.line(daily_counts, x="created_at", y="shipments", title="Daily Shipments Over Time")
+
+    return {
+        "total_shipments": len(df_shipments),
+        "delivered_shipments": int((statuses == "delivered").sum()),
+        "dispatched_shipments": int((statuses == "dispatched").sum()),
+        "delayed_shipments": int((statuses == "delayed").sum()),
+        "map_fig": map_fig,
+        "trend_fig": trend_fig,
+    }
+
+
+snapshot = ShipmentSnapshot(ApiClient())
+
+KPI_STYLE = {"padding": "10px", "border": "1px solid #ccc", "borderRadius": "5px", "width": "20%", "display": "inline-block", "marginRight": "2%"}
 
 app.layout = html.Div([
     html.H1("Digital Aid Tracker - Shipment Dashboard"),
-    html.Div([
-        html.Div([
-            html.H3("Total Shipments"),
-            html.P(f"{total_shipments}")
-        ], style={"padding": "10px", "border": "1px solid #ccc", "borderRadius": "5px", "width": "20%", "display": "inline-block", "marginRight": "2%"}),
-        html.Div([
-            html.H3("Delivered"),
-            html.P(f"{delivered_shipments}")
-        ], style={"padding": "10px", "border": "1px solid #ccc", "borderRadius": "5px", "width": "20%", "display": "inline-block", "marginRight": "2%"}),
-        html.Div([
-            html.H3("Dispatched"),
-            html.P(f"{dispatched_shipments}")
-        ], style={"padding": "10px", "border": "1px solid #ccc", "borderRadius": "5px", "width": "20%", "display": "inline-block", "marginRight": "2%"}),
-        html.Div([
-            html.H3("Delayed"),
-            html.P(f"{delayed_shipments}")
-        ], style={"padding": "10px", "border": "1px solid #ccc", "borderRadius": "5px", "width": "20%", "display": "inline-block"}),
-    ], style={"display": "flex", "justifyContent": "space-between", "marginBottom": "30px"}),
-    dcc.Graph(figure=fig),
-    html.Br(),
-    dcc.Graph(figure=trend_fig) if trend_fig else html.Div("No trend data available."),
+    dcc.Interval(id="refresh-interval", interval=REFRESH_SECONDS * 1000, n_intervals=0),
+    html.Div(id="dashboard-content", children=html.Div("Loading shipment data...")),
 ])
 
+
+@app.callback(Output("dashboard-content", "children"), [Input("refresh-interval", "n_intervals")])
+def update_dashboard(n):
+    view = snapshot.view
+    if view is None:
+        return html.Div(f"Could not load shipment data: {snapshot.error}" if snapshot.error else "Loading shipment data...")
+    return html.Div([
+        html.Div([
+            html.Div([
+                html.H3("Total Shipments"),
+                html.P(f"{view['total_shipments']}")
+            ], style=KPI_STYLE),
+            html.Div([
+                html.H3("Delivered"),
+                html.P(f"{view['delivered_shipments']}")
+            ], style=KPI_STYLE),
+            html.Div([
+                html.H3("Dispatched"),
+                html.P(f"{view['dispatched_shipments']}")
+            ], style=KPI_STYLE),
+            html.Div([
+                html.H3("Delayed"),
+                html.P(f"{view['delayed_shipments']}")
+            ], style={**KPI_STYLE, "marginRight": 0}),
+        ], style={"display": "flex", "justifyContent": "space-between", "marginBottom": "30px"}),
+        dcc.Graph(figure=view["map_fig"]),
+        html.Br(),
+        dcc.Graph(figure=view["trend_fig"]) if view["trend_fig"] else html.Div("No trend data available."),
+    ])
+
+
+# Refresh in the background; the page is served immediately
+snapshot.start()
+
 if __name__ == "__main__":
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True)
@@ -17,6 +17,12 @@ import qrcode
 from PIL import Image
 import hashlib
 
+from app.db_config import get_db
+from app.models.food_aid import Shipment
+from app.services.status_history_service import status_history_service
+from app.services.alert_engine import alert_engine
+from app.services.tracking_counters import tracking_counters
+
 app = FastAPI(title="Digital Tracking Solution for Health Service Transparency")
 
 # ============================================================================
@@ -283,24 +289,24 @@ async def update_shipment_status(
         shipment.current_location = status_update.location
         shipment.updated_at = status_update.timestamp
         
-        # Create status history entry
-        status_history = {
-            "id": str(uuid.uuid4()),
-            "shipment_id": shipment_id,
-            "old_status": old_status,
-            "new_status": status_update.new_status,
-            "location": status_update.location,
-            "updated_by": status_update.updated_by,
-            "notes": status_update.notes,
-            "timestamp": status_update.timestamp
-        }
+        # Append status history in the same transaction as the status change
+        status_history_service.record_status_change(
+            db,
+            shipment,
+            old_status=old_status,
+            new_status=status_update.new_status,
+            location=status_update.location,
+            changed_by=status_update.updated_by,
+            notes=status_update.notes,
+            changed_at=status_update.timestamp
+        )
+        db.commit()
+        tracking_counters.on_status_changed(old_status, status_update.new_status)
+        alert_engine.on_status_change(db, shipment)
         
         # Broadcast real-time event
         background_tasks.add_task(broadcast_status_update, shipment_id, status_update)
         
-        # In real implementation, save to database
-        # db.commit()
-        
         return {
             "message": "Status updated successfully",
             "shipment_id": shipment_id,
@@ -313,39 +319,38 @@ async def update_shipment_status(
         raise HTTPException(status_code=500, detail=f"Status update failed: {str(e)}")
 
 @app.get("/shipments/{shipment_id}/status-history")
-async def get_status_history(shipment_id: str, db: Session = Depends(get_db)):
+async def get_status_history(shipment_id: str, since: Optional[datetime] = None, db: Session = Depends(get_db)):
     """
     Get complete status history for a shipment
     """
-    # Mock response - replace with actual database query
+    history = status_history_service.get_timeline(db, shipment_id, since=since)
     return [
         {
-            "id": "hist-1",
-            "shipment_id": shipment_id,
-            "status": "Created",
-            "location": "Central Warehouse",
-            "updated_by": "System",
-            "timestamp": datetime.now() - timedelta(days=2),
-            "notes": "Shipment created and items allocated"
-        },
-        {
-            "id": "hist-2",
-            "shipment_id": shipment_id,
-            "status": "In Transit",
-            "location": "Central Warehouse",
-            "updated_by": "Officer-001",
-            "timestamp": datetime.now() - timedelta(hours=6),
-            "notes": "Items loaded and departed"
-        },
+            "id": entry.id,
+            "shipment_id": entry.shipment_id,
+            "status": entry.new_status,
+            "previous_status": entry.old_status,
+            "location": entry.location,
+            "updated_by": entry.changed_by,
+            "timestamp": entry.changed_at,
+            "notes": entry.notes,
+            "previous_status_seconds": entry.old_status_seconds
+        }
+        for entry in history
+    ]
+
+@app.get("/shipments/{shipment_id}/dwell-times")
+async def get_dwell_times(shipment_id: str, db: Session = Depends(get_db)):
+    """
+    Get the time a shipment spent in each status
+    """
+    return [
         {
-            "id": "hist-3",
-            "shipment_id": shipment_id,
-            "status": "At Distribution Center",
-            "location": "Nyagatare DC",
-            "updated_by": "Officer-002",
-            "timestamp": datetime.now() - timedelta(minutes=30),
-            "notes": "Arrived at distribution center"
+            "status": dwell.status,
+            "total_seconds": dwell.total_seconds,
+            "visits": dwell.visits
         }
+        for dwell in status_history_service.get_dwell_times(db, shipment_id)
     ]
 
 # ============================================================================
@@ -390,30 +395,22 @@ async def get_real_time_events(shipment_id: str, since: Optional[datetime] = Non
     return {"events": events}
 
 @app.get("/alerts/active")
-async def get_active_alerts():
+async def get_active_alerts(severity: Optional[str] = None, limit: int = 100, db: Session = Depends(get_db)):
     """
     Get active alerts for the dashboard
     """
     return {
         "alerts": [
             {
-                "id": "alert-1",
-                "type": "delay",
-                "severity": "warning",
-                "shipment_id": "SHP-1001",
-                "message": "Shipment delayed by 2 hours",
-                "created_at": datetime.now() - timedelta(hours=1),
-                "resolved": False
-            },
-            {
-                "id": "alert-2",
-                "type": "anomaly",
-                "severity": "danger",
-                "shipment_id": "SHP-1003",
-                "message": "Unusual route deviation detected",
-                "created_at": datetime.now() - timedelta(minutes=30),
-                "resolved": False
+                "id": alert.id,
+                "type": alert.alert_type,
+                "severity": alert.severity,
+                "shipment_id": alert.shipment_id,
+                "message": alert.description,
+                "created_at": alert.created_at,
+                "resolved": alert.resolved
             }
+            for alert in alert_engine.get_active_alerts(db, severity=severity, limit=limit)
         ]
     }
 
@@ -478,17 +475,15 @@ async def get_tracking_summary():
     """
     Get summary data for dashboard KPIs
     """
-    return {
-        "total_shipments": 156,
-        "in_transit": 23,
-        "delivered": 98,
-        "delayed": 8,
-        "at_warehouses": 15,
-        "at_distribution_centers": 12,
-        "average_transit_time_hours": 36.5,
-        "on_time_delivery_rate": 87.3,
-        "last_updated": datetime.now()
-    }
+    return tracking_counters.summary()
+
+@app.on_event("startup")
+def start_tracking_counters():
+    tracking_counters.start()
+
+@app.on_event("shutdown")
+def stop_tracking_counters():
+    tracking_counters.stop()
 
 if __name__ == "__main__":
     import uvicorn
@@ -59,8 +59,16 @@ def create_food_aid_items():
         cursor.close()
         conn.close()
 
-def get_or_create_food_item_id(item_type):
+def load_food_item_ids(cursor):
+    """Map of food item name to ID, loaded once per import"""
+    cursor.execute("SELECT id, name FROM food_aid_items")
+    return {name: item_id for item_id, name in cursor.fetchall()}
+
+def get_or_create_food_item_id(item_type, cache=None):
     """Get food item ID, create if doesn't exist"""
+    if cache is not None and item_type in cache:
+        return cache[item_type]
+
     conn = get_db_connection()
     cursor = conn.cursor()
     
@@ -70,7 +78,7 @@ def get_or_create_food_item_id(item_type):
         result = cursor.fetchone()
         
         if result:
-            return result[0]
+            item_id = result[0]
         else:
             # Create new item with only name
             cursor.execute(
@@ -78,7 +86,10 @@ def get_or_create_food_item_id(item_type):
                 (item_type,)
             )
             conn.commit()
-            return cursor.lastrowid
+            item_id = cursor.lastrowid
+        if cache is not None:
+            cache[item_type] = item_id
+        return item_id
             
     except Exception as e:
         print(f"Error getting/creating food item: {e}")
@@ -124,6 +135,9 @@ def import_bulk_data(csv_file_path):
     cursor = conn.cursor()
     
     try:
+        # Item IDs are looked up once, not with a query (and connection) per row
+        food_item_ids = load_food_item_ids(cursor)
+
         # Process each row
         for index, row in df.iterrows():
             print(f"Processing row {index + 1} of {len(df)}")
@@ -138,7 +152,7 @@ def import_bulk_data(csv_file_path):
                         print(f"  {col}: {val}")
             
             # Get or create food aid item ID
-            aid_item_id = get_or_create_food_item_id(str(row['item_type']))
+            aid_item_id = get_or_create_food_item_id(str(row['item_type']), food_item_ids)
             
             # 1. Insert into shipments table
             shipment_query = """
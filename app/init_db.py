@@ -3,14 +3,15 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from sqlalchemy.orm import Session
-from app.db_config import Base, engine, get_db
+from app.db_config import engine, get_db
+from app.migrate import upgrade
 from app.models.user import User, UserRole
 from app.utils.security import hash_password
 
 def init_database():
     """Initialize the database with required data including a system user for audit trails"""
-    # Create all tables
-    Base.metadata.create_all(bind=engine)
+    # Create missing tables, columns and indexes
+    upgrade(engine)
     
     # Get database session
     db_gen = get_db()
@@ -1,17 +1,36 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.db_config import Base, engine
+from app.db_config import engine
+from app.utils.metrics import MetricsMiddleware, instrument_engine
+from app.utils.query_profiler import PROFILE_QUERIES, QueryProfilerMiddleware
+from app.utils.fast_json import FastJSONResponse
+from app.utils.compression import CompressionMiddleware
 from app.routes import beneficiary_routes
 from app.routes import total_shipments
+from app.routes import alert_routes
+from app.routes import notification_routes
+from app.routes import ussd_routes
+from app.routes import metrics_routes
+from app.services.alert_engine import alert_engine
+from app.services.tracking_counters import tracking_counters
+from app.services.beneficiary_index import beneficiary_index
+from app.services.sms_dispatch import sms_dispatcher
+from app.services.sms_ingest import inbound_sms_worker
+from app.services.feedback_analytics import feedback_analytics
+from app.services.geo_clustering import geo_clusters
 from app.routes import (
     auth_routes,
     warehouse_routes,
     shipment_routes,
     feedback_routes,
     distribution_center_routes,
-    food_aid_item_routes
+    food_aid_item_routes,
+    dashboard_routes
+)
+app = FastAPI(
+    title="Digital Tracking Solution for Health Service Transparency",
+    default_response_class=FastJSONResponse
 )
-app = FastAPI(title="Digital Tracking Solution for Health Service Transparency")
 
 # CORS
 frontend_origins = [
@@ -26,8 +45,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+# brotli/gzip by Accept-Encoding; streamed NDJSON is compressed chunk by chunk
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+# QUERY_PROFILE=1: report N+1 patterns and slow statements (with plans) per request
+if PROFILE_QUERIES:
+    app.add_middleware(QueryProfilerMiddleware)
+
+# Outermost: per-route latency/size histograms, query counts and Server-Timing;
+# scraped from /metrics
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine)
+
+# The schema is managed by the migration step (python -m app.migrate), not at import
 
 # Include routers
 app.include_router(auth_routes.router, prefix="/auth")  # Keep /auth prefix here
@@ -38,6 +68,33 @@ app.include_router(distribution_center_routes.router, prefix="/distribution_cent
 app.include_router(food_aid_item_routes.router, prefix="/food_aid_items", tags=["Food Aid Items"])
 app.include_router(beneficiary_routes.router, prefix="/beneficiaries")
 app.include_router(total_shipments.router)
-print("Registered routes:")
-for route in app.routes:
-    print(route.path, "-", route.name)
+app.include_router(alert_routes.router, prefix="/alerts", tags=["Alerts"])
+app.include_router(notification_routes.router, prefix="/notifications", tags=["Notifications"])
+app.include_router(ussd_routes.router, prefix="/ussd", tags=["USSD"])
+app.include_router(dashboard_routes.router, prefix="/dashboard", tags=["Dashboard"])
+app.include_router(metrics_routes.router)
+
+# Background services: alert timers ("no scan in N hours" and similar rules),
+# the in-memory counters behind /shipments/tracking-summary, the
+# beneficiary verification index, the outbound SMS dispatcher, the
+# inbound SMS ingest worker, the feedback classifier behind
+# /feedbacks/summary and the shipment positions behind /shipments/map-clusters
+@app.on_event("startup")
+def start_background_services():
+    alert_engine.start()
+    tracking_counters.start()
+    beneficiary_index.start()
+    sms_dispatcher.start()
+    inbound_sms_worker.start()
+    feedback_analytics.start()
+    geo_clusters.start()
+
+@app.on_event("shutdown")
+def stop_background_services():
+    alert_engine.stop()
+    tracking_counters.stop()
+    beneficiary_index.stop()
+    sms_dispatcher.stop()
+    inbound_sms_worker.stop()
+    feedback_analytics.stop()
+    geo_clusters.stop()
@@ -0,0 +1,83 @@
+"""
+Schema migration step, run once per deploy before starting the API workers:
+
+    python -m app.migrate            # apply
+    python -m app.migrate --dry-run  # list pending changes only
+
+Creates missing tables, adds missing nullable columns and creates missing
+indexes on existing tables, so a database restored from an older dump
+catches up with the models. The API itself no longer touches the schema at
+startup. Destructive or NOT NULL changes are reported, never applied.
+"""
+import argparse
+import importlib
+from typing import Callable, List, Tuple
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateColumn
+from app.db_config import Base, engine
+
+# Every module defining tables on Base
+MODEL_MODULES = [
+    "food_aid", "issue", "beneficiary", "duplicate_candidate", "user", "alert", "audit_trail",
+    "fraud_detection", "ml_feature", "geographic_health", "status_history", "feedback_summary",
+    "inbound_message", "outbound_message",
+]
+
+
+def load_models():
+    for name in MODEL_MODULES:
+        importlib.import_module(f"app.models.{name}")
+
+
+def pending_changes(bind) -> List[Tuple[str, Callable]]:
+    """
+    (description, apply(connection)) for every difference between the models and the database
+    """
+    load_models()
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    changes = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            changes.append((f"create table {table.name}", lambda conn, table=table: table.create(conn)))
+            continue
+
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in columns:
+                continue
+            if not column.nullable and column.server_default is None:
+                print(f"Skipping {table.name}.{column.name}: NOT NULL without a server default, migrate it by hand")
+                continue
+            ddl = f"ALTER TABLE {table.name} ADD COLUMN {CreateColumn(column).compile(dialect=bind.dialect)}"
+            changes.append((f"add column {table.name}.{column.name}", lambda conn, ddl=ddl: conn.exec_driver_sql(ddl)))
+
+        indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in indexes:
+                changes.append((f"create index {index.name} on {table.name}", lambda conn, index=index: index.create(conn)))
+    return changes
+
+
+def upgrade(bind=engine, dry_run: bool = False) -> int:
+    changes = pending_changes(bind)
+    if not changes:
+        print("Schema is up to date")
+        return 0
+    for description, apply in changes:
+        print(f"{'Pending' if dry_run else 'Applying'}: {description}")
+        if not dry_run:
+            with bind.begin() as conn:
+                apply(conn)
+    return len(changes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bring the database schema up to date with the models")
+    parser.add_argument("--dry-run", action="store_true", help="List pending changes without applying them")
+    args = parser.parse_args()
+    upgrade(engine, args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
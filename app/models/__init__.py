@@ -1 +1,14 @@
-from .food_aid import Warehouse, DistributionCenter, FoodAidItem, Shipment, ScanLog, Feedback
+from .food_aid import Warehouse, DistributionCenter, FoodAidItem, Shipment, ShipmentItem, Checkpoint, ScanLog, Feedback
+from .issue import Issue
+from .user import Role, User, UserRole
+from .audit_trail import AuditTrail
+from .alert import Alert
+from .beneficiary import Beneficiary
+from .duplicate_candidate import DuplicateCandidate
+from .fraud_detection import FraudDetection
+from .ml_feature import MLFeature
+from .geographic_health import GeographicHealth
+from .status_history import ShipmentStatusHistory, ShipmentStatusDwell
+from .feedback_summary import FeedbackSummary
+from .inbound_message import InboundMessage
+from .outbound_message import OutboundMessage
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Text, Index
+from app.db_config import Base
+from datetime import datetime
+
+
+class Alert(Base):
+    __tablename__ = "alerts"
+    __table_args__ = (
+        # Active alerts are served as "unresolved, by severity"
+        Index("ix_alerts_resolved_severity", "resolved", "severity"),
+        # Dedupe lookups: "is there already an open alert of this type for this shipment?"
+        Index("ix_alerts_shipment_type_resolved", "shipment_id", "alert_type", "resolved"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    shipment_id = Column(Integer, ForeignKey("shipments.id"), nullable=False)
+    alert_type = Column(String(50))  # e.g., fraud_score, overdue_at_checkpoint, no_scan
+    severity = Column(String(20), default="warning", nullable=False)  # info, warning, danger
+    description = Column(Text)
+    resolved = Column(Boolean, default=False, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    resolved_at = Column(DateTime)
+
+    def __repr__(self):
+        return f"<Alert(id={self.id}, shipment_id={self.shipment_id}, type={self.alert_type}, resolved={self.resolved})>"
@@ -1,10 +1,15 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from app.db_config import Base
 from datetime import datetime
 
 
 class AuditTrail(Base):
     __tablename__ = "audit_trails"
+    __table_args__ = (
+        # Dashboard audit table: keyset pages sorted by time or filtered by table
+        Index("ix_audit_trails_timestamp_id", "timestamp", "id"),
+        Index("ix_audit_trails_table_name_id", "table_name", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
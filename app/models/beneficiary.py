@@ -1,9 +1,13 @@
 # app/models/beneficiary.py
-from sqlalchemy import Column, BigInteger, String, Date, TIMESTAMP, Text, func
+from sqlalchemy import Column, BigInteger, String, Date, TIMESTAMP, Text, Index, func
 from app.db_config import Base
 
 class Beneficiary(Base):
     __tablename__ = "beneficiaries"
+    __table_args__ = (
+        # Location filters narrow left to right; beneficiary_id last for keyset pagination
+        Index("ix_beneficiaries_location", "district", "sector", "cell", "village", "beneficiary_id"),
+    )
 
     beneficiary_id = Column(BigInteger, primary_key=True, autoincrement=True, index=True)
     first_name = Column(String(100), nullable=False)
@@ -21,3 +25,5 @@ class Beneficiary(Base):
     last_aid_received = Column(TIMESTAMP, nullable=True)
     feedback_status = Column(String(20), nullable=True, server_default="Pending")
     notes = Column(Text, nullable=True)
+    # district|soundex(last_name)|birth year, filled in by the deduplication engine
+    dedupe_key = Column(String(160), nullable=True, index=True)
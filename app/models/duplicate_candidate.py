@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Float, Index, UniqueConstraint
+from app.db_config import Base
+from datetime import datetime
+
+
+class DuplicateCandidate(Base):
+    __tablename__ = "beneficiary_duplicate_candidates"
+    __table_args__ = (
+        # A pair is stored once, with beneficiary_id_a < beneficiary_id_b
+        UniqueConstraint("beneficiary_id_a", "beneficiary_id_b", name="uq_duplicate_candidate_pair"),
+        Index("ix_duplicate_candidates_status", "status", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    beneficiary_id_a = Column(BigInteger, nullable=False, index=True)
+    beneficiary_id_b = Column(BigInteger, nullable=False, index=True)
+    score = Column(Float, nullable=False)  # Similarity score (0-1)
+    block_key = Column(String(160))  # Blocking key both records share
+    status = Column(String(20), default="pending", nullable=False)  # pending, confirmed, dismissed
+    detected_at = Column(DateTime, default=datetime.utcnow)
+    reviewed_by = Column(Integer)
+    reviewed_at = Column(DateTime)
+
+    def __repr__(self):
+        return f"<DuplicateCandidate(id={self.id}, pair=({self.beneficiary_id_a}, {self.beneficiary_id_b}), score={self.score})>"
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, Float, Index, UniqueConstraint
+from app.db_config import Base
+from datetime import datetime
+
+
+class FeedbackSummary(Base):
+    """
+    Pre-aggregated feedback counts per day, district, shipment and category
+
+    Maintained incrementally by the feedback analytics stage; rollups by
+    day, district or shipment are GROUP BYs over this (small) table.
+    Unknown district/shipment are stored as "" / 0 so the unique key applies.
+    """
+    __tablename__ = "feedback_summary"
+    __table_args__ = (
+        UniqueConstraint("day", "district", "shipment_id", "category", name="uq_feedback_summary_bucket"),
+        Index("ix_feedback_summary_district_day", "district", "day"),
+        Index("ix_feedback_summary_shipment_day", "shipment_id", "day"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False)
+    district = Column(String(100), nullable=False, default="")
+    shipment_id = Column(Integer, nullable=False, default=0)
+    category = Column(String(50), nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+    negative_count = Column(Integer, nullable=False, default=0)
+    sentiment_sum = Column(Float, nullable=False, default=0)  # Average sentiment = sentiment_sum / count
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<FeedbackSummary(day={self.day}, district={self.district}, shipment_id={self.shipment_id}, category={self.category}, count={self.count})>"
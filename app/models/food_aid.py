@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Text, Float, Index, Numeric
 from sqlalchemy.orm import relationship
 from app.db_config import Base
 
@@ -22,30 +22,84 @@ class FoodAidItem(Base):
 
 class Shipment(Base):
     __tablename__ = "shipments"
+    __table_args__ = (
+        # Dashboard shipment table: keyset pages sorted by creation time or filtered by status
+        Index("ix_shipments_timestamp_id", "timestamp", "id"),
+        Index("ix_shipments_status_id", "status", "id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     aid_item_id = Column(Integer, ForeignKey("food_aid_items.id"))
+    item_type = Column(String(100))
+    quantity_kg = Column(Numeric(10, 2, asdecimal=False))
     origin_id = Column(Integer, ForeignKey("warehouses.id"))
     destination_id = Column(Integer, ForeignKey("distribution_centers.id"))
     status = Column(String(50))  # e.g., dispatched, in transit, delivered
+    priority_level = Column(String(50))
     timestamp = Column(DateTime)
+    # Last known position, from the latest scan
+    latitude = Column(Float)
+    longitude = Column(Float)
 
-    aid_item = relationship("FoodAidItem")
-    origin = relationship("Warehouse")
-    destination = relationship("DistributionCenter")
+    # Never loaded implicitly: load them with the builders in app.services.shipment_queries
+    aid_item = relationship("FoodAidItem", lazy="raise_on_sql")
+    origin = relationship("Warehouse", lazy="raise_on_sql")
+    destination = relationship("DistributionCenter", lazy="raise_on_sql")
+    items = relationship("ShipmentItem", back_populates="shipment", lazy="raise_on_sql", passive_deletes=True)
+    scan_logs = relationship("ScanLog", back_populates="shipment", lazy="raise_on_sql", passive_deletes=True)
+
+class ShipmentItem(Base):
+    __tablename__ = "shipment_items"
+    id = Column(Integer, primary_key=True)
+    shipment_id = Column(Integer, ForeignKey("shipments.id"), nullable=False)
+    food_aid_item_id = Column(Integer, ForeignKey("food_aid_items.id"), nullable=False)
+    quantity_kg = Column(Numeric(10, 2, asdecimal=False))
+
+    shipment = relationship("Shipment", back_populates="items", lazy="raise_on_sql")
+    food_aid_item = relationship("FoodAidItem", lazy="raise_on_sql")
+
+class Checkpoint(Base):
+    __tablename__ = "checkpoints"
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), nullable=False)
+    type = Column(String(50), nullable=False)  # e.g., warehouse, border, distribution
+    latitude = Column(Float)
+    longitude = Column(Float)
 
 class ScanLog(Base):
     __tablename__ = "scan_logs"
     id = Column(Integer, primary_key=True, index=True)
     shipment_id = Column(Integer, ForeignKey("shipments.id"))
+    checkpoint_id = Column(Integer, ForeignKey("checkpoints.id"))
+    destination_checkpoint = Column(String(100))
+    checkpoint_type = Column(String(50))
     location = Column(String(255))
+    checkpoint_lat = Column(Float)
+    checkpoint_lon = Column(Float)
     scanned_at = Column(DateTime)
     scanned_by = Column(String(100))  # could be linked to a user table later
+    responsible_personnel_id = Column(String(50))
+
+    shipment = relationship("Shipment", back_populates="scan_logs", lazy="raise_on_sql")
+    checkpoint = relationship("Checkpoint", lazy="raise_on_sql")
 
 class Feedback(Base):
     __tablename__ = "feedbacks"
+    __table_args__ = (
+        # Keyset listings (newest first) filtered by type or shipment
+        Index("ix_feedbacks_type_id", "feedback_type", "id"),
+        Index("ix_feedbacks_shipment_id_id", "shipment_id", "id"),
+        Index("ix_feedbacks_submitted_at", "submitted_at"),
+        # Comment search on MySQL; SQLite uses the in-process index in feedback_search
+        Index("ft_feedbacks_comment", "comment", mysql_prefix="FULLTEXT"),
+        # The analytics stage picks up unclassified rows (category IS NULL) in id order
+        Index("ix_feedbacks_category_id", "category", "id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     shipment_id = Column(Integer, ForeignKey("shipments.id"))
     feedback_type = Column(String(50))  # e.g., received, missing, delayed
     comment = Column(Text)
     anonymous = Column(Boolean, default=True)
     submitted_at = Column(DateTime)
+    # Set by the feedback analytics stage
+    category = Column(String(50))  # e.g., received, not received, damaged, general
+    sentiment = Column(Float)  # -1 (negative) to 1 (positive)
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, Numeric
+from app.db_config import Base
+
+
+class GeographicHealth(Base):
+    __tablename__ = "geographic_health"
+
+    geo_id = Column(Integer, primary_key=True)
+    shipment_id = Column(Integer, ForeignKey("shipments.id"))
+    province = Column(String(100))
+    district = Column(String(100))
+    malnutrition_rate = Column(Numeric(5, 2, asdecimal=False))  # percent
+    beneficiary_confirmation = Column(Boolean)
+
+    def __repr__(self):
+        return f"<GeographicHealth(geo_id={self.geo_id}, district={self.district}, shipment_id={self.shipment_id})>"
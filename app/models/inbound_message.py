@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index
+from app.db_config import Base
+from datetime import datetime
+
+
+class InboundMessage(Base):
+    __tablename__ = "inbound_messages"
+    __table_args__ = (
+        # The ingest worker drains pending messages in arrival order
+        Index("ix_inbound_messages_status_id", "status", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Provider's message id (e.g. Twilio MessageSid); provider retries reuse it
+    provider_message_id = Column(String(64), unique=True, nullable=False)
+    from_number = Column(String(32))
+    body = Column(Text)
+    received_at = Column(DateTime, default=datetime.utcnow)
+    status = Column(String(20), default="pending", nullable=False)  # pending, processed, failed
+    feedback_id = Column(Integer)
+    error = Column(String(255))
+    processed_at = Column(DateTime)
+
+    def __repr__(self):
+        return f"<InboundMessage(id={self.id}, provider_message_id={self.provider_message_id}, status={self.status})>"
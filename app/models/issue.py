@@ -1,19 +1,24 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from app.db_config import Base
 from datetime import datetime
 
 class Issue(Base):
     __tablename__ = "issues"
+    __table_args__ = (
+        # Keyset listings (newest first) filtered by shipment
+        Index("ix_issues_shipment_issue_id", "shipment_id", "issue_id"),
+    )
 
     issue_id = Column(Integer, primary_key=True, index=True)
-    shipment_id = Column(Integer, ForeignKey("shipments.id"), nullable=False)
+    shipment_id = Column(Integer, ForeignKey("shipments.id"))
     issue_reported = Column(Boolean, default=False)
-    description = Column(Text)
-    reported_at = Column(DateTime, default=datetime.utcnow)
+    issue_type = Column(String(100))  # e.g., damaged, spoiled, missing
+    report_timestamp = Column(DateTime, default=datetime.utcnow)
+    anonymous_report = Column(Boolean, default=False)
 
     # Relationship to shipment
-    shipment = relationship("Shipment")
+    shipment = relationship("Shipment", lazy="raise_on_sql")
 
     def __repr__(self):
         return f"<Issue(id={self.issue_id}, shipment_id={self.shipment_id}, reported={self.issue_reported})>"
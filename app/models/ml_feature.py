@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Float, Boolean, func
+from app.db_config import Base
+
+
+class MLFeature(Base):
+    __tablename__ = "ml_features"
+
+    id = Column(Integer, primary_key=True)
+    shipment_id = Column(Integer, ForeignKey("shipments.id"), nullable=False)
+    transit_time = Column(Float)  # hours
+    issue_count = Column(Integer)
+    personnel_changes = Column(Integer)
+    anomaly_score = Column(Float)
+    is_fraud = Column(Boolean)
+    updated_at = Column(DateTime, server_default=func.now())
+
+    def __repr__(self):
+        return f"<MLFeature(id={self.id}, shipment_id={self.shipment_id}, anomaly_score={self.anomaly_score})>"
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index
+from app.db_config import Base
+from datetime import datetime
+
+
+class OutboundMessage(Base):
+    __tablename__ = "outbound_messages"
+    __table_args__ = (
+        # The dispatcher claims "queued, due now" messages in next_attempt_at order
+        Index("ix_outbound_messages_status_due", "status", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    message_key = Column(String(128), unique=True, nullable=False)  # Dedupe key; a key is only ever sent once
+    channel = Column(String(10), default="sms", nullable=False)
+    to_number = Column(String(32), nullable=False)
+    body = Column(Text, nullable=False)
+    status = Column(String(20), default="queued", nullable=False)  # queued, sending, sent, failed
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_error = Column(String(255))
+    provider_message_id = Column(String(64), index=True)
+    delivery_status = Column(String(20))  # Reported later by the provider: delivered, undelivered, ...
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime)
+    delivered_at = Column(DateTime)
+
+    def __repr__(self):
+        return f"<OutboundMessage(id={self.id}, to={self.to_number}, status={self.status}, attempts={self.attempts})>"
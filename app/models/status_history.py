@@ -0,0 +1,44 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Text, Index, UniqueConstraint
+from app.db_config import Base
+from datetime import datetime
+
+
+class ShipmentStatusHistory(Base):
+    __tablename__ = "shipment_status_history"
+    __table_args__ = (
+        # Timeline reads are always "one shipment, ordered by time"
+        Index("ix_status_history_shipment_changed", "shipment_id", "changed_at"),
+        # Incremental sync: shipments whose status changed since a watermark
+        Index("ix_status_history_changed_at", "changed_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    shipment_id = Column(Integer, ForeignKey("shipments.id", ondelete="CASCADE"), nullable=False)
+    old_status = Column(String(50))
+    new_status = Column(String(50), nullable=False)
+    location = Column(String(255))
+    changed_by = Column(String(100))
+    notes = Column(Text)
+    changed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Seconds the shipment spent in old_status before this change (None for the first entry)
+    old_status_seconds = Column(Float)
+
+    def __repr__(self):
+        return f"<ShipmentStatusHistory(id={self.id}, shipment_id={self.shipment_id}, {self.old_status} -> {self.new_status})>"
+
+
+class ShipmentStatusDwell(Base):
+    __tablename__ = "shipment_status_dwell"
+    __table_args__ = (
+        UniqueConstraint("shipment_id", "status", name="uq_status_dwell_shipment_status"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    shipment_id = Column(Integer, ForeignKey("shipments.id", ondelete="CASCADE"), nullable=False)
+    status = Column(String(50), nullable=False)
+    total_seconds = Column(Float, default=0, nullable=False)  # Accumulated time spent in this status
+    visits = Column(Integer, default=0, nullable=False)  # Number of completed stays in this status
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ShipmentStatusDwell(shipment_id={self.shipment_id}, status={self.status}, total_seconds={self.total_seconds})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Enum
+from sqlalchemy import Column, Integer, String, Enum, ForeignKey
 from app.db_config import Base
 import enum
 
@@ -7,11 +7,18 @@ class UserRole(str, enum.Enum):
     distributor = "distributor"
     official = "official"
 
+class Role(Base):
+    __tablename__ = "roles"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50), unique=True, nullable=False)
+    description = Column(String(255))
+
 class User(Base):
     __tablename__ = "users"
-    __table_args__ = {'extend_existing': True}  # <-- add this line
 
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String(50), unique=True, index=True, nullable=False)
     password_hash = Column(String(255), nullable=False)
     role = Column(Enum(UserRole), default=UserRole.citizen, nullable=False)
+    role_id = Column(Integer, ForeignKey("roles.id"))
@@ -1,11 +1,16 @@
 import dash
-from dash import dcc, html, Input, Output, dash_table
+from dash import dcc, html, Input, Output, State, dash_table
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
-from sqlalchemy import create_engine
+import threading
+import hashlib
+from sqlalchemy import create_engine, text
 from db_config import DATABASE_URL
+from utils.geo_grid import GeoGridIndex, viewport_bounds
+from utils.figure_cache import FigureCache
+from utils.table_query import TableQuery
 
 PRIMARY = "#2E86AB"
 SUCCESS = "#28A745"
@@ -39,9 +44,14 @@ def fetch_shipments():
     df = pd.read_sql(query, engine)
     return df
 
-# 2. Feedbacks
-def fetch_feedbacks():
-    query = "SELECT * FROM feedbacks"
+# 2. Feedback counts per category (pre-aggregated by the feedback analytics worker)
+def fetch_feedback_summary():
+    query = """
+        SELECT category, SUM(count) AS count
+        FROM feedback_summary
+        GROUP BY category
+        ORDER BY count DESC
+    """
     df = pd.read_sql(query, engine)
     return df
 
@@ -57,13 +67,63 @@ def fetch_fraud():
     df = pd.read_sql(query, engine)
     return df
 
-# 5. Audit trail
-def fetch_audit_trail():
-    query = "SELECT * FROM audit_trails ORDER BY timestamp DESC LIMIT 10"
+# 5. Open alerts, counted per type/severity (served from the (resolved, severity) index)
+def fetch_alert_summary():
+    query = """
+        SELECT alert_type, severity, COUNT(*) AS count
+        FROM alerts
+        WHERE resolved = 0
+        GROUP BY alert_type, severity
+    """
     df = pd.read_sql(query, engine)
     return df
 
-def calculate_kpis(shipments, feedbacks, issues):
+# 6. Paged tables (DataTable custom paging/sorting/filtering, one page per query)
+shipment_table = TableQuery(
+    """
+        SELECT s.id AS id, s.status AS status, f.name AS item_name,
+               s.quantity_kg AS quantity_kg, s.timestamp AS created_at
+        FROM shipments s
+        LEFT JOIN food_aid_items f ON s.aid_item_id = f.id
+    """,
+    columns={
+        'id': ('s.id', 'number'),
+        'status': ('s.status', 'text'),
+        'item_name': ('f.name', 'text'),
+        'quantity_kg': ('s.quantity_kg', 'number'),
+        'created_at': ('s.timestamp', 'datetime'),
+    },
+    default_sort=[{'column_id': 'created_at', 'direction': 'desc'}]
+)
+
+audit_table = TableQuery(
+    "SELECT id, user_id, action, table_name, record_id, timestamp FROM audit_trails",
+    columns={
+        'id': ('id', 'number'),
+        'user_id': ('user_id', 'number'),
+        'action': ('action', 'text'),
+        'table_name': ('table_name', 'text'),
+        'record_id': ('record_id', 'number'),
+        'timestamp': ('timestamp', 'datetime'),
+    },
+    default_sort=[{'column_id': 'timestamp', 'direction': 'desc'}]
+)
+
+def fetch_table_page(table, page_current, page_size, sort_by, filter_query, datetime_columns):
+    with engine.connect() as conn:
+        rows, has_more = table.page(conn, page_current, page_size, sort_by, filter_query)
+    for row in rows:
+        for column in datetime_columns:
+            if row[column] is not None:
+                row[column] = pd.Timestamp(row[column]).strftime('%Y-%m-%d %H:%M')
+        for column, value in row.items():
+            if hasattr(value, 'is_finite'):  # Decimal
+                row[column] = float(value)
+    # Page count is only known up to the next page; no COUNT(*) over the table
+    page_count = (page_current or 0) + (2 if has_more else 1)
+    return rows, page_count
+
+def calculate_kpis(shipments, issues):
     total_dispatched = len(shipments)
     total_delivered = len(shipments[shipments['status'] == 'Delivered'])
     delayed_shipments = len(shipments[shipments['status'] == 'Delayed'])
@@ -105,17 +165,52 @@ app.layout = html.Div([
             html.H3("Live Tracking Map", style={'color': PRIMARY}),
             dcc.Graph(id='tracking-map', style={'marginBottom': '20px'}),
             html.H3("Recent Shipments", style={'color': PRIMARY, 'marginTop': '30px'}),
-            html.Div(id='shipment-table')
+            dash_table.DataTable(
+                id='shipment-table',
+                columns=[
+                    {'name': 'Shipment ID', 'id': 'id', 'type': 'numeric'},
+                    {'name': 'Status', 'id': 'status'},
+                    {'name': 'Item', 'id': 'item_name'},
+                    {'name': 'Quantity (kg)', 'id': 'quantity_kg', 'type': 'numeric'},
+                    {'name': 'Created', 'id': 'created_at', 'type': 'datetime'}
+                ],
+                page_action='custom', sort_action='custom', filter_action='custom',
+                page_current=0, page_size=10, sort_mode='single', sort_by=[],
+                style_cell={'textAlign': 'left', 'padding': '10px', 'fontSize': '1em'},
+                style_header={'backgroundColor': PRIMARY, 'color': 'white', 'fontWeight': 'bold'},
+                style_data_conditional=[
+                    {'if': {'filter_query': '{status} = Delayed'}, 'backgroundColor': '#f8d7da', 'color': 'black'},
+                    {'if': {'filter_query': '{status} = Delivered'}, 'backgroundColor': '#d4edda', 'color': 'black'},
+                    {'if': {'filter_query': '{status} = Lost'}, 'backgroundColor': '#f5c6cb', 'color': 'black'}
+                ],
+                style_table={'borderRadius': '8px', 'overflow': 'hidden'}
+            )
         ], className='six columns', style={'backgroundColor': 'white', 'borderRadius': '12px', 'padding': '15px', 'boxShadow': '0 2px 8px #e0e0e0'}),
         html.Div([
             html.H3("Supply Chain Analytics", style={'color': PRIMARY}),
             dcc.Graph(id='trend-charts'),
+            dcc.Store(id='trend-charts-version'),
             html.H3("Alerts & Anomalies", style={'color': PRIMARY, 'marginTop': '30px'}),
             html.Div(id='alerts-panel'),
             html.H3("Feedback Overview", style={'color': PRIMARY, 'marginTop': '30px'}),
             dcc.Graph(id='feedback-chart'),
+            dcc.Store(id='feedback-chart-version'),
             html.H3("Audit Trail", style={'color': PRIMARY, 'marginTop': '30px'}),
-            html.Div(id='audit-table')
+            dash_table.DataTable(
+                id='audit-table',
+                columns=[
+                    {'name': 'User ID', 'id': 'user_id', 'type': 'numeric'},
+                    {'name': 'Action', 'id': 'action'},
+                    {'name': 'Table', 'id': 'table_name'},
+                    {'name': 'Record', 'id': 'record_id', 'type': 'numeric'},
+                    {'name': 'Timestamp', 'id': 'timestamp', 'type': 'datetime'}
+                ],
+                page_action='custom', sort_action='custom', filter_action='custom',
+                page_current=0, page_size=10, sort_mode='single', sort_by=[],
+                style_cell={'textAlign': 'left', 'padding': '8px', 'fontSize': '1em'},
+                style_header={'backgroundColor': PRIMARY, 'color': 'white', 'fontWeight': 'bold'},
+                style_table={'borderRadius': '8px', 'overflow': 'hidden'}
+            )
         ], className='six columns', style={'backgroundColor': 'white', 'borderRadius': '12px', 'padding': '15px', 'boxShadow': '0 2px 8px #e0e0e0'})
     ], className='row')
 ], style={'padding': '20px', 'backgroundColor': BG})
@@ -123,9 +218,8 @@ app.layout = html.Div([
 @app.callback(Output('kpi-cards', 'children'), [Input('interval-component', 'n_intervals')])
 def update_kpi_cards(n):
     shipments = fetch_shipments()
-    feedbacks = fetch_feedbacks()
     issues = fetch_issues()
-    kpis = calculate_kpis(shipments, feedbacks, issues)
+    kpis = calculate_kpis(shipments, issues)
     card_style = {
         'backgroundColor': 'white', 'padding': '20px', 'textAlign': 'center',
         'boxShadow': '0 4px 8px rgba(0,0,0,0.08)', 'borderRadius': '12px', 'margin': '5px'
@@ -163,79 +257,167 @@ def update_kpi_cards(n):
         ], className='two columns', style=card_style)
     ], className='row')
 
-@app.callback(Output('tracking-map', 'figure'), [Input('interval-component', 'n_intervals')])
-def update_map(n):
-    shipments = fetch_shipments()
+# Shipment positions for the map, re-binned only when scans or statuses change
+map_index = GeoGridIndex()
+map_signature = None
+MAP_CENTER = {'lat': -1.9441, 'lon': 29.8739}
+MAP_ZOOM = 7
+
+def fetch_map_signature():
+    query = """
+        SELECT (SELECT MAX(id) FROM scan_logs) AS scan_id,
+               (SELECT MAX(id) FROM shipment_status_history) AS status_id,
+               (SELECT COUNT(*) FROM shipments) AS shipments
+    """
+    return tuple(pd.read_sql(query, engine).iloc[0])
+
+def refresh_map_points():
+    global map_signature
+    signature = fetch_map_signature()
+    if signature == map_signature:
+        return
+    shipments = fetch_shipments().drop_duplicates(subset='id', keep='last')
+    map_index.set_points(shipments['id'], shipments['latitude'], shipments['longitude'], shipments['status'])
+    map_signature = signature
+
+@app.callback(Output('tracking-map', 'figure'),
+              [Input('interval-component', 'n_intervals'), Input('tracking-map', 'relayoutData')])
+def update_map(n, relayout):
+    refresh_map_points()
+    relayout = relayout or {}
+    zoom = relayout.get('mapbox.zoom', MAP_ZOOM)
+    center = relayout.get('mapbox.center', MAP_CENTER)
+    clusters = pd.DataFrame(
+        map_index.clusters(zoom, viewport_bounds(center['lat'], center['lon'], zoom)),
+        columns=['latitude', 'longitude', 'count', 'statuses', 'id']
+    )
     color_map = {
         'Delivered': SUCCESS,
         'In Transit': PRIMARY,
         'Delayed': DANGER,
         'Lost': '#6c757d'
     }
-    shipments['color'] = shipments['status'].map(color_map)
+    # A cluster is colored by its most common status
+    clusters['status'] = clusters['statuses'].map(lambda counts: max(counts, key=counts.get))
+    clusters['breakdown'] = clusters['statuses'].map(lambda counts: ', '.join(f"{k}: {v}" for k, v in counts.items()))
+    clusters['label'] = [f"Shipment {i}" if c == 1 else f"{c} shipments" for i, c in zip(clusters['id'], clusters['count'])]
     fig = px.scatter_mapbox(
-        shipments.dropna(subset=['latitude', 'longitude']),
+        clusters,
         lat='latitude', lon='longitude',
         color='status',
-        hover_name='id',
-        hover_data={'item_name': True, 'status': True, 'quantity_kg': True},
+        size='count',
+        size_max=30,
+        hover_name='label',
+        hover_data={'breakdown': True, 'status': False, 'count': False, 'latitude': False, 'longitude': False},
         color_discrete_map=color_map,
-        zoom=7,
+        zoom=zoom,
+        center=center,
         height=400
     )
     fig.update_layout(
         mapbox_style="open-street-map",
-        mapbox=dict(center=dict(lat=-1.9441, lon=29.8739)),
+        # Keep the user's pan/zoom across refreshes
+        uirevision='tracking-map',
         showlegend=True,
         margin={"r":0,"t":0,"l":0,"b":0}
     )
     return fig
 
-@app.callback(Output('shipment-table', 'children'), [Input('interval-component', 'n_intervals')])
-def update_shipment_table(n):
-    shipments = fetch_shipments()
-    df_recent = shipments.sort_values('created_at', ascending=False).head(10)
-    df_recent['created_at'] = pd.to_datetime(df_recent['created_at']).dt.strftime('%Y-%m-%d %H:%M')
-    return dash_table.DataTable(
-        data=df_recent[['id', 'status', 'item_name', 'quantity_kg', 'created_at']].to_dict('records'),
-        columns=[
-            {'name': 'Shipment ID', 'id': 'id'},
-            {'name': 'Status', 'id': 'status'},
-            {'name': 'Item', 'id': 'item_name'},
-            {'name': 'Quantity (kg)', 'id': 'quantity_kg'},
-            {'name': 'Created', 'id': 'created_at'}
-        ],
-        style_cell={'textAlign': 'left', 'padding': '10px', 'fontSize': '1em'},
-        style_header={'backgroundColor': PRIMARY, 'color': 'white', 'fontWeight': 'bold'},
-        style_data_conditional=[
-            {'if': {'filter_query': '{status} = Delayed'}, 'backgroundColor': '#f8d7da', 'color': 'black'},
-            {'if': {'filter_query': '{status} = Delivered'}, 'backgroundColor': '#d4edda', 'color': 'black'},
-            {'if': {'filter_query': '{status} = Lost'}, 'backgroundColor': '#f5c6cb', 'color': 'black'}
-        ],
-        style_table={'borderRadius': '8px', 'overflow': 'hidden'}
-    )
+@app.callback([Output('shipment-table', 'data'), Output('shipment-table', 'page_count')],
+              [Input('interval-component', 'n_intervals'), Input('shipment-table', 'page_current'),
+               Input('shipment-table', 'page_size'), Input('shipment-table', 'sort_by'),
+               Input('shipment-table', 'filter_query')])
+def update_shipment_table(n, page_current, page_size, sort_by, filter_query):
+    return fetch_table_page(shipment_table, page_current, page_size, sort_by, filter_query, ['created_at'])
 
-@app.callback(Output('trend-charts', 'figure'), [Input('interval-component', 'n_intervals')])
-def update_trend_charts(n):
-    shipments = fetch_shipments()
+# Figures are serialized once per data version; each browser keeps the
+# version it last received in a dcc.Store and gets no_update while it matches
+figure_cache = FigureCache()
+
+class TrendSeries:
+    """
+    Daily shipment counts and delayed shipments per item, kept incrementally
+
+    Every shipment creation and status change is a shipment_status_history
+    row, so a tick only reads the rows past the last seen id: creations add
+    to their day, and moves into or out of 'Delayed' adjust their item's
+    count. Shipments written or deleted without history change the shipment
+    count and trigger a full rebuild.
+    """
+
+    def __init__(self):
+        self.daily = pd.Series(dtype='int64')
+        self.delayed_by_item = pd.Series(dtype='int64')
+        self.watermark = None
+        self.shipment_count = 0
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        with self._lock, engine.connect() as conn, conn.begin():
+            # One transaction, so the counts and the watermark come from the same snapshot
+            if self.watermark is None:
+                self._rebuild(conn)
+                return self.version
+            changes = pd.read_sql(text("""
+                SELECT h.id, h.old_status, h.new_status, DATE(s.timestamp) AS day, f.name AS item_name
+                FROM shipment_status_history h
+                JOIN shipments s ON s.id = h.shipment_id
+                LEFT JOIN food_aid_items f ON s.aid_item_id = f.id
+                WHERE h.id > :watermark
+                ORDER BY h.id
+            """), conn, params={'watermark': self.watermark})
+            created = changes['old_status'].isna()
+            shipment_count = conn.execute(text("SELECT COUNT(*) FROM shipments")).scalar()
+            if shipment_count != self.shipment_count + int(created.sum()):
+                self._rebuild(conn)
+                return self.version
+            if changes.empty:
+                return self.version
+
+            self.daily = self.daily.add(changes[created].groupby('day').size(), fill_value=0).astype('int64')
+            delta = (changes['new_status'] == 'Delayed').astype(int) - (changes['old_status'] == 'Delayed').astype(int)
+            self.delayed_by_item = self.delayed_by_item.add(
+                delta.groupby(changes['item_name']).sum(), fill_value=0
+            ).astype('int64')
+            self.delayed_by_item = self.delayed_by_item[self.delayed_by_item > 0]
+            self.shipment_count = shipment_count
+            self.watermark = int(changes['id'].iloc[-1])
+            self.version += 1
+            return self.version
+
+    def _rebuild(self, conn):
+        self.watermark = conn.execute(text("SELECT COALESCE(MAX(id), 0) FROM shipment_status_history")).scalar()
+        shipments = pd.read_sql(text("""
+            SELECT DATE(s.timestamp) AS day, s.status, f.name AS item_name
+            FROM shipments s
+            LEFT JOIN food_aid_items f ON s.aid_item_id = f.id
+        """), conn)
+        self.daily = shipments.groupby('day').size()
+        self.delayed_by_item = shipments[shipments['status'] == 'Delayed'].groupby('item_name').size()
+        self.shipment_count = len(shipments)
+        self.version += 1
+
+trend_series = TrendSeries()
+
+def build_trend_figure():
+    daily = trend_series.daily.sort_index()
+    delayed_by_item = trend_series.delayed_by_item
     fig = make_subplots(
         rows=2, cols=1,
         subplot_titles=('Daily Shipments Trend', 'Delay Patterns by Item'),
         specs=[[{"secondary_y": False}], [{"secondary_y": False}]]
     )
-    shipments['date'] = pd.to_datetime(shipments['created_at']).dt.date
-    daily_shipments = shipments.groupby('date').size().reset_index(name='count')
     fig.add_trace(
         go.Scatter(
-            x=daily_shipments['date'],
-            y=daily_shipments['count'],
+            x=daily.index,
+            y=daily.values,
             mode='lines+markers',
             name='Daily Shipments',
             line=dict(color=PRIMARY)
         ),
         row=1, col=1
     )
-    delayed_by_item = shipments[shipments['status'] == 'Delayed'].groupby('item_name').size()
     fig.add_trace(
         go.Bar(
             x=delayed_by_item.index,
@@ -248,33 +430,34 @@ def update_trend_charts(n):
     fig.update_layout(height=500, showlegend=False, plot_bgcolor=BG)
     return fig
 
+@app.callback([Output('trend-charts', 'figure'), Output('trend-charts-version', 'data')],
+              [Input('interval-component', 'n_intervals')], [State('trend-charts-version', 'data')])
+def update_trend_charts(n, client_version):
+    version = figure_cache.token(trend_series.refresh())
+    if version == client_version:
+        return dash.no_update, dash.no_update
+    return figure_cache.get('trend-charts', version, build_trend_figure), version
+
 @app.callback(Output('alerts-panel', 'children'), [Input('interval-component', 'n_intervals')])
 def update_alerts_panel(n):
-    shipments = fetch_shipments()
-    frauds = fetch_fraud()
+    summary = fetch_alert_summary()
+    labels = {
+        'fraud_score': "shipments flagged as fraud",
+        'status_delayed': "shipments are currently delayed",
+        'status_lost': "shipments reported lost",
+        'overdue_at_checkpoint': "shipments overdue at a checkpoint",
+        'no_scan': "shipments not scanned recently",
+        'route_deviation': "shipments deviated from their route"
+    }
+    icons = {'danger': '🚨', 'warning': '⚠️', 'info': 'ℹ️'}
     alerts = []
-    suspicious = frauds[frauds['is_fraud'] == 1]
-    if not suspicious.empty:
-        alerts.append({
-            'type': 'danger',
-            'message': f"{len(suspicious)} shipments flagged as fraud: " +
-                       ", ".join(suspicious['reason'].dropna().unique()),
-            'icon': '🚨'
-        })
-    delayed_shipments = shipments[shipments['status'] == 'Delayed']
-    if len(delayed_shipments) > 0:
-        alerts.append({
-            'type': 'warning',
-            'message': f"{len(delayed_shipments)} shipments are currently delayed.",
-            'icon': '⚠️'
-        })
-    lost_shipments = shipments[shipments['status'] == 'Lost']
-    if len(lost_shipments) > 0:
-        alerts.append({
-            'type': 'danger',
-            'message': f"{len(lost_shipments)} shipments reported lost.",
-            'icon': '❌'
-        })
+    for severity in ['danger', 'warning', 'info']:
+        for _, row in summary[summary['severity'] == severity].iterrows():
+            alerts.append({
+                'type': 'warning' if severity == 'info' else severity,
+                'message': f"{row['count']} {labels.get(row['alert_type'], row['alert_type'])}.",
+                'icon': icons[severity]
+            })
     if not alerts:
         alerts.append({
             'type': 'success',
@@ -296,38 +479,34 @@ def update_alerts_panel(n):
         }) for alert in alerts
     ])
 
-@app.callback(Output('feedback-chart', 'figure'), [Input('interval-component', 'n_intervals')])
-def update_feedback_chart(n):
-    feedbacks = fetch_feedbacks()
-    feedback_counts = feedbacks['feedback_type'].value_counts() if 'feedback_type' in feedbacks else pd.Series()
-    fig = px.pie(
-        values=feedback_counts.values,
-        names=feedback_counts.index,
-        title="Feedback Distribution",
-        color_discrete_sequence=[PRIMARY, SUCCESS, WARNING, DANGER, INFO]
-    )
-    fig.update_layout(height=300, legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5))
-    return fig
+@app.callback([Output('feedback-chart', 'figure'), Output('feedback-chart-version', 'data')],
+              [Input('interval-component', 'n_intervals')], [State('feedback-chart-version', 'data')])
+def update_feedback_chart(n, client_version):
+    summary = fetch_feedback_summary()
+    # The summary is one row per category, so the data itself is the version;
+    # a digest rather than hash(), which is randomized per process
+    serialized = summary[['category', 'count']].to_json(orient='values')
+    version = figure_cache.token(hashlib.sha256(serialized.encode('utf-8')).hexdigest()[:16])
+    if version == client_version:
+        return dash.no_update, dash.no_update
 
-@app.callback(Output('audit-table', 'children'), [Input('interval-component', 'n_intervals')])
-def update_audit_table(n):
-    audits = fetch_audit_trail()
-    if audits.empty:
-        return html.Div("No recent audit trail records.", style={'color': DANGER, 'padding': '20px'})
-    audits['timestamp'] = pd.to_datetime(audits['timestamp']).dt.strftime('%Y-%m-%d %H:%M')
-    return dash_table.DataTable(
-        data=audits[['user_id', 'action', 'table_name', 'record_id', 'timestamp']].to_dict('records'),
-        columns=[
-            {'name': 'User ID', 'id': 'user_id'},
-            {'name': 'Action', 'id': 'action'},
-            {'name': 'Table', 'id': 'table_name'},
-            {'name': 'Record', 'id': 'record_id'},
-            {'name': 'Timestamp', 'id': 'timestamp'}
-        ],
-        style_cell={'textAlign': 'left', 'padding': '8px', 'fontSize': '1em'},
-        style_header={'backgroundColor': PRIMARY, 'color': 'white', 'fontWeight': 'bold'},
-        style_table={'borderRadius': '8px', 'overflow': 'hidden'}
-    )
+    def build():
+        fig = px.pie(
+            values=summary['count'] if not summary.empty else [],
+            names=summary['category'] if not summary.empty else [],
+            title="Feedback Distribution",
+            color_discrete_sequence=[PRIMARY, SUCCESS, WARNING, DANGER, INFO]
+        )
+        fig.update_layout(height=300, legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5))
+        return fig
+    return figure_cache.get('feedback-chart', version, build), version
+
+@app.callback([Output('audit-table', 'data'), Output('audit-table', 'page_count')],
+              [Input('interval-component', 'n_intervals'), Input('audit-table', 'page_current'),
+               Input('audit-table', 'page_size'), Input('audit-table', 'sort_by'),
+               Input('audit-table', 'filter_query')])
+def update_audit_table(n, page_current, page_size, sort_by, filter_query):
+    return fetch_table_page(audit_table, page_current, page_size, sort_by, filter_query, ['timestamp'])
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=8050)
\ No newline at end of file
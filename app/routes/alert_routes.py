@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app.db_config import get_db
+from app.models.user import User
+from app.schemas.alert import AlertRead, AlertSummary
+from app.services.alert_engine import alert_engine
+from app.services.audit_service import get_audit_service
+from app.utils.auth import get_current_user, require_official
+
+# No prefix here — main.py will handle it
+router = APIRouter(tags=["Alerts"])
+
+@router.get("/active", response_model=List[AlertRead])
+def get_active_alerts(
+    severity: Optional[str] = None,
+    limit: int = 100,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user)
+):
+    """
+    Get unresolved alerts, most severe and most recent first
+    """
+    return alert_engine.get_active_alerts(db, severity=severity, limit=limit)
+
+@router.get("/summary", response_model=List[AlertSummary])
+def get_alert_summary(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+    """
+    Count unresolved alerts per type and severity
+    """
+    return alert_engine.get_summary(db)
+
+@router.put("/{alert_id}/resolve", response_model=AlertRead)
+def resolve_alert(alert_id: int, db: Session = Depends(get_db), user: User = Depends(require_official)):
+    alert = alert_engine.resolve(db, alert_id)
+    if not alert:
+        raise HTTPException(status_code=404, detail="Alert not found")
+
+    audit_service = get_audit_service(db, user)
+    audit_service.log_update(
+        table_name="alerts",
+        record_id=alert_id,
+        old_values={"resolved": False},
+        new_values={"resolved": True}
+    )
+    return alert
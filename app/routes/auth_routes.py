@@ -24,7 +24,7 @@ def login(user_data: UserLogin, db: Session = Depends(get_db)):
             detail="Invalid username or password"
         )
 
-    access_token = create_access_token({"sub": user.username})
+    access_token = create_access_token(user.username)
     return {
         "access_token": access_token,
         "user": {
@@ -58,7 +58,7 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
     db.commit()
     db.refresh(new_user)
 
-    access_token = create_access_token({"sub": new_user.username})
+    access_token = create_access_token(new_user.username)
     return {
         "access_token": access_token,
         "user": {
@@ -1,11 +1,74 @@
 # app/routes/beneficiary_routes.py
-from fastapi import APIRouter, Depends
+import csv
+import io
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.db_config import get_db
+from typing import List, Optional
+from pydantic import BaseModel
+from datetime import datetime, timezone
+from app.db_config import get_db, SessionLocal
 from app.models.beneficiary import Beneficiary
+from app.models.duplicate_candidate import DuplicateCandidate
+from app.models.user import User
+from app.utils.auth import require_official, require_roles
+from app.services.beneficiary_index import beneficiary_index, AlreadyReceivedError
+from app.services.audit_service import get_audit_service
+from app.schemas.duplicate_candidate import DuplicateCandidateRead, DuplicateCandidateReview
+from app.utils.fast_json import ndjson_response, rows_response
 
 router = APIRouter(tags=["Beneficiaries"])
 
+require_distribution_staff = require_roles(["distributor", "official"])
+
+
+class AidReceipt(BaseModel):
+    code: str  # Scanned QR code or national ID
+    received_at: Optional[datetime] = None
+
+# Columns returned by the listing and the export, in output order
+BENEFICIARY_FIELDS = {
+    "id": Beneficiary.beneficiary_id,
+    "first_name": Beneficiary.first_name,
+    "last_name": Beneficiary.last_name,
+    "phone_number": Beneficiary.phone_number,
+    "village": Beneficiary.village,
+    "cell": Beneficiary.cell,
+    "sector": Beneficiary.sector,
+    "district": Beneficiary.district,
+}
+
+MAX_PAGE_SIZE = 1000
+EXPORT_BATCH_SIZE = 1000
+
+
+def _filtered_query(
+    db: Session,
+    district: Optional[str] = None,
+    sector: Optional[str] = None,
+    cell: Optional[str] = None,
+    village: Optional[str] = None,
+    after_id: Optional[int] = None
+):
+    """
+    Select beneficiary columns (not entities) filtered by location
+
+    Filters map onto the (district, sector, cell, village, beneficiary_id) index.
+    """
+    query = db.query(*BENEFICIARY_FIELDS.values())
+    if district:
+        query = query.filter(Beneficiary.district == district)
+    if sector:
+        query = query.filter(Beneficiary.sector == sector)
+    if cell:
+        query = query.filter(Beneficiary.cell == cell)
+    if village:
+        query = query.filter(Beneficiary.village == village)
+    if after_id:
+        query = query.filter(Beneficiary.beneficiary_id > after_id)
+    return query.order_by(Beneficiary.beneficiary_id)
+
+
 @router.get("/total")
 def total_beneficiaries(db: Session = Depends(get_db)):
     """
@@ -15,22 +78,248 @@ def total_beneficiaries(db: Session = Depends(get_db)):
     return {"total": total}
 
 @router.get("/all")
-def get_all_beneficiaries(db: Session = Depends(get_db)):
-    """
-    Returns a list of all beneficiaries with details.
-    """
-    beneficiaries = db.query(Beneficiary).all()
-    result = [
-        {
-            "id": b.beneficiary_id,
-            "first_name": b.first_name,
-            "last_name": b.last_name,
-            "phone_number": b.phone_number,
-            "village": b.village,
-            "cell": b.cell,
-            "sector": b.sector,
-            "district": b.district,
-        }
-        for b in beneficiaries
-    ]
-    return result
+def get_all_beneficiaries(
+    district: Optional[str] = None,
+    sector: Optional[str] = None,
+    cell: Optional[str] = None,
+    village: Optional[str] = None,
+    after_id: Optional[int] = None,
+    limit: int = 100,
+    format: str = "json",
+    db: Session = Depends(get_db),
+    user: User = Depends(require_official)
+):
+    """
+    Returns one page of beneficiaries, optionally filtered by location.
+
+    Pages are keyset-based: pass the X-Next-Cursor header of the previous
+    page as `after_id` to get the next one. The header is absent on the last page.
+    With format=ndjson every matching row (after `after_id`) is streamed instead.
+    Names and phone numbers are personal data, so this is officials-only like /export.
+    """
+    if format == "ndjson":
+        return ndjson_response(
+            SessionLocal, lambda stream_db: _filtered_query(stream_db, district, sector, cell, village, after_id),
+            list(BENEFICIARY_FIELDS), EXPORT_BATCH_SIZE
+        )
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    rows = _filtered_query(db, district, sector, cell, village, after_id).limit(limit).all()
+    headers = {"X-Next-Cursor": str(rows[-1][0])} if len(rows) == limit else None
+    return rows_response(list(BENEFICIARY_FIELDS), rows, headers)
+
+@router.get("/export")
+def export_beneficiaries(
+    format: str = "ndjson",
+    district: Optional[str] = None,
+    sector: Optional[str] = None,
+    cell: Optional[str] = None,
+    village: Optional[str] = None,
+    user: User = Depends(require_official)
+):
+    """
+    Streams the beneficiary registry as NDJSON (default) or CSV.
+
+    Rows are read through a server-side cursor and encoded in batches as
+    they arrive, so memory stays flat regardless of registry size.
+    """
+    names = list(BENEFICIARY_FIELDS)
+
+    def stream_rows(encode):
+        # The stream outlives the request dependencies, so it owns its session
+        db = SessionLocal()
+        try:
+            query = _filtered_query(db, district, sector, cell, village).yield_per(EXPORT_BATCH_SIZE)
+            batch = []
+            for row in query:
+                batch.append(row)
+                if len(batch) >= EXPORT_BATCH_SIZE:
+                    yield encode(batch)
+                    batch = []
+            if batch:
+                yield encode(batch)
+        finally:
+            db.close()
+
+    if format == "csv":
+        def encode_csv(batch):
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(batch)
+            return buffer.getvalue().encode("utf-8")
+
+        def stream_csv():
+            yield encode_csv([names])
+            yield from stream_rows(encode_csv)
+
+        return StreamingResponse(
+            stream_csv(),
+            media_type="text/csv",
+            headers={"Content-Disposition": "attachment; filename=beneficiaries.csv"}
+        )
+
+    return ndjson_response(
+        SessionLocal, lambda stream_db: _filtered_query(stream_db, district, sector, cell, village),
+        names, EXPORT_BATCH_SIZE
+    )
+
+
+# --- Verification at distribution points ---
+@router.get("/verify")
+def verify_beneficiary(
+    code: str,
+    user: User = Depends(require_distribution_staff)
+):
+    """
+    Resolves a scanned QR code or national ID and checks the entitlement window.
+
+    Served from the in-process beneficiary index, without a database query.
+    """
+    return beneficiary_index.verify(code)
+
+@router.post("/verify/receive")
+def record_aid_received(
+    receipt: AidReceipt,
+    db: Session = Depends(get_db),
+    user: User = Depends(require_distribution_staff)
+):
+    """
+    Records that a verified beneficiary collected aid.
+
+    Refuses collections inside the entitlement window (server configuration,
+    AID_ENTITLEMENT_DAYS) and receipts dated in the future.
+    """
+    received_at = receipt.received_at
+    if received_at is not None and received_at.tzinfo is not None:
+        # Stored timestamps are naive UTC
+        received_at = received_at.astimezone(timezone.utc).replace(tzinfo=None)
+    if received_at is not None and received_at > datetime.utcnow():
+        raise HTTPException(status_code=400, detail="received_at cannot be in the future")
+    result = beneficiary_index.verify(receipt.code, now=received_at)
+    if not result["found"]:
+        raise HTTPException(status_code=404, detail="Beneficiary not found")
+    if not result["eligible"]:
+        raise HTTPException(status_code=409, detail="Beneficiary already received aid in this period")
+
+    try:
+        record = beneficiary_index.record_aid_received(db, receipt.code, received_at=received_at)
+    except AlreadyReceivedError:
+        raise HTTPException(status_code=409, detail="Beneficiary already received aid in this period")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if record is None:
+        raise HTTPException(status_code=404, detail="Beneficiary not found")
+
+    audit_service = get_audit_service(db, user)
+    audit_service.log_update(
+        table_name="beneficiaries",
+        record_id=record.beneficiary_id,
+        old_values={"last_aid_received": str(result["beneficiary"]["last_aid_received"])},
+        new_values={"last_aid_received": str(record.last_aid_received)}
+    )
+    return {"status": "recorded", "beneficiary": record.to_dict()}
+
+@router.get("/verify/snapshot")
+def download_verification_snapshot(
+    user: User = Depends(require_distribution_staff)
+):
+    """
+    Downloads a compact, gzip-compressed snapshot for offline verification.
+
+    Entries hold hashed codes only: [key_hash, beneficiary_id, last_aid_received_epoch].
+    The hashes are unsalted and short enough to reverse by brute force over
+    valid codes, so treat the file as personal data.
+    """
+    return Response(
+        content=beneficiary_index.snapshot(),
+        media_type="application/gzip",
+        headers={"Content-Disposition": "attachment; filename=beneficiary_snapshot.json.gz"}
+    )
+
+
+# --- Duplicate registrations ---
+def _run_deduplication(mode: str):
+    # NumPy/pandas load with the engine on the first run, not at startup
+    from app.services.deduplication import deduplication_engine
+
+    # Runs after the response is sent, so it owns its session
+    db = SessionLocal()
+    try:
+        if mode == "full":
+            found = deduplication_engine.run_full(db)
+        else:
+            found = deduplication_engine.run_incremental(db)
+        print(f"Deduplication ({mode}) recorded {found} new candidate pairs: {deduplication_engine.last_stats}")
+    except Exception as e:
+        print(f"Error running deduplication: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+@router.post("/dedupe/run", status_code=202)
+def run_deduplication(
+    background_tasks: BackgroundTasks,
+    mode: str = "incremental",
+    user: User = Depends(require_official)
+):
+    """
+    Starts a duplicate-registration check in the background.
+
+    `incremental` (default) checks only records registered since the last run;
+    `full` re-checks the whole registry.
+    """
+    if mode not in ("incremental", "full"):
+        raise HTTPException(status_code=400, detail="mode must be 'incremental' or 'full'")
+    background_tasks.add_task(_run_deduplication, mode)
+    return {"status": "started", "mode": mode}
+
+@router.get("/duplicates", response_model=List[DuplicateCandidateRead])
+def list_duplicate_candidates(
+    response: Response,
+    status: str = "pending",
+    after_id: Optional[int] = None,
+    limit: int = 100,
+    db: Session = Depends(get_db),
+    user: User = Depends(require_official)
+):
+    """
+    Returns one page of candidate duplicate pairs for review (keyset-paginated).
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    query = db.query(DuplicateCandidate).filter(DuplicateCandidate.status == status)
+    if after_id:
+        query = query.filter(DuplicateCandidate.id > after_id)
+    candidates = query.order_by(DuplicateCandidate.id).limit(limit).all()
+    if len(candidates) == limit:
+        response.headers["X-Next-Cursor"] = str(candidates[-1].id)
+    return candidates
+
+@router.put("/duplicates/{candidate_id}", response_model=DuplicateCandidateRead)
+def review_duplicate_candidate(
+    candidate_id: int,
+    review: DuplicateCandidateReview,
+    db: Session = Depends(get_db),
+    user: User = Depends(require_official)
+):
+    """
+    Confirms or dismisses a candidate duplicate pair.
+    """
+    if review.status not in ("confirmed", "dismissed"):
+        raise HTTPException(status_code=400, detail="status must be 'confirmed' or 'dismissed'")
+    candidate = db.query(DuplicateCandidate).filter(DuplicateCandidate.id == candidate_id).first()
+    if not candidate:
+        raise HTTPException(status_code=404, detail="Duplicate candidate not found")
+
+    old_status = candidate.status
+    candidate.status = review.status
+    candidate.reviewed_by = user.id
+    candidate.reviewed_at = datetime.utcnow()
+    db.commit()
+    db.refresh(candidate)
+
+    audit_service = get_audit_service(db, user)
+    audit_service.log_update(
+        table_name="beneficiary_duplicate_candidates",
+        record_id=candidate.id,
+        old_values={"status": old_status},
+        new_values={"status": candidate.status}
+    )
+    return candidate
@@ -1,35 +1,31 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from app.db_config import get_db
-from app.models import Shipment, Issue, Feedback, AuditTrail, Warehouse, FoodAidItem
+from app.db_config import get_db, SessionLocal
+from app.models import Shipment, Issue, AuditTrail, User
 from sqlalchemy import func
-from typing import List
+from typing import List, Optional
 from datetime import datetime
-from app.routes import dashboard_routes
+from app.services.status_history_service import status_history_service
+from app.services.feedback_search import (
+    feedback_page, issue_page, feedback_export_query, issue_export_query, FEEDBACK_FIELDS, ISSUE_FIELDS, MAX_PAGE_SIZE
+)
+from app.services.audit_service import AUDIT_FIELDS
+from app.utils.fast_json import ndjson_response, rows_response
+from app.utils.auth import require_official
 
 router = APIRouter()
 
 # -------------------- KPI Data --------------------
 @router.get("/kpis")
-def get_kpis(db: Session = Depends(get_db)):
+def get_kpis(db: Session = Depends(get_db), user: User = Depends(require_official)):
     total_dispatched = db.query(func.count(Shipment.id)).scalar()
     total_delivered = db.query(func.count(Shipment.id)).filter(Shipment.status == "Delivered").scalar()
     delayed = db.query(func.count(Shipment.id)).filter(Shipment.status == "Delayed").scalar()
     lost = db.query(func.count(Shipment.id)).filter(Shipment.status == "Lost").scalar()
     issues_reported = db.query(func.count(Issue.issue_id)).filter(Issue.issue_reported == True).scalar()
     
-    # Average transit time in hours
-    shipments_with_time = db.query(Shipment).filter(Shipment.timestamp.isnot(None), Shipment.latitude.isnot(None), Shipment.longitude.isnot(None)).all()
-    avg_transit_time = 0
-    if shipments_with_time:
-        total_hours = 0
-        count = 0
-        for s in shipments_with_time:
-            # Example: using timestamp difference from now (replace with proper delivery time if available)
-            hours = (datetime.utcnow() - s.timestamp).total_seconds() / 3600
-            total_hours += hours
-            count += 1
-        avg_transit_time = total_hours / count if count else 0
+    # Average transit time in hours, from the precomputed status dwell times
+    avg_transit_time = status_history_service.average_transit_hours(db)
 
     delivery_rate = (total_delivered / total_dispatched * 100) if total_dispatched else 0
 
@@ -45,39 +41,91 @@ def get_kpis(db: Session = Depends(get_db)):
 
 
 # -------------------- Shipments with latest location --------------------
+DASHBOARD_SHIPMENT_FIELDS = {
+    "id": Shipment.id,
+    "item_type": Shipment.item_type,
+    "quantity_kg": Shipment.quantity_kg,
+    "origin_id": Shipment.origin_id,
+    "destination_id": Shipment.destination_id,
+    "status": Shipment.status,
+    "priority_level": Shipment.priority_level,
+    "timestamp": Shipment.timestamp,
+    "latitude": Shipment.latitude,
+    "longitude": Shipment.longitude,
+}
+
 @router.get("/shipments")
-def get_shipments(db: Session = Depends(get_db)):
-    shipments = db.query(
-        Shipment.id,
-        Shipment.item_type,
-        Shipment.quantity_kg,
-        Shipment.origin_id,
-        Shipment.destination_id,
-        Shipment.status,
-        Shipment.priority_level,
-        Shipment.timestamp,
-        Shipment.latitude,
-        Shipment.longitude
-    ).all()
-    return shipments
+def get_shipments(format: str = "json", db: Session = Depends(get_db), user: User = Depends(require_official)):
+    # format=ndjson streams rows from a server-side cursor; json encodes row tuples in one pass
+    if format == "ndjson":
+        return ndjson_response(
+            SessionLocal, lambda stream_db: stream_db.query(*DASHBOARD_SHIPMENT_FIELDS.values()).order_by(Shipment.id),
+            list(DASHBOARD_SHIPMENT_FIELDS)
+        )
+    rows = db.query(*DASHBOARD_SHIPMENT_FIELDS.values()).all()
+    return rows_response(list(DASHBOARD_SHIPMENT_FIELDS), rows)
 
 
 # -------------------- Feedbacks --------------------
 @router.get("/feedbacks")
-def get_feedbacks(db: Session = Depends(get_db)):
-    feedbacks = db.query(Feedback).all()
+def get_feedbacks(
+    response: Response,
+    shipment_id: Optional[int] = None,
+    feedback_type: Optional[str] = None,
+    anonymous: Optional[bool] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    q: Optional[str] = None,
+    before_id: Optional[int] = None,
+    limit: int = 50,
+    format: str = "json",
+    db: Session = Depends(get_db),
+    user: User = Depends(require_official)
+):
+    # Keyset-paginated, newest first; next page via X-Next-Cursor -> before_id.
+    # format=ndjson streams every matching row instead of one page.
+    if format == "ndjson":
+        if q:
+            raise HTTPException(status_code=400, detail="q is not supported with format=ndjson")
+        filters = dict(shipment_id=shipment_id, feedback_type=feedback_type, anonymous=anonymous, since=since, until=until)
+        return ndjson_response(
+            SessionLocal, lambda stream_db: feedback_export_query(stream_db, before_id, **filters), list(FEEDBACK_FIELDS)
+        )
+    feedbacks = feedback_page(db, shipment_id, feedback_type, anonymous, since, until, q, before_id, limit)
+    if feedbacks and len(feedbacks) == max(1, min(limit, MAX_PAGE_SIZE)):
+        response.headers["X-Next-Cursor"] = str(feedbacks[-1].id)
     return feedbacks
 
 
 # -------------------- Issues --------------------
 @router.get("/issues")
-def get_issues(db: Session = Depends(get_db)):
-    issues = db.query(Issue).all()
+def get_issues(
+    response: Response,
+    shipment_id: Optional[int] = None,
+    reported: Optional[bool] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+    limit: int = 50,
+    format: str = "json",
+    db: Session = Depends(get_db),
+    user: User = Depends(require_official)
+):
+    # Keyset-paginated, newest first; next page via X-Next-Cursor -> before_id.
+    # format=ndjson streams every matching row instead of one page.
+    if format == "ndjson":
+        filters = dict(shipment_id=shipment_id, reported=reported, since=since, until=until)
+        return ndjson_response(
+            SessionLocal, lambda stream_db: issue_export_query(stream_db, before_id, **filters), list(ISSUE_FIELDS)
+        )
+    issues = issue_page(db, shipment_id, reported, since, until, before_id, limit)
+    if issues and len(issues) == max(1, min(limit, MAX_PAGE_SIZE)):
+        response.headers["X-Next-Cursor"] = str(issues[-1].issue_id)
     return issues
 
 
 # -------------------- Audit Trail --------------------
 @router.get("/audit_trails")
-def get_audit_trails(db: Session = Depends(get_db), limit: int = 5):
-    audits = db.query(AuditTrail).order_by(AuditTrail.timestamp.desc()).limit(limit).all()
-    return audits
+def get_audit_trails(db: Session = Depends(get_db), limit: int = 5, user: User = Depends(require_official)):
+    rows = db.query(*AUDIT_FIELDS.values()).order_by(AuditTrail.timestamp.desc()).limit(limit).all()
+    return rows_response(list(AUDIT_FIELDS), rows)
@@ -1,24 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 from app import models, schemas
 from app.db_config import get_db
 from app.models.user import User
 from app.utils.auth import require_official, get_current_user
+from app.utils.response_cache import reference_cache, table_loader
 
 # Removed prefix here — main.py already adds it
 router = APIRouter(tags=["Distribution Centers"])
 
+load_distribution_centers = table_loader(models.DistributionCenter)
+
 @router.post("/", response_model=schemas.DistributionCenter, status_code=status.HTTP_201_CREATED)
 def create_distribution_center(center: schemas.DistributionCenterCreate, db: Session = Depends(get_db), user: User = Depends(require_official)):
     db_center = models.DistributionCenter(**center.dict())
     db.add(db_center)
     db.commit()
     db.refresh(db_center)
+    reference_cache.bump("distribution_centers")
     return db_center
 
 @router.get("/", response_model=list[schemas.DistributionCenter])
-def get_distribution_centers(db: Session = Depends(get_db), user: User = Depends(get_current_user)) -> list[schemas.DistributionCenter]:
-    return db.query(models.DistributionCenter).all()
+def get_distribution_centers(request: Request, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+    return reference_cache.respond(request, "distribution_centers", db, load_distribution_centers)
 
 @router.get("/{center_id}", response_model=schemas.DistributionCenter)
 def get_distribution_center(center_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)) -> schemas.DistributionCenter:
@@ -34,4 +38,5 @@ def delete_distribution_center(center_id: int, db: Session = Depends(get_db), us
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Distribution center not found")
     db.delete(center)
     db.commit()
+    reference_cache.bump("distribution_centers")
     return None
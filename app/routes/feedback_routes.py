@@ -1,14 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import date, datetime
+from urllib.parse import parse_qs
 
-from app.schemas.feedback import FeedbackCreate, FeedbackRead
+from app.schemas.feedback import FeedbackCreate, FeedbackRead, FeedbackSummaryRow
 from app.models.food_aid import Feedback
 from app.db_config import get_db
 from app.models.user import User
 from app.utils.auth import get_current_user, require_citizen, require_official
 from app.services.sms_service import sms_service
+from app.services.sms_ingest import inbound_sms_worker, fallback_message_id
 from app.services.audit_service import get_audit_service
+from app.services.feedback_search import feedback_page, MAX_PAGE_SIZE
+from app.services.feedback_analytics import feedback_analytics, SUMMARY_GROUPS
 
 router = APIRouter()
 
@@ -63,8 +69,49 @@ def create_feedback_test(feedback: FeedbackCreate, db: Session = Depends(get_db)
 
 
 @router.get("/", response_model=List[FeedbackRead])
-def get_feedbacks(db: Session = Depends(get_db), user: User = Depends(require_official)):
-    return db.query(Feedback).all()
+def get_feedbacks(
+    response: Response,
+    shipment_id: Optional[int] = None,
+    feedback_type: Optional[str] = None,
+    anonymous: Optional[bool] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    q: Optional[str] = None,
+    before_id: Optional[int] = None,
+    limit: int = 50,
+    db: Session = Depends(get_db),
+    user: User = Depends(require_official)
+):
+    """
+    Returns one page of feedback, newest first, optionally filtered and searched.
+
+    `q` searches the comment text (all words must match). Pass the
+    X-Next-Cursor header of the previous page as `before_id` to get the next
+    one; the header is absent on the last page.
+    """
+    feedbacks = feedback_page(db, shipment_id, feedback_type, anonymous, since, until, q, before_id, limit)
+    if feedbacks and len(feedbacks) == max(1, min(limit, MAX_PAGE_SIZE)):
+        response.headers["X-Next-Cursor"] = str(feedbacks[-1].id)
+    return feedbacks
+
+@router.get("/summary", response_model=List[FeedbackSummaryRow])
+def get_feedback_summary(
+    group_by: str = "category",
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    district: Optional[str] = None,
+    shipment_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    user: User = Depends(require_official)
+):
+    """
+    Feedback counts and average sentiment per category, optionally broken
+    down by day, district or shipment. Served from the feedback_summary
+    table, which is kept current in the background.
+    """
+    if group_by not in SUMMARY_GROUPS:
+        raise HTTPException(status_code=400, detail=f"group_by must be one of: {', '.join(sorted(SUMMARY_GROUPS))}")
+    return feedback_analytics.summary(db, group_by, since, until, district, shipment_id)
 
 @router.get("/{feedback_id}", response_model=FeedbackRead)
 def get_feedback(
@@ -82,57 +129,29 @@ def get_feedback(
 async def receive_sms_webhook(request: Request, db: Session = Depends(get_db)):
     """
     Webhook endpoint for receiving SMS messages from Twilio or other SMS providers
+
+    Verifies the provider signature, stores the raw message and acknowledges.
+    Provider retries (same message id) are acknowledged without storing a
+    duplicate; parsing and the feedback insert happen in the ingest worker.
     """
+    raw = await request.body()
+    # Twilio posts form-encoded fields; other gateways may use query parameters
+    params = {key: values[0] for key, values in parse_qs(raw.decode("utf-8")).items()}
+    params = params or dict(request.query_params)
+    from_number = params.get("From", "")
+    message_body = params.get("Body", "")
+
+    if not sms_service.verify_webhook(str(request.url), params, request.headers.get("X-Twilio-Signature", "")):
+        raise HTTPException(status_code=403, detail="Invalid webhook signature")
+
+    message_id = params.get("MessageSid") or params.get("SmsSid") or fallback_message_id(from_number, message_body, raw)
     try:
-        # Get the request body
-        body = await request.body()
-        body_str = body.decode('utf-8')
-        
-        # Parse the incoming data (this depends on your SMS provider)
-        # For Twilio, you would parse the form data
-        from_number = request.query_params.get('From', '')
-        message_body = request.query_params.get('Body', '')
-        
-        # Process the SMS message
-        processed_data = sms_service.receive_sms(from_number, message_body)
-        
-        # Create feedback entry in database
-        feedback_entry = Feedback(
-            shipment_id=processed_data["parsed_feedback"].get("shipment_id"),
-            feedback_type=processed_data["parsed_feedback"].get("status", "general"),
-            comment=f"SMS from {from_number}: {message_body}",
-            anonymous=True,  # SMS feedback is typically anonymous
-        )
-        
-        db.add(feedback_entry)
-        db.commit()
-        db.refresh(feedback_entry)
-        
-        # Log audit trail using system user from database
-        system_user = db.query(User).filter(User.username == "system").first()
-        if not system_user:
-            # Fallback if system user doesn't exist
-            class SystemUser:
-                id = 0
-                username = "system"
-                role = "admin"
-            system_user = SystemUser()
-        
-        audit_service = get_audit_service(db, system_user)
-        audit_service.log_create(
-            table_name="feedbacks",
-            record_id=feedback_entry.id,
-            values={
-                "shipment_id": feedback_entry.shipment_id,
-                "feedback_type": feedback_entry.feedback_type,
-                "comment": feedback_entry.comment,
-                "anonymous": feedback_entry.anonymous,
-                "submitted_at": str(feedback_entry.submitted_at) if feedback_entry.submitted_at else None
-            }
-        )
-        
-        return {"status": "success", "message": "Feedback received and processed"}
+        accepted = await run_in_threadpool(inbound_sms_worker.accept, db, message_id, from_number, message_body)
     except Exception as e:
         print(f"Error processing SMS webhook: {e}")
         db.rollback()
         raise HTTPException(status_code=500, detail="Failed to process SMS webhook")
+
+    if not accepted:
+        return {"status": "duplicate", "message": "Message already received"}
+    return {"status": "accepted", "message": "Feedback received and queued for processing"}
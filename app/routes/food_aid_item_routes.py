@@ -1,24 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 from app import models, schemas
 from app.db_config import get_db
 from app.models.user import User
 from app.utils.auth import require_official, get_current_user
+from app.utils.response_cache import reference_cache, table_loader
 
 # Removed prefix here — main.py will add it
 router = APIRouter(tags=["Food Aid Items"])
 
+load_food_aid_items = table_loader(models.FoodAidItem)
+
 @router.post("/", response_model=schemas.FoodAidItem, status_code=status.HTTP_201_CREATED)
 def create_food_aid_item(item: schemas.FoodAidItemCreate, db: Session = Depends(get_db), user: User = Depends(require_official)):
     db_item = models.FoodAidItem(**item.dict())
     db.add(db_item)
     db.commit()
     db.refresh(db_item)
+    reference_cache.bump("food_aid_items")
     return db_item
 
 @router.get("/", response_model=list[schemas.FoodAidItem])
-def get_food_aid_items(db: Session = Depends(get_db), user: User = Depends(get_current_user)) -> list[schemas.FoodAidItem]:
-    return db.query(models.FoodAidItem).all()
+def get_food_aid_items(request: Request, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+    return reference_cache.respond(request, "food_aid_items", db, load_food_aid_items)
 
 @router.get("/{item_id}", response_model=schemas.FoodAidItem)
 def get_food_aid_item(item_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)) -> schemas.FoodAidItem:
@@ -34,4 +38,5 @@ def delete_food_aid_item(item_id: int, db: Session = Depends(get_db), user: User
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Food aid item not found")
     db.delete(item)
     db.commit()
+    reference_cache.bump("food_aid_items")
     return None
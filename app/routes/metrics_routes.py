@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.utils.metrics import registry
+
+router = APIRouter()
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def get_metrics():
+    """
+    Request and database metrics in Prometheus text format
+    """
+    # PlainTextResponse appends "; charset=utf-8" to text/* types itself
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,80 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from urllib.parse import parse_qs
+
+from app.db_config import get_db
+from app.models.beneficiary import Beneficiary
+from app.models.user import User
+from app.schemas.notification import SMSNotificationCreate, SMSQueueStats
+from app.services.sms_dispatch import sms_dispatcher
+from app.services.sms_service import sms_service
+from app.services.audit_service import get_audit_service
+from app.utils.auth import require_official
+
+# No prefix here — main.py will handle it
+router = APIRouter(tags=["Notifications"])
+
+@router.post("/sms", status_code=202)
+def queue_sms_notification(
+    notification: SMSNotificationCreate,
+    db: Session = Depends(get_db),
+    user: User = Depends(require_official)
+):
+    """
+    Queue an SMS to explicit numbers and/or all beneficiaries in a district/sector
+
+    Returns immediately; messages are sent in the background at the
+    provider's rate limit.
+    """
+    if not notification.phone_numbers and not notification.district:
+        raise HTTPException(status_code=400, detail="Provide phone_numbers or a district")
+
+    def recipients():
+        yield from notification.phone_numbers
+        if notification.district:
+            query = db.query(Beneficiary.phone_number).filter(
+                Beneficiary.district == notification.district,
+                Beneficiary.phone_number.isnot(None)
+            )
+            if notification.sector:
+                query = query.filter(Beneficiary.sector == notification.sector)
+            # Read the numbers up front: the inserts share this connection,
+            # which cannot run while a streaming cursor is open
+            for (phone_number,) in query.all():
+                yield phone_number
+
+    def messages():
+        for phone_number in recipients():
+            key = f"{notification.key}:{phone_number}" if notification.key else None
+            yield phone_number, notification.message, key
+
+    queued = sms_dispatcher.enqueue_many(db, messages())
+
+    audit_service = get_audit_service(db, user)
+    audit_service.log_create(
+        table_name="outbound_messages",
+        record_id=0,
+        values={**notification.dict(exclude={"phone_numbers"}), "recipients_queued": queued}
+    )
+    return {"status": "queued", "queued": queued}
+
+@router.get("/sms/stats", response_model=SMSQueueStats)
+def get_sms_queue_stats(db: Session = Depends(get_db), user: User = Depends(require_official)):
+    return sms_dispatcher.stats(db)
+
+@router.post("/sms/status-callback")
+async def sms_status_callback(request: Request, db: Session = Depends(get_db)):
+    """
+    Delivery report webhook (Twilio StatusCallback, form-encoded)
+    """
+    params = {key: values[0] for key, values in parse_qs((await request.body()).decode("utf-8")).items()}
+    if not sms_service.verify_webhook(str(request.url), params, request.headers.get("X-Twilio-Signature", "")):
+        raise HTTPException(status_code=403, detail="Invalid webhook signature")
+    message_sid = params.get("MessageSid", "")
+    message_status = params.get("MessageStatus", "")
+    if not message_sid or not message_status:
+        raise HTTPException(status_code=400, detail="MessageSid and MessageStatus are required")
+    # Blocking database write; keep it off the event loop
+    await run_in_threadpool(sms_dispatcher.record_delivery_status, db, message_sid, message_status)
+    return {"status": "ok"}
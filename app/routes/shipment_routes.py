@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from typing import List, Optional
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 from datetime import datetime
 
@@ -7,22 +8,49 @@ from app.db_config import get_db
 from app.models.food_aid import Shipment, ScanLog, Warehouse, DistributionCenter, FoodAidItem
 from app.models.user import User
 from app.models.fraud_detection import FraudDetection
+from app.models.status_history import ShipmentStatusHistory
 
 from app.schemas.shipment_schemas import (
     ShipmentCreate,
     ShipmentRead,
+    ShipmentDetail,
     ShipmentUpdate,
     ScanLogCreate,
     ScanLogRead,
+    MapCluster,
 )
+from app.schemas.status_history import StatusHistoryRead, StatusDwellRead
 
 from app.utils.auth import get_current_user, require_distributor, require_official
 from app.services.fraud_detection import fraud_detection_service
 from app.services.audit_service import get_audit_service
+from app.services.status_history_service import status_history_service
+from app.services.alert_engine import alert_engine
+from app.services.tracking_counters import tracking_counters
+from app.services.geo_clustering import geo_clusters
+from app.services.shipment_queries import shipment_detail
+from app.utils.fast_json import rows_response
 
 # Let main.py handle tags
 router = APIRouter()
 
+MAX_PAGE_SIZE = 1000
+
+# ShipmentRead fields for the list endpoint, selected as plain columns
+SHIPMENT_FIELDS = {
+    "aid_item_id": Shipment.aid_item_id,
+    "item_type": Shipment.item_type,
+    "quantity_kg": Shipment.quantity_kg,
+    "origin_id": Shipment.origin_id,
+    "destination_id": Shipment.destination_id,
+    "status": Shipment.status,
+    "priority_level": Shipment.priority_level,
+    "timestamp": Shipment.timestamp,
+    "id": Shipment.id,
+    "latitude": Shipment.latitude,
+    "longitude": Shipment.longitude,
+}
+
 @router.post("/", response_model=ShipmentRead, status_code=status.HTTP_201_CREATED)
 def create_shipment(
     shipment: ShipmentCreate,
@@ -31,12 +59,24 @@ def create_shipment(
 ):
     db_shipment = Shipment(
         aid_item_id=shipment.aid_item_id,
+        item_type=shipment.item_type,
+        quantity_kg=shipment.quantity_kg,
         origin_id=shipment.origin_id,
         destination_id=shipment.destination_id,
         status=shipment.status,
+        priority_level=shipment.priority_level,
         timestamp=shipment.timestamp or datetime.utcnow(),
     )
     db.add(db_shipment)
+    db.flush()
+    status_history_service.record_status_change(
+        db,
+        db_shipment,
+        old_status=None,
+        new_status=db_shipment.status,
+        changed_by=user.username,
+        changed_at=db_shipment.timestamp
+    )
     db.commit()
     db.refresh(db_shipment)
     
@@ -53,6 +93,9 @@ def create_shipment(
             "timestamp": str(shipment.timestamp or datetime.utcnow())
         }
     )
+
+    tracking_counters.on_shipment_created(db_shipment.status)
+    alert_engine.on_status_change(db, db_shipment)
    
     return db_shipment
 
@@ -60,18 +103,71 @@ def create_shipment(
 def list_shipments(
     skip: int = 0,
     limit: int = 100,
+    after_id: Optional[int] = None,
+    since: Optional[datetime] = None,
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
-    return db.query(Shipment).offset(skip).limit(limit).all()
+    """
+    Returns one page of shipments in id order.
+
+    Pass the X-Next-Cursor header of the previous page as `after_id` to get
+    the next one; the header is absent on the last page. `since` restricts
+    the result to shipments created or whose status changed at or after
+    that time, for incremental sync.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    query = db.query(*SHIPMENT_FIELDS.values())
+    if since:
+        changed = db.query(ShipmentStatusHistory.shipment_id).filter(ShipmentStatusHistory.changed_at >= since)
+        query = query.filter(or_(Shipment.timestamp >= since, Shipment.id.in_(changed)))
+    if after_id:
+        query = query.filter(Shipment.id > after_id)
+    query = query.order_by(Shipment.id)
+    if skip and not after_id:
+        query = query.offset(skip)
+    rows = query.limit(limit).all()
+    headers = {"X-Next-Cursor": str(rows[-1].id)} if len(rows) == limit else None
+    return rows_response(list(SHIPMENT_FIELDS), rows, headers)
+
+@router.get("/tracking-summary")
+def get_tracking_summary():
+    """
+    Get summary counts for dashboard KPIs
+
+    Served from in-memory counters, so heavy polling never reaches the database.
+    """
+    return tracking_counters.summary()
+
+@router.get("/map-clusters", response_model=List[MapCluster])
+def get_map_clusters(
+    zoom: float = 7,
+    min_lat: Optional[float] = None,
+    min_lon: Optional[float] = None,
+    max_lat: Optional[float] = None,
+    max_lon: Optional[float] = None,
+    user: User = Depends(get_current_user)
+):
+    """
+    Shipment clusters for the Live Tracking Map at a zoom level
 
-@router.get("/{shipment_id}", response_model=ShipmentRead)
+    Shipments are binned by their latest scan position into a grid that
+    gets finer as the zoom grows. Pass the viewport bounds to receive only
+    the visible clusters.
+    """
+    bounds = None
+    if None not in (min_lat, min_lon, max_lat, max_lon):
+        bounds = (min_lat, min_lon, max_lat, max_lon)
+    return geo_clusters.clusters(zoom, bounds)
+
+@router.get("/{shipment_id}", response_model=ShipmentDetail)
 def get_shipment(
     shipment_id: int,
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
-    shipment = db.query(Shipment).filter(Shipment.id == shipment_id).first()
+    # Item, origin and destination joined in; line items in one more query
+    shipment = shipment_detail(db, shipment_id)
     if not shipment:
         raise HTTPException(status_code=404, detail="Shipment not found")
     return shipment
@@ -99,6 +195,17 @@ def update_shipment(
     for var, value in vars(shipment_update).items():
         if value is not None:
             setattr(shipment, var, value)
+
+    # Record the status change in the same transaction as the update
+    status_changed = shipment.status != old_values["status"]
+    if status_changed:
+        status_history_service.record_status_change(
+            db,
+            shipment,
+            old_status=old_values["status"],
+            new_status=shipment.status,
+            changed_by=user.username
+        )
     db.commit()
     db.refresh(shipment)
     
@@ -117,6 +224,11 @@ def update_shipment(
         old_values=old_values,
         new_values=new_values
     )
+
+    if status_changed:
+        tracking_counters.on_status_changed(old_values["status"], shipment.status)
+        alert_engine.on_status_change(db, shipment)
+        geo_clusters.on_status_change(shipment)
     
     return shipment
 
@@ -141,6 +253,8 @@ def delete_shipment(
     
     db.delete(shipment)
     db.commit()
+    tracking_counters.on_shipment_deleted(old_values["status"])
+    geo_clusters.on_shipment_deleted(shipment_id)
     
     # Log audit trail
     audit_service = get_audit_service(db, user)
@@ -167,6 +281,8 @@ def log_scan(
     scan_log = ScanLog(
         shipment_id=shipment_id,
         location=scan_data.location,
+        checkpoint_lat=scan_data.checkpoint_lat,
+        checkpoint_lon=scan_data.checkpoint_lon,
         scanned_at=scan_data.scanned_at or datetime.utcnow(),
         scanned_by=scan_data.scanned_by or f"user_{user.id}"
     )
@@ -186,6 +302,10 @@ def log_scan(
             "scanned_by": scan_data.scanned_by or f"user_{user.id}"
         }
     )
+
+    tracking_counters.on_scan()
+    alert_engine.on_scan(db, shipment)
+    geo_clusters.on_scan(shipment, scan_log.checkpoint_lat, scan_log.checkpoint_lon)
     
     # Run fraud detection on the shipment
     try:
@@ -212,6 +332,8 @@ def log_scan(
                 "reason": reason
             }
         )
+
+        alert_engine.on_fraud(db, shipment)
     except Exception as e:
         # Log error but don't fail the scan
         print(f"Fraud detection error: {e}")
@@ -243,6 +365,31 @@ def get_fraud_analysis(
         "timestamp": datetime.utcnow()
     }
 
+# --- Status History ---
+@router.get("/{shipment_id}/status-history", response_model=List[StatusHistoryRead])
+def get_status_history(
+    shipment_id: int,
+    since: Optional[datetime] = None,
+    limit: int = 100,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user)
+):
+    """
+    Get the status timeline for a specific shipment, oldest first
+    """
+    return status_history_service.get_timeline(db, shipment_id, since=since, limit=limit)
+
+@router.get("/{shipment_id}/dwell-times", response_model=List[StatusDwellRead])
+def get_dwell_times(
+    shipment_id: int,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user)
+):
+    """
+    Get the time a shipment spent in each status
+    """
+    return status_history_service.get_dwell_times(db, shipment_id)
+
 # --- Audit Trail ---
 @router.get("/{shipment_id}/audit-trail")
 def get_shipment_audit_trail(
@@ -254,9 +401,8 @@ def get_shipment_audit_trail(
     Get audit trail for a specific shipment
     """
     audit_service = get_audit_service(db, user)
-    audit_trail = audit_service.get_audit_trail(
+    names, rows = audit_service.get_audit_trail_rows(
         table_name="shipments",
         record_id=shipment_id
     )
-    
-    return audit_trail
+    return rows_response(names, rows)
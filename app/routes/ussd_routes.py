@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+from urllib.parse import parse_qs
+
+from app.services.ussd import ussd_engine
+
+# No prefix here — main.py will handle it
+router = APIRouter(tags=["USSD"])
+
+@router.post("/callback", response_class=PlainTextResponse)
+async def ussd_callback(request: Request):
+    """
+    USSD gateway callback (form-encoded sessionId, serviceCode, phoneNumber, text)
+
+    Answers each hop with "CON <menu>" to continue or "END <message>" to
+    close the session. Menus are served from memory; shipment lookups are cached.
+    Callbacks must carry the gateway token and/or come from an allowed address
+    (USSD_CALLBACK_TOKEN, USSD_ALLOWED_IPS); anything else is refused.
+    """
+    token = request.headers.get("X-USSD-Token") or request.query_params.get("token", "")
+    client_ip = request.client.host if request.client else ""
+    if not ussd_engine.verify_callback(token, client_ip):
+        return PlainTextResponse("END Unauthorized", status_code=403)
+    params = {key: values[0] for key, values in parse_qs((await request.body()).decode("utf-8")).items()}
+    session_id = params.get("sessionId", "")
+    if not session_id:
+        return PlainTextResponse("END Invalid request", status_code=400)
+    response = await run_in_threadpool(
+        ussd_engine.handle, session_id, params.get("phoneNumber", ""), params.get("text", "")
+    )
+    return PlainTextResponse(response)
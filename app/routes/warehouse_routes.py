@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from typing import List
 
@@ -7,10 +7,13 @@ from app.db_config import get_db
 from app.models import Warehouse as WarehouseModel
 from app.models.user import User
 from app.utils.auth import require_official, get_current_user
+from app.utils.response_cache import reference_cache, table_loader
 
 # No prefix here — main.py will handle it
 router = APIRouter(tags=["Warehouses"])
 
+load_warehouses = table_loader(WarehouseModel)
+
 # Create a warehouse
 @router.post("/", response_model=Warehouse)
 def create_warehouse(warehouse: WarehouseCreate, db: Session = Depends(get_db), user: User = Depends(require_official)):
@@ -18,12 +21,13 @@ def create_warehouse(warehouse: WarehouseCreate, db: Session = Depends(get_db),
     db.add(db_warehouse)
     db.commit()
     db.refresh(db_warehouse)
+    reference_cache.bump("warehouses")
     return db_warehouse
 
-# Get all warehouses
+# Get all warehouses (cached, supports If-None-Match)
 @router.get("/", response_model=List[Warehouse])
-def get_warehouses(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    return db.query(WarehouseModel).all()
+def get_warehouses(request: Request, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+    return reference_cache.respond(request, "warehouses", db, load_warehouses)
 
 # Get single warehouse
 @router.get("/{warehouse_id}", response_model=Warehouse)
@@ -43,6 +47,7 @@ def update_warehouse(warehouse_id: int, warehouse: WarehouseUpdate, db: Session
         setattr(db_warehouse, key, value)
     db.commit()
     db.refresh(db_warehouse)
+    reference_cache.bump("warehouses")
     return db_warehouse
 
 # Delete a warehouse
@@ -53,4 +58,5 @@ def delete_warehouse(warehouse_id: int, db: Session = Depends(get_db), user: Use
         raise HTTPException(status_code=404, detail="Warehouse not found")
     db.delete(warehouse)
     db.commit()
+    reference_cache.bump("warehouses")
     return {"message": "Warehouse deleted successfully"}
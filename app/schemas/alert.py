@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+
+class AlertRead(BaseModel):
+    id: int
+    shipment_id: int
+    alert_type: Optional[str] = None
+    severity: str
+    description: Optional[str] = None
+    resolved: bool
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    resolved_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
+
+class AlertSummary(BaseModel):
+    alert_type: Optional[str] = None
+    severity: str
+    count: int
@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+
+class DuplicateCandidateRead(BaseModel):
+    id: int
+    beneficiary_id_a: int
+    beneficiary_id_b: int
+    score: float
+    block_key: Optional[str] = None
+    status: str
+    detected_at: Optional[datetime] = None
+    reviewed_by: Optional[int] = None
+    reviewed_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
+
+class DuplicateCandidateReview(BaseModel):
+    status: str  # confirmed or dismissed
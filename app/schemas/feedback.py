@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 
 class FeedbackBase(BaseModel):
@@ -14,6 +14,20 @@ class FeedbackCreate(FeedbackBase):
 
 class FeedbackRead(FeedbackBase):
     id: int
+    # SMS and USSD feedback may not reference a known shipment
+    shipment_id: Optional[int] = None
+    feedback_type: Optional[str] = None
+    comment: Optional[str] = None
 
     class Config:
         orm_mode = True
+
+class FeedbackSummaryRow(BaseModel):
+    category: str
+    count: int
+    negative_count: int
+    average_sentiment: float
+    # Set according to group_by
+    day: Optional[date] = None
+    district: Optional[str] = None
+    shipment: Optional[int] = None
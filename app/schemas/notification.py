@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional
+
+
+class SMSNotificationCreate(BaseModel):
+    message: str
+    # Recipients: explicit numbers and/or every beneficiary in a location
+    phone_numbers: List[str] = []
+    district: Optional[str] = None
+    sector: Optional[str] = None
+    # Campaign key; each recipient is messaged at most once per key.
+    # Without one, the same text to the same number is sent at most once a day.
+    key: Optional[str] = None
+
+
+class SMSQueueStats(BaseModel):
+    queued: int
+    sending: int
+    sent: int
+    failed: int
+    oldest_due_at: Optional[datetime] = None
@@ -1,12 +1,15 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
 class ShipmentBase(BaseModel):
     aid_item_id: int
+    item_type: Optional[str] = None
+    quantity_kg: Optional[float] = None
     origin_id: Optional[int] = None
     destination_id: Optional[int] = None
     status: Optional[str] = "dispatched"
+    priority_level: Optional[str] = None
     timestamp: Optional[datetime]
 
 class ShipmentCreate(ShipmentBase):
@@ -14,9 +17,12 @@ class ShipmentCreate(ShipmentBase):
 
 class ShipmentUpdate(BaseModel):
     aid_item_id: Optional[int]
+    item_type: Optional[str]
+    quantity_kg: Optional[float]
     origin_id: Optional[int]
     destination_id: Optional[int]
     status: Optional[str]
+    priority_level: Optional[str]
     timestamp: Optional[datetime]
 
 class ShipmentRead(ShipmentBase):
@@ -27,8 +33,40 @@ class ShipmentRead(ShipmentBase):
     class Config:
         orm_mode = True
 
+class FoodAidItemRef(BaseModel):
+    id: int
+    name: Optional[str]
+
+    class Config:
+        orm_mode = True
+
+class PlaceRef(BaseModel):
+    id: int
+    name: Optional[str]
+    location: Optional[str]
+
+    class Config:
+        orm_mode = True
+
+class ShipmentItemRead(BaseModel):
+    id: int
+    food_aid_item_id: int
+    quantity_kg: Optional[float]
+    food_aid_item: Optional[FoodAidItemRef]
+
+    class Config:
+        orm_mode = True
+
+class ShipmentDetail(ShipmentRead):
+    aid_item: Optional[FoodAidItemRef]
+    origin: Optional[PlaceRef]
+    destination: Optional[PlaceRef]
+    items: List[ShipmentItemRead] = []
+
 class ScanLogBase(BaseModel):
     location: str
+    checkpoint_lat: Optional[float] = None
+    checkpoint_lon: Optional[float] = None
     scanned_at: Optional[datetime]
     scanned_by: Optional[str]
 
@@ -40,4 +78,12 @@ class ScanLogRead(ScanLogBase):
     shipment_id: int
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class MapCluster(BaseModel):
+    latitude: float
+    longitude: float
+    count: int
+    statuses: Dict[str, int]
+    # Shipment id, for single-shipment clusters
+    id: Optional[int] = None
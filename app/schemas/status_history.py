@@ -0,0 +1,28 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+
+class StatusHistoryRead(BaseModel):
+    id: int
+    shipment_id: int
+    old_status: Optional[str] = None
+    new_status: str
+    location: Optional[str] = None
+    changed_by: Optional[str] = None
+    notes: Optional[str] = None
+    changed_at: datetime
+    old_status_seconds: Optional[float] = None
+
+    class Config:
+        orm_mode = True
+
+
+class StatusDwellRead(BaseModel):
+    shipment_id: int
+    status: str
+    total_seconds: float
+    visits: int
+
+    class Config:
+        orm_mode = True
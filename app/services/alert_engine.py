@@ -0,0 +1,457 @@
+import math
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.db_config import SessionLocal
+from app.models.alert import Alert
+from app.models.food_aid import Shipment, ScanLog
+from app.models.fraud_detection import FraudDetection
+from app.models.status_history import ShipmentStatusHistory
+from app.utils.timer_wheel import TimerWheel
+
+
+EPOCH = datetime(1970, 1, 1)
+
+# Statuses after which time-based rules no longer apply
+TERMINAL_STATUSES = {"delivered", "lost", "cancelled"}
+
+# Highest severity first; active alerts are served in this order
+SEVERITY_ORDER = ["danger", "warning", "info"]
+
+# Rough bounding box around Rwanda, with a small margin
+RWANDA_BOUNDS = (-2.9, -1.0, 28.8, 31.0)
+
+
+def _to_seconds(value: datetime) -> float:
+    return (value - EPOCH).total_seconds()
+
+
+def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 6371.0 * 2 * math.asin(math.sqrt(a))
+
+
+class ShipmentContext:
+    """
+    Facts about one shipment that rules evaluate against
+
+    Each fact is loaded on first use with a single indexed query, so an event
+    only pays for the facts its rules actually look at.
+    """
+
+    def __init__(self, db: Session, shipment: Shipment, now: datetime, **known):
+        self.db = db
+        self.shipment = shipment
+        self.now = now
+        self._cache = dict(known)
+
+    def _get(self, name, loader):
+        if name not in self._cache:
+            self._cache[name] = loader()
+        return self._cache[name]
+
+    @property
+    def is_terminal(self) -> bool:
+        return (self.shipment.status or "").lower() in TERMINAL_STATUSES
+
+    @property
+    def recent_scans(self) -> List[ScanLog]:
+        return self._get("recent_scans", lambda: (
+            self.db.query(ScanLog)
+            .filter(ScanLog.shipment_id == self.shipment.id)
+            .order_by(ScanLog.scanned_at.desc(), ScanLog.id.desc())
+            .limit(2)
+            .all()
+        ))
+
+    @property
+    def last_scan_at(self) -> Optional[datetime]:
+        return self._get("last_scan_at", lambda: (
+            self.recent_scans[0].scanned_at if self.recent_scans else None
+        ))
+
+    @property
+    def status_since(self) -> Optional[datetime]:
+        return self._get("status_since", lambda: (
+            self.db.query(func.max(ShipmentStatusHistory.changed_at))
+            .filter(ShipmentStatusHistory.shipment_id == self.shipment.id)
+            .scalar()
+        ) or self.shipment.timestamp)
+
+    @property
+    def latest_fraud(self) -> Optional[FraudDetection]:
+        return self._get("latest_fraud", lambda: (
+            self.db.query(FraudDetection)
+            .filter(FraudDetection.shipment_id == self.shipment.id)
+            .order_by(FraudDetection.detected_at.desc(), FraudDetection.id.desc())
+            .first()
+        ))
+
+
+class AlertRule:
+    """
+    Base class for alert rules
+
+    A rule subscribes to events ("scan", "status", "fraud", "timer") and returns
+    an alert message when its condition holds for the shipment. Time-based rules
+    also return the moment they should be re-checked via next_check().
+    """
+    alert_type = "generic"
+    severity = "warning"
+    events: Tuple[str, ...] = ()
+    auto_resolve = True  # Resolve the open alert once the condition clears
+
+    def evaluate(self, ctx: ShipmentContext) -> Optional[str]:
+        raise NotImplementedError
+
+    def next_check(self, ctx: ShipmentContext) -> Optional[datetime]:
+        return None
+
+
+class StatusRule(AlertRule):
+    events = ("status",)
+
+    def __init__(self, status: str, alert_type: str, severity: str):
+        self.status = status.lower()
+        self.alert_type = alert_type
+        self.severity = severity
+
+    def evaluate(self, ctx: ShipmentContext) -> Optional[str]:
+        if (ctx.shipment.status or "").lower() == self.status:
+            return f"Shipment {ctx.shipment.id} is {ctx.shipment.status}"
+        return None
+
+
+class FraudScoreRule(AlertRule):
+    alert_type = "fraud_score"
+    severity = "danger"
+    events = ("fraud",)
+
+    def __init__(self, threshold: float = 0.7):
+        self.threshold = threshold
+
+    def evaluate(self, ctx: ShipmentContext) -> Optional[str]:
+        detection = ctx.latest_fraud
+        if detection and (detection.is_fraud or detection.score >= self.threshold):
+            return f"Fraud score {detection.score:.2f} for shipment {ctx.shipment.id}: {detection.reason}"
+        return None
+
+
+class OverdueAtCheckpointRule(AlertRule):
+    alert_type = "overdue_at_checkpoint"
+    severity = "warning"
+    events = ("status", "scan", "timer")
+
+    def __init__(self, max_hours: float = 48):
+        self.max_age = timedelta(hours=max_hours)
+
+    def evaluate(self, ctx: ShipmentContext) -> Optional[str]:
+        if ctx.is_terminal or ctx.status_since is None:
+            return None
+        waited = ctx.now - ctx.status_since
+        if waited > self.max_age:
+            hours = waited.total_seconds() / 3600
+            return f"Shipment {ctx.shipment.id} has been '{ctx.shipment.status}' for {hours:.0f} hours"
+        return None
+
+    def next_check(self, ctx: ShipmentContext) -> Optional[datetime]:
+        if ctx.is_terminal or ctx.status_since is None:
+            return None
+        return ctx.status_since + self.max_age
+
+
+class NoScanRule(AlertRule):
+    alert_type = "no_scan"
+    severity = "warning"
+    events = ("scan", "status", "timer")
+
+    def __init__(self, max_hours: float = 24):
+        self.max_age = timedelta(hours=max_hours)
+
+    def _last_seen(self, ctx: ShipmentContext) -> Optional[datetime]:
+        return ctx.last_scan_at or ctx.shipment.timestamp
+
+    def evaluate(self, ctx: ShipmentContext) -> Optional[str]:
+        last_seen = self._last_seen(ctx)
+        if ctx.is_terminal or last_seen is None:
+            return None
+        silent = ctx.now - last_seen
+        if silent > self.max_age:
+            hours = silent.total_seconds() / 3600
+            return f"Shipment {ctx.shipment.id} has not been scanned for {hours:.0f} hours"
+        return None
+
+    def next_check(self, ctx: ShipmentContext) -> Optional[datetime]:
+        last_seen = self._last_seen(ctx)
+        if ctx.is_terminal or last_seen is None:
+            return None
+        return last_seen + self.max_age
+
+
+class RouteDeviationRule(AlertRule):
+    alert_type = "route_deviation"
+    severity = "danger"
+    events = ("scan",)
+    auto_resolve = False  # A deviation already happened; an official has to close it
+
+    def __init__(self, max_speed_kmh: float = 120, bounds: Tuple[float, float, float, float] = RWANDA_BOUNDS):
+        self.max_speed_kmh = max_speed_kmh
+        self.bounds = bounds
+
+    def evaluate(self, ctx: ShipmentContext) -> Optional[str]:
+        scans = [s for s in ctx.recent_scans if s.checkpoint_lat is not None and s.checkpoint_lon is not None]
+        if not scans:
+            return None
+
+        latest = scans[0]
+        min_lat, max_lat, min_lon, max_lon = self.bounds
+        if not (min_lat <= latest.checkpoint_lat <= max_lat and min_lon <= latest.checkpoint_lon <= max_lon):
+            return f"Shipment {ctx.shipment.id} scanned outside the service area at {latest.location}"
+
+        if len(scans) == 2 and latest.scanned_at and scans[1].scanned_at:
+            distance = _haversine_km(
+                scans[1].checkpoint_lat, scans[1].checkpoint_lon,
+                latest.checkpoint_lat, latest.checkpoint_lon
+            )
+            hours = max((latest.scanned_at - scans[1].scanned_at).total_seconds() / 3600, 1 / 60)
+            if distance / hours > self.max_speed_kmh:
+                return (
+                    f"Shipment {ctx.shipment.id} moved {distance:.0f} km in {hours:.1f} hours "
+                    f"between {scans[1].location} and {latest.location}"
+                )
+        return None
+
+
+def default_rules() -> List[AlertRule]:
+    return [
+        StatusRule("Delayed", "status_delayed", "warning"),
+        StatusRule("Lost", "status_lost", "danger"),
+        FraudScoreRule(threshold=0.7),
+        OverdueAtCheckpointRule(max_hours=48),
+        NoScanRule(max_hours=24),
+        RouteDeviationRule(max_speed_kmh=120),
+    ]
+
+
+class AlertEngine:
+    def __init__(self, rules: Optional[List[AlertRule]] = None, tick_seconds: float = 60):
+        self.rules = rules if rules is not None else default_rules()
+        self.timer_wheel = TimerWheel(tick_seconds=tick_seconds, start=_to_seconds(datetime.utcnow()))
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # --- Event hooks ---
+    def on_scan(self, db: Session, shipment: Shipment) -> List[Alert]:
+        return self.evaluate(db, shipment, "scan")
+
+    def on_status_change(self, db: Session, shipment: Shipment) -> List[Alert]:
+        return self.evaluate(db, shipment, "status")
+
+    def on_fraud(self, db: Session, shipment: Shipment) -> List[Alert]:
+        return self.evaluate(db, shipment, "fraud")
+
+    def evaluate(self, db: Session, shipment: Shipment, event: str, now: Optional[datetime] = None) -> List[Alert]:
+        """
+        Evaluate the rules subscribed to an event for a single shipment
+
+        Alerts are deduplicated per (shipment, alert type): an open alert is
+        refreshed rather than duplicated. Errors are logged and never fail the
+        operation that triggered the event.
+        """
+        now = now or datetime.utcnow()
+        ctx = ShipmentContext(db, shipment, now)
+        raised = []
+        try:
+            for rule in self.rules:
+                if event not in rule.events:
+                    continue
+                message = rule.evaluate(ctx)
+                if message:
+                    raised.append(self._raise(db, shipment.id, rule, message, now))
+                elif rule.auto_resolve:
+                    self._resolve_open(db, shipment.id, rule.alert_type, now)
+                self._reschedule(rule, ctx)
+            db.commit()
+        except Exception as e:
+            print(f"Error evaluating alert rules: {e}")
+            db.rollback()
+            return []
+        return raised
+
+    def _raise(self, db: Session, shipment_id: int, rule: AlertRule, message: str, now: datetime) -> Alert:
+        alert = db.query(Alert).filter(
+            Alert.shipment_id == shipment_id,
+            Alert.alert_type == rule.alert_type,
+            Alert.resolved == False
+        ).first()
+        if alert is None:
+            alert = Alert(
+                shipment_id=shipment_id,
+                alert_type=rule.alert_type,
+                severity=rule.severity,
+                description=message,
+                resolved=False,
+                created_at=now,
+                updated_at=now
+            )
+            db.add(alert)
+        else:
+            alert.description = message
+            alert.severity = rule.severity
+            alert.updated_at = now
+        return alert
+
+    def _resolve_open(self, db: Session, shipment_id: int, alert_type: str, now: datetime):
+        db.query(Alert).filter(
+            Alert.shipment_id == shipment_id,
+            Alert.alert_type == alert_type,
+            Alert.resolved == False
+        ).update({"resolved": True, "resolved_at": now}, synchronize_session=False)
+
+    def _reschedule(self, rule: AlertRule, ctx: ShipmentContext, include_overdue: bool = False):
+        if "timer" not in rule.events:
+            return
+        key = (ctx.shipment.id, rule.alert_type)
+        check_at = rule.next_check(ctx)
+        if check_at is not None and include_overdue:
+            check_at = max(check_at, ctx.now)
+        if check_at is None or (check_at <= ctx.now and not include_overdue):
+            self.timer_wheel.cancel(key)
+        else:
+            self.timer_wheel.schedule(key, _to_seconds(check_at), payload=ctx.shipment.id)
+
+    # --- Time-based rules ---
+    def warm_up(self, db: Session, now: Optional[datetime] = None):
+        """
+        Schedule time-based checks for every open shipment
+
+        Uses one aggregate query for the last scan and one for the last status
+        change instead of loading each shipment's history.
+        """
+        now = now or datetime.utcnow()
+        last_scans = dict(
+            db.query(ScanLog.shipment_id, func.max(ScanLog.scanned_at))
+            .group_by(ScanLog.shipment_id)
+            .all()
+        )
+        status_changes = dict(
+            db.query(ShipmentStatusHistory.shipment_id, func.max(ShipmentStatusHistory.changed_at))
+            .group_by(ShipmentStatusHistory.shipment_id)
+            .all()
+        )
+        open_shipments = db.query(Shipment).filter(
+            func.lower(Shipment.status).notin_(TERMINAL_STATUSES)
+        ).all()
+        for shipment in open_shipments:
+            ctx = ShipmentContext(
+                db, shipment, now,
+                last_scan_at=last_scans.get(shipment.id),
+                status_since=status_changes.get(shipment.id) or shipment.timestamp
+            )
+            for rule in self.rules:
+                # Shipments that are already overdue fire on the next tick
+                self._reschedule(rule, ctx, include_overdue=True)
+
+    def process_due_timers(self, now: Optional[datetime] = None) -> int:
+        """
+        Fire due timers and re-evaluate the affected shipments
+
+        Returns the number of shipments evaluated.
+        """
+        now = now or datetime.utcnow()
+        due = self.timer_wheel.advance(_to_seconds(now))
+        shipment_ids = {payload for _, payload in due}
+        if not shipment_ids:
+            return 0
+
+        db = SessionLocal()
+        try:
+            shipments = db.query(Shipment).filter(Shipment.id.in_(shipment_ids)).all()
+            for shipment in shipments:
+                self.evaluate(db, shipment, "timer", now=now)
+        finally:
+            db.close()
+        return len(shipment_ids)
+
+    def start(self):
+        """
+        Warm up timers and start the background thread that advances the wheel
+        """
+        if self._thread is not None:
+            return
+        db = SessionLocal()
+        try:
+            self.warm_up(db)
+        except Exception as e:
+            print(f"Error warming up alert engine: {e}")
+        finally:
+            db.close()
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="alert-engine", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.timer_wheel.tick_seconds):
+            try:
+                self.process_due_timers()
+            except Exception as e:
+                print(f"Error processing alert timers: {e}")
+
+    # --- Queries ---
+    def get_active_alerts(self, db: Session, severity: Optional[str] = None, limit: int = 100) -> List[Alert]:
+        """
+        Return unresolved alerts, most severe and most recent first
+
+        Each severity is read with its own range scan on (resolved, severity).
+        """
+        severities = [severity] if severity else SEVERITY_ORDER
+        alerts: List[Alert] = []
+        for level in severities:
+            remaining = limit - len(alerts)
+            if remaining <= 0:
+                break
+            alerts.extend(
+                db.query(Alert)
+                .filter(Alert.resolved == False, Alert.severity == level)
+                .order_by(Alert.created_at.desc())
+                .limit(remaining)
+                .all()
+            )
+        return alerts
+
+    def get_summary(self, db: Session) -> List[Dict]:
+        """
+        Count unresolved alerts per type and severity
+        """
+        rows = db.query(Alert.alert_type, Alert.severity, func.count(Alert.id)).filter(
+            Alert.resolved == False
+        ).group_by(Alert.alert_type, Alert.severity).all()
+        return [
+            {"alert_type": alert_type, "severity": severity, "count": count}
+            for alert_type, severity, count in rows
+        ]
+
+    def resolve(self, db: Session, alert_id: int) -> Optional[Alert]:
+        alert = db.query(Alert).filter(Alert.id == alert_id).first()
+        if alert is None:
+            return None
+        if not alert.resolved:
+            alert.resolved = True
+            alert.resolved_at = datetime.utcnow()
+            db.commit()
+            db.refresh(alert)
+        return alert
+
+
+# Global instance
+alert_engine = AlertEngine()
@@ -5,6 +5,10 @@ from app.models.user import User
 from typing import Dict, Any, Optional
 
 
+# Audit trail columns for list endpoints, in output order
+AUDIT_FIELDS = {column.name: column for column in AuditTrail.__table__.columns}
+
+
 class AuditService:
     def __init__(self, db: Session, user: User):
         self.db = db
@@ -95,6 +99,19 @@ class AuditService:
             
         return query.order_by(AuditTrail.timestamp.desc()).limit(limit).all()
 
+    def get_audit_trail_rows(self, table_name: str = None, record_id: int = None, limit: int = 100):
+        """
+        Same entries as get_audit_trail, as (column names, row tuples)
+
+        Skips ORM instantiation for responses that are encoded directly.
+        """
+        query = self.db.query(*AUDIT_FIELDS.values())
+        if table_name:
+            query = query.filter(AuditTrail.table_name == table_name)
+        if record_id:
+            query = query.filter(AuditTrail.record_id == record_id)
+        return list(AUDIT_FIELDS), query.order_by(AuditTrail.timestamp.desc()).limit(limit).all()
+
 
 # Helper function to create audit service instance
 def get_audit_service(db: Session, user: User):
@@ -0,0 +1,340 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from app.db_config import SessionLocal
+from app.models.beneficiary import Beneficiary
+
+
+EPOCH = datetime(1970, 1, 1)
+
+# Days a beneficiary has to wait between two aid collections. Server configuration only:
+# a client-chosen window would let the same beneficiary collect twice.
+DEFAULT_ENTITLEMENT_DAYS = int(os.getenv("AID_ENTITLEMENT_DAYS", "30"))
+
+# Length of the hashed keys in the offline snapshot (hex characters)
+SNAPSHOT_KEY_LENGTH = 16
+
+
+class AlreadyReceivedError(Exception):
+    """
+    The beneficiary collected aid inside the entitlement window
+    """
+
+    def __init__(self, next_eligible_at: datetime):
+        super().__init__(f"Not eligible before {next_eligible_at}")
+        self.next_eligible_at = next_eligible_at
+
+
+def normalize_code(code: str) -> str:
+    """
+    Normalize a scanned QR code or typed national ID for lookups
+    """
+    return "".join(code.split()).upper()
+
+
+def hash_code(code: str) -> str:
+    return hashlib.sha256(normalize_code(code).encode("utf-8")).hexdigest()[:SNAPSHOT_KEY_LENGTH]
+
+
+class BeneficiaryRecord:
+    __slots__ = ("beneficiary_id", "first_name", "last_name", "village", "cell", "sector", "district",
+                 "national_id", "qr_code", "last_aid_received")
+
+    def __init__(self, row):
+        (self.beneficiary_id, self.first_name, self.last_name, self.village, self.cell, self.sector,
+         self.district, self.national_id, self.qr_code, self.last_aid_received) = row
+
+    def keys(self) -> List[str]:
+        return [normalize_code(code) for code in (self.national_id, self.qr_code) if code]
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.beneficiary_id,
+            "first_name": self.first_name,
+            "last_name": self.last_name,
+            "village": self.village,
+            "cell": self.cell,
+            "sector": self.sector,
+            "district": self.district,
+            "last_aid_received": self.last_aid_received,
+        }
+
+
+INDEX_COLUMNS = [
+    Beneficiary.beneficiary_id,
+    Beneficiary.first_name,
+    Beneficiary.last_name,
+    Beneficiary.village,
+    Beneficiary.cell,
+    Beneficiary.sector,
+    Beneficiary.district,
+    Beneficiary.national_id,
+    Beneficiary.qr_code,
+    Beneficiary.last_aid_received,
+]
+
+
+class BeneficiaryIndex:
+    """
+    In-process hash index from QR code / national ID to beneficiary
+
+    Verification at a distribution point is a dict lookup, not a query. The
+    index is warmed with one column query at startup and refreshed
+    incrementally: new registrations are picked up by id watermark, and aid
+    collections by last_aid_received watermark. Every sweep_seconds a refresh
+    also reads the (id, national_id, qr_code) columns of the whole table to
+    drop deleted beneficiaries and reload changed codes. Collections recorded
+    through this service update the index immediately, and the database, not
+    the index, decides whether a collection is inside the window.
+    """
+
+    def __init__(self, refresh_seconds: float = 60, sweep_seconds: float = 600):
+        self.refresh_seconds = refresh_seconds
+        self.sweep_seconds = sweep_seconds
+        self._last_sweep: Optional[datetime] = None
+        self._by_key: Dict[str, BeneficiaryRecord] = {}
+        self._by_id: Dict[int, BeneficiaryRecord] = {}
+        self._max_id = 0
+        self._aid_watermark: Optional[datetime] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def _put(self, record: BeneficiaryRecord):
+        previous = self._by_id.get(record.beneficiary_id)
+        if previous is not None:
+            for key in previous.keys():
+                self._by_key.pop(key, None)
+        self._by_id[record.beneficiary_id] = record
+        for key in record.keys():
+            self._by_key[key] = record
+        self._max_id = max(self._max_id, record.beneficiary_id)
+        if record.last_aid_received and (self._aid_watermark is None or record.last_aid_received > self._aid_watermark):
+            self._aid_watermark = record.last_aid_received
+
+    def warm(self, db: Session):
+        """
+        Load every beneficiary that has a QR code or national ID
+
+        The new index is built aside and swapped in, so lookups keep working
+        while it loads.
+        """
+        query = db.query(*INDEX_COLUMNS).filter(
+            or_(Beneficiary.national_id.isnot(None), Beneficiary.qr_code.isnot(None))
+        ).yield_per(5000)
+        fresh = BeneficiaryIndex(self.refresh_seconds)
+        for row in query:
+            fresh._put(BeneficiaryRecord(row))
+        with self._lock:
+            self._by_key = fresh._by_key
+            self._by_id = fresh._by_id
+            self._max_id = fresh._max_id
+            self._aid_watermark = fresh._aid_watermark
+            self._last_sweep = datetime.utcnow()
+
+    def _remove(self, beneficiary_id: int):
+        record = self._by_id.pop(beneficiary_id, None)
+        if record is not None:
+            for key in record.keys():
+                if self._by_key.get(key) is record:
+                    del self._by_key[key]
+
+    def sweep(self, db: Session) -> int:
+        """
+        Drop deleted beneficiaries and reload those whose national_id or qr_code changed
+
+        Returns the number of records removed or reloaded.
+        """
+        current = {
+            beneficiary_id: (national_id, qr_code)
+            for beneficiary_id, national_id, qr_code in db.query(
+                Beneficiary.beneficiary_id, Beneficiary.national_id, Beneficiary.qr_code
+            ).filter(or_(Beneficiary.national_id.isnot(None), Beneficiary.qr_code.isnot(None))).yield_per(20000)
+        }
+        with self._lock:
+            removed = [beneficiary_id for beneficiary_id in self._by_id if beneficiary_id not in current]
+            changed = [
+                beneficiary_id for beneficiary_id, record in self._by_id.items()
+                if beneficiary_id in current and current[beneficiary_id] != (record.national_id, record.qr_code)
+            ]
+            # Rows below the id watermark that gained a code since they were last read
+            changed.extend(beneficiary_id for beneficiary_id in current
+                           if beneficiary_id <= self._max_id and beneficiary_id not in self._by_id)
+
+        rows = []
+        for start in range(0, len(changed), 1000):
+            rows.extend(db.query(*INDEX_COLUMNS).filter(
+                Beneficiary.beneficiary_id.in_(changed[start:start + 1000])
+            ).all())
+        with self._lock:
+            for beneficiary_id in removed:
+                self._remove(beneficiary_id)
+            for row in rows:
+                self._put(BeneficiaryRecord(row))
+            self._last_sweep = datetime.utcnow()
+        return len(removed) + len(rows)
+
+    def refresh(self, db: Session) -> int:
+        """
+        Pick up new registrations and aid collections since the last refresh,
+        plus deletions and changed codes when a sweep is due
+
+        Returns the number of records added, updated or removed.
+        """
+        swept = 0
+        if self._last_sweep is None or datetime.utcnow() - self._last_sweep >= timedelta(seconds=self.sweep_seconds):
+            swept = self.sweep(db)
+
+        changed = Beneficiary.beneficiary_id > self._max_id
+        if self._aid_watermark is not None:
+            changed = or_(changed, Beneficiary.last_aid_received > self._aid_watermark)
+        rows = db.query(*INDEX_COLUMNS).filter(
+            changed,
+            or_(Beneficiary.national_id.isnot(None), Beneficiary.qr_code.isnot(None))
+        ).all()
+        with self._lock:
+            for row in rows:
+                self._put(BeneficiaryRecord(row))
+        return swept + len(rows)
+
+    def lookup(self, code: str) -> Optional[BeneficiaryRecord]:
+        return self._by_key.get(normalize_code(code))
+
+    def verify(self, code: str, now: Optional[datetime] = None) -> Dict:
+        """
+        Resolve a scanned code and check it against the entitlement window
+        """
+        now = now or datetime.utcnow()
+        record = self.lookup(code)
+        if record is None:
+            return {"found": False, "eligible": False, "beneficiary": None, "next_eligible_at": None}
+
+        next_eligible_at = None
+        if record.last_aid_received is not None:
+            next_eligible_at = record.last_aid_received + timedelta(days=DEFAULT_ENTITLEMENT_DAYS)
+        eligible = next_eligible_at is None or now >= next_eligible_at
+        return {
+            "found": True,
+            "eligible": eligible,
+            "beneficiary": record.to_dict(),
+            "next_eligible_at": None if eligible else next_eligible_at,
+        }
+
+    def record_aid_received(
+        self,
+        db: Session,
+        code: str,
+        received_at: Optional[datetime] = None
+    ) -> Optional[BeneficiaryRecord]:
+        """
+        Persist an aid collection and update the index in place
+
+        The window is checked by the UPDATE itself, so two distribution points
+        or two workers with stale indexes cannot both accept the same
+        beneficiary. received_at may be in the past (collections recorded
+        offline and synced later) but never in the future, which would push
+        the window out and lock out the real collection. Returns None if the
+        beneficiary does not exist, raises AlreadyReceivedError inside the
+        window and ValueError for a future received_at.
+        """
+        now = datetime.utcnow()
+        received_at = received_at or now
+        if received_at > now:
+            raise ValueError("received_at is in the future")
+        record = self.lookup(code)
+        if record is None:
+            return None
+        cutoff = received_at - timedelta(days=DEFAULT_ENTITLEMENT_DAYS)
+        updated = db.query(Beneficiary).filter(
+            Beneficiary.beneficiary_id == record.beneficiary_id,
+            or_(Beneficiary.last_aid_received.is_(None), Beneficiary.last_aid_received <= cutoff)
+        ).update({"last_aid_received": received_at}, synchronize_session=False)
+        if updated == 0:
+            db.rollback()
+            # Deleted, or collected elsewhere since this index last saw it
+            current = db.query(Beneficiary.last_aid_received).filter(
+                Beneficiary.beneficiary_id == record.beneficiary_id
+            ).first()
+            with self._lock:
+                if current is None:
+                    self._remove(record.beneficiary_id)
+                    return None
+                record.last_aid_received = current[0]
+            raise AlreadyReceivedError(current[0] + timedelta(days=DEFAULT_ENTITLEMENT_DAYS))
+        db.commit()
+        with self._lock:
+            record.last_aid_received = received_at
+            if self._aid_watermark is None or received_at > self._aid_watermark:
+                self._aid_watermark = received_at
+        return record
+
+    def snapshot(self) -> bytes:
+        """
+        Build a gzip-compressed snapshot for offline verification on a device
+
+        Keys are unsalted SHA-256 hashes of the normalized codes, truncated to
+        64 bits, so the snapshot carries no names or ID numbers in clear. It is
+        not anonymous: national IDs and QR codes are short and structured, so
+        every key can be recovered by hashing candidate codes. Distribute it
+        only to enrolled devices, like the registry itself. Each entry is
+        [key_hash, beneficiary_id, last_aid_received as epoch seconds or 0].
+        """
+        with self._lock:
+            entries: List[Tuple[str, int, int]] = []
+            for key, record in self._by_key.items():
+                last_aid = int((record.last_aid_received - EPOCH).total_seconds()) if record.last_aid_received else 0
+                entries.append((hash_code(key), record.beneficiary_id, last_aid))
+        payload = {
+            "generated_at": int((datetime.utcnow() - EPOCH).total_seconds()),
+            "window_days": DEFAULT_ENTITLEMENT_DAYS,
+            "key_hash": f"sha256[:{SNAPSHOT_KEY_LENGTH}]",
+            "entries": entries,
+        }
+        return gzip.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+
+    def start(self):
+        """
+        Warm the index and start the incremental refresh thread
+        """
+        if self._thread is not None:
+            return
+        db = SessionLocal()
+        try:
+            self.warm(db)
+        except Exception as e:
+            print(f"Error warming beneficiary index: {e}")
+        finally:
+            db.close()
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="beneficiary-index", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.refresh_seconds):
+            db = SessionLocal()
+            try:
+                self.refresh(db)
+            except Exception as e:
+                print(f"Error refreshing beneficiary index: {e}")
+            finally:
+                db.close()
+
+
+# Global instance
+beneficiary_index = BeneficiaryIndex()
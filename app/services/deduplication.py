@@ -0,0 +1,313 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import bindparam, insert
+from sqlalchemy.orm import Session
+from app.models.beneficiary import Beneficiary
+from app.models.duplicate_candidate import DuplicateCandidate
+
+
+SOUNDEX_CODES = {
+    letter: digit
+    for digit, letters in {"1": "BFPV", "2": "CGJKQSXZ", "3": "DT", "4": "L", "5": "MN", "6": "R"}.items()
+    for letter in letters
+}
+
+# Full names are compared as hashed character-bigram vectors of this size
+NAME_WIDTH = 40
+NAME_DIMS = 64
+
+REGISTRY_COLUMNS = [
+    Beneficiary.beneficiary_id,
+    Beneficiary.first_name,
+    Beneficiary.last_name,
+    Beneficiary.date_of_birth,
+    Beneficiary.phone_number,
+    Beneficiary.village,
+    Beneficiary.cell,
+    Beneficiary.district,
+]
+
+
+@lru_cache(maxsize=200_000)
+def soundex(name: str) -> str:
+    """
+    American Soundex code of a surname (e.g. "Uwimana" -> "U550")
+    """
+    letters = [c for c in (name or "").upper() if "A" <= c <= "Z"]
+    if not letters:
+        return "0000"
+    code = letters[0]
+    last = SOUNDEX_CODES.get(letters[0], "")
+    for letter in letters[1:]:
+        digit = SOUNDEX_CODES.get(letter, "")
+        if digit and digit != last:
+            code += digit
+            if len(code) == 4:
+                break
+        if letter not in "HW":
+            last = digit
+    return (code + "000")[:4]
+
+
+def block_keys(frame: pd.DataFrame) -> pd.Series:
+    """
+    Blocking key per record: district | soundex(last name) | birth year
+
+    Soundex is computed once per distinct surname, which keeps this fast even
+    for millions of records sharing a few thousand surnames.
+    """
+    surnames, inverse = np.unique(frame["last_name"].fillna("").astype(str).values, return_inverse=True)
+    surname_codes = np.array([soundex(name) for name in surnames], dtype=object)[inverse]
+    years = pd.to_datetime(frame["date_of_birth"], errors="coerce").dt.year
+    years = years.astype("Int64").astype(str).replace("<NA>", "")
+    districts = frame["district"].fillna("").astype(str).str.strip().str.lower()
+    return districts + "|" + pd.Series(surname_codes, index=frame.index) + "|" + years
+
+
+def name_vectors(names: np.ndarray) -> np.ndarray:
+    """
+    L2-normalized hashed bigram count vectors for an array of names
+    """
+    encoded = np.char.encode(np.char.upper(names.astype(f"U{NAME_WIDTH}")), "ascii", "ignore")
+    chars = encoded.astype(f"S{NAME_WIDTH}").view(np.uint8).reshape(len(names), NAME_WIDTH).astype(np.int32)
+    first, second = chars[:, :-1], chars[:, 1:]
+    valid = (first != 0) & (second != 0)
+    buckets = (first * 31 + second) % NAME_DIMS
+    rows = np.broadcast_to(np.arange(len(names))[:, None], buckets.shape)
+    flat = rows[valid] * NAME_DIMS + buckets[valid]
+    counts = np.bincount(flat, minlength=len(names) * NAME_DIMS).reshape(len(names), NAME_DIMS).astype(np.float32)
+    norms = np.linalg.norm(counts, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return counts / norms
+
+
+def _normalized_phones(phones: pd.Series) -> np.ndarray:
+    # Compare on the last 9 digits so "+250 788..." and "0788..." match
+    return phones.fillna("").astype(str).str.replace(r"\D", "", regex=True).str[-9:].values
+
+
+class DeduplicationEngine:
+    """
+    Finds beneficiaries registered more than once
+
+    Records are only compared within a block (same district, phonetically
+    similar surname and same birth year), which turns an all-pairs problem
+    into many tiny ones. Pairs are generated and scored with NumPy over whole
+    arrays rather than per block in Python.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        max_block_size: int = 200,
+        pair_chunk_size: int = 250_000,
+        weights: Optional[Dict[str, float]] = None
+    ):
+        self.threshold = threshold
+        self.max_block_size = max_block_size
+        self.pair_chunk_size = pair_chunk_size
+        self.weights = weights or {"name": 0.55, "dob": 0.2, "phone": 0.15, "cell": 0.1}
+        self.last_stats: Dict[str, float] = {}
+
+    # --- Core (in-memory) ---
+    def candidate_pairs(self, keys: pd.Series, new_mask: Optional[np.ndarray] = None) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Yield (left, right) positional index arrays of records sharing a block
+
+        Records are sorted by block; comparing each record with the one d
+        positions ahead, for d = 1, 2, ..., enumerates every in-block pair in
+        one vectorized pass per d. Oversized blocks are skipped (and counted),
+        since they usually mean a missing surname or birth date.
+        """
+        codes, _ = pd.factorize(keys)
+        sizes = np.bincount(codes)
+        oversized = sizes[codes] > self.max_block_size
+        self.last_stats["skipped_records"] = int(oversized.sum())
+        # Give skipped records unique negative codes so they never pair up
+        codes = codes.astype(np.int64)
+        codes[oversized] = -1 - np.arange(int(oversized.sum()))
+
+        order = np.argsort(codes, kind="stable")
+        sorted_codes = codes[order]
+        is_new = None if new_mask is None else new_mask[order]
+        for distance in range(1, self.max_block_size):
+            same = sorted_codes[:-distance] == sorted_codes[distance:]
+            if not same.any():
+                # No block is larger than this distance
+                break
+            if is_new is not None:
+                same &= is_new[:-distance] | is_new[distance:]
+            left, right = order[:-distance][same], order[distance:][same]
+            for start in range(0, len(left), self.pair_chunk_size):
+                yield left[start:start + self.pair_chunk_size], right[start:start + self.pair_chunk_size]
+
+    def score_pairs(self, left: np.ndarray, right: np.ndarray, prepared: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Similarity score (0-1) for each (left, right) pair of positions
+        """
+        involved, positions = np.unique(np.concatenate([left, right]), return_inverse=True)
+        vectors = name_vectors(prepared["full_name"][involved])
+        left_vec, right_vec = vectors[positions[:len(left)]], vectors[positions[len(left):]]
+        name_score = np.einsum("ij,ij->i", left_vec, right_vec)
+
+        dob = prepared["dob"]
+        dob_known = (dob[left] >= 0) & (dob[right] >= 0)
+        dob_score = np.where(dob_known, (dob[left] == dob[right]).astype(np.float32), 0.5)
+
+        phone = prepared["phone"]
+        phone_known = (phone[left] != "") & (phone[right] != "")
+        phone_score = np.where(phone_known, (phone[left] == phone[right]).astype(np.float32), 0.5)
+
+        cell = prepared["cell"]
+        cell_score = (cell[left] == cell[right]).astype(np.float32)
+
+        w = self.weights
+        return w["name"] * name_score + w["dob"] * dob_score + w["phone"] * phone_score + w["cell"] * cell_score
+
+    def _prepare(self, frame: pd.DataFrame) -> Dict[str, np.ndarray]:
+        dob = pd.to_datetime(frame["date_of_birth"], errors="coerce")
+        return {
+            "full_name": (frame["first_name"].fillna("").astype(str) + " " + frame["last_name"].fillna("").astype(str)).values,
+            "dob": np.where(dob.isna(), -1, dob.values.astype("datetime64[D]").astype(np.int64)),
+            "phone": _normalized_phones(frame["phone_number"]),
+            "cell": frame["cell"].fillna("").astype(str).str.strip().str.lower().values,
+        }
+
+    def find_duplicates(self, frame: pd.DataFrame, keys: Optional[pd.Series] = None, new_mask: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """
+        Return candidate duplicate pairs scoring at or above the threshold
+
+        Args:
+            frame: Registry records (REGISTRY_COLUMNS), one row per beneficiary
+            keys: Precomputed blocking keys (computed if omitted)
+            new_mask: If given, only pairs involving at least one new record are scored
+
+        Returns:
+            DataFrame with beneficiary_id_a < beneficiary_id_b, score and block_key
+        """
+        frame = frame.reset_index(drop=True)
+        keys = block_keys(frame) if keys is None else keys.reset_index(drop=True)
+        prepared = self._prepare(frame)
+        ids = frame["beneficiary_id"].values
+        key_values = keys.values
+
+        started = datetime.utcnow()
+        compared = 0
+        found: List[pd.DataFrame] = []
+        for left, right in self.candidate_pairs(keys, new_mask):
+            compared += len(left)
+            scores = self.score_pairs(left, right, prepared)
+            hits = scores >= self.threshold
+            if hits.any():
+                a, b = ids[left[hits]], ids[right[hits]]
+                found.append(pd.DataFrame({
+                    "beneficiary_id_a": np.minimum(a, b),
+                    "beneficiary_id_b": np.maximum(a, b),
+                    "score": scores[hits].round(4),
+                    "block_key": key_values[left[hits]],
+                }))
+
+        elapsed = (datetime.utcnow() - started).total_seconds()
+        self.last_stats.update({
+            "records": len(frame),
+            "pairs_compared": compared,
+            "seconds": elapsed,
+            "records_per_second": len(frame) / elapsed if elapsed else 0.0,
+        })
+        if not found:
+            return pd.DataFrame(columns=["beneficiary_id_a", "beneficiary_id_b", "score", "block_key"])
+        return pd.concat(found, ignore_index=True)
+
+    # --- Database ---
+    def _load(self, db: Session, query) -> pd.DataFrame:
+        return pd.read_sql(query.statement, db.connection())
+
+    def run_full(self, db: Session) -> int:
+        """
+        Deduplicate the whole registry and store every record's blocking key
+
+        Returns the number of new candidate pairs (pairs already on record are not counted).
+        """
+        frame = self._load(db, db.query(*REGISTRY_COLUMNS))
+        keys = block_keys(frame)
+        pairs = self.find_duplicates(frame, keys)
+        self._store_keys(db, frame["beneficiary_id"].values, keys.values)
+        return self._write_candidates(db, pairs)
+
+    def run_incremental(self, db: Session) -> int:
+        """
+        Check new registrations (records without a blocking key yet)
+
+        New records are compared against each other and against the existing
+        records in the blocks they fall into, loaded through the dedupe_key index.
+        """
+        new = self._load(db, db.query(*REGISTRY_COLUMNS).filter(Beneficiary.dedupe_key.is_(None)))
+        if new.empty:
+            return 0
+        new_keys = block_keys(new)
+
+        existing_frames = []
+        distinct_keys = new_keys.unique().tolist()
+        for start in range(0, len(distinct_keys), 1000):
+            existing_frames.append(self._load(db, db.query(*REGISTRY_COLUMNS, Beneficiary.dedupe_key).filter(
+                Beneficiary.dedupe_key.in_(distinct_keys[start:start + 1000])
+            )))
+        existing = pd.concat(existing_frames, ignore_index=True)
+
+        frame = pd.concat([new, existing.drop(columns=["dedupe_key"])], ignore_index=True)
+        keys = pd.concat([new_keys, existing["dedupe_key"]], ignore_index=True)
+        new_mask = np.zeros(len(frame), dtype=bool)
+        new_mask[:len(new)] = True
+
+        pairs = self.find_duplicates(frame, keys, new_mask)
+        self._store_keys(db, new["beneficiary_id"].values, new_keys.values)
+        return self._write_candidates(db, pairs)
+
+    def _store_keys(self, db: Session, ids: np.ndarray, keys: np.ndarray, chunk_size: int = 5000):
+        table = Beneficiary.__table__
+        statement = table.update().where(table.c.beneficiary_id == bindparam("b_id")).values(dedupe_key=bindparam("b_key"))
+        for start in range(0, len(ids), chunk_size):
+            db.execute(statement, [
+                {"b_id": int(beneficiary_id), "b_key": key}
+                for beneficiary_id, key in zip(ids[start:start + chunk_size], keys[start:start + chunk_size])
+            ])
+        db.commit()
+
+    def _write_candidates(self, db: Session, pairs: pd.DataFrame, chunk_size: int = 5000) -> int:
+        """
+        Insert candidate pairs for review, skipping pairs already recorded
+
+        Returns the number of pairs actually inserted.
+        """
+        self.last_stats["pairs_found"] = len(pairs)
+        if pairs.empty:
+            self.last_stats["new_candidates"] = 0
+            return 0
+        prefix = "IGNORE" if db.bind.dialect.name == "mysql" else "OR IGNORE"
+        statement = insert(DuplicateCandidate.__table__).prefix_with(prefix)
+        now = datetime.utcnow()
+        records = [
+            {
+                "beneficiary_id_a": int(row.beneficiary_id_a),
+                "beneficiary_id_b": int(row.beneficiary_id_b),
+                "score": float(row.score),
+                "block_key": row.block_key,
+                "status": "pending",
+                "detected_at": now,
+            }
+            for row in pairs.itertuples(index=False)
+        ]
+        inserted = 0
+        for start in range(0, len(records), chunk_size):
+            # INSERT IGNORE leaves duplicates out of the rowcount
+            inserted += db.execute(statement, records[start:start + chunk_size]).rowcount
+        db.commit()
+        self.last_stats["new_candidates"] = inserted
+        return inserted
+
+
+# Global instance
+deduplication_engine = DeduplicationEngine()
@@ -0,0 +1,227 @@
+import threading
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.db_config import SessionLocal
+from app.models.feedback_summary import FeedbackSummary
+from app.models.food_aid import DistributionCenter, Feedback, Shipment
+from app.services.sms_parser import normalize_text, split_words, sms_feedback_parser
+
+
+# Sentiment lexicon (normalized words); score = (positive - negative) / matched words
+POSITIVE_WORDS = frozenset({
+    "thank", "thanks", "good", "great", "happy", "received", "helpful", "grateful", "well",
+    "merci", "bien", "bon", "bonne", "content", "satisfait",
+    "murakoze", "byiza", "neza", "nishimiye", "twishimiye",
+})
+NEGATIVE_WORDS = frozenset({
+    "bad", "missing", "stolen", "damaged", "spoiled", "rotten", "late", "delayed", "never", "not", "short",
+    "hungry", "angry", "corrupt", "bribe", "expired", "broken", "problem",
+    "manquant", "vole", "retard", "pas", "jamais", "pourri", "perime", "probleme", "corruption",
+    "byabuze", "byibwe", "byatinze", "byaboze", "byangiritse", "ntabwo", "nta", "ruswa", "ikibazo",
+})
+
+SUMMARY_GROUPS = {"category", "day", "district", "shipment"}
+
+
+def sentiment_score(comment: str) -> float:
+    words = split_words(normalize_text(comment or ""))
+    positive = sum(1 for word in words if word in POSITIVE_WORDS)
+    negative = sum(1 for word in words if word in NEGATIVE_WORDS)
+    if not positive and not negative:
+        return 0.0
+    return (positive - negative) / (positive + negative)
+
+
+def classify(comment: Optional[str], feedback_type: Optional[str]) -> Tuple[str, float]:
+    """
+    Category and sentiment for one feedback
+
+    The comment's parsed issue (damaged, spoiled, ...) wins over its parsed
+    status, which wins over the submitted feedback_type.
+    """
+    parsed = sms_feedback_parser.parse(comment or "")
+    category = parsed["issue_type"] or parsed["status"] or (feedback_type or "").strip().lower() or "general"
+    return category[:50], sentiment_score(comment)
+
+
+def classify_or_fallback(feedback_id: int, comment: Optional[str], feedback_type: Optional[str]) -> Tuple[str, float]:
+    # A row that cannot be classified must still leave the queue, or every later poll
+    # would select the same batch again and stall the stage
+    try:
+        return classify(comment, feedback_type)
+    except Exception as e:
+        print(f"Error classifying feedback {feedback_id}: {e}")
+        return "other", 0.0
+
+
+def district_of(location: Optional[str]) -> str:
+    # Distribution center locations are "District, Province" or just "District"
+    return (location or "").split(",")[0].strip()[:100]
+
+
+class FeedbackAnalytics:
+    """
+    Classifies feedback as it arrives and maintains feedback_summary
+
+    Unclassified feedback (category IS NULL) is picked up in id-ordered
+    batches, locked with FOR UPDATE SKIP LOCKED so that workers in other
+    processes claim different rows. Each batch is classified, aggregated with pandas into
+    (day, district, shipment, category) buckets and upserted as increments
+    into feedback_summary, in the same transaction that stores each row's
+    category and sentiment, so no feedback is counted twice.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal, batch_size: int = 1000, poll_seconds: float = 5):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def process_batch(self, db: Session) -> int:
+        # Claim the batch first, locking only feedback rows: SQLAlchemy's MySQL dialect
+        # does not render FOR UPDATE OF, so a locking join would lock shipments too
+        ids = [row[0] for row in db.query(Feedback.id).filter(
+            Feedback.category.is_(None)
+        ).order_by(Feedback.id).limit(self.batch_size).with_for_update(skip_locked=True).all()]
+        rows = db.query(
+            Feedback.id, Feedback.feedback_type, Feedback.comment, Feedback.submitted_at,
+            Feedback.shipment_id, DistributionCenter.location
+        ).outerjoin(Shipment, Feedback.shipment_id == Shipment.id).outerjoin(
+            DistributionCenter, Shipment.destination_id == DistributionCenter.id
+        ).filter(Feedback.id.in_(ids)).order_by(Feedback.id).all() if ids else []
+        if not rows:
+            db.commit()
+            return 0
+
+        # Imported here: batches run on the worker thread, off the startup path
+        import pandas as pd
+
+        frame = pd.DataFrame(rows, columns=["id", "feedback_type", "comment", "submitted_at", "shipment_id", "location"])
+        classified = [
+            classify_or_fallback(feedback_id, comment, feedback_type)
+            for feedback_id, comment, feedback_type in zip(frame["id"], frame["comment"], frame["feedback_type"])
+        ]
+        frame["category"] = [category for category, _ in classified]
+        frame["sentiment"] = [sentiment for _, sentiment in classified]
+        frame["day"] = pd.to_datetime(frame["submitted_at"]).fillna(pd.Timestamp(datetime.utcnow())).dt.date
+        frame["district"] = frame["location"].map(district_of)
+        frame["shipment_id"] = frame["shipment_id"].fillna(0).astype(int)
+        frame["negative"] = (frame["sentiment"] < 0).astype(int)
+
+        buckets = frame.groupby(["day", "district", "shipment_id", "category"], as_index=False).agg(
+            count=("id", "size"), negative_count=("negative", "sum"), sentiment_sum=("sentiment", "sum")
+        )
+        self._upsert(db, buckets.to_dict("records"))
+        db.bulk_update_mappings(Feedback, frame[["id", "category", "sentiment"]].to_dict("records"))
+        db.commit()
+        return len(frame)
+
+    def _upsert(self, db: Session, buckets: List[Dict]):
+        now = datetime.utcnow()
+        for bucket in buckets:
+            bucket.update(count=int(bucket["count"]), negative_count=int(bucket["negative_count"]),
+                          sentiment_sum=float(bucket["sentiment_sum"]), updated_at=now)
+        table = FeedbackSummary.__table__
+        if db.bind.dialect.name == "mysql":
+            statement = mysql_insert(table)
+            statement = statement.on_duplicate_key_update(
+                count=table.c.count + statement.inserted.count,
+                negative_count=table.c.negative_count + statement.inserted.negative_count,
+                sentiment_sum=table.c.sentiment_sum + statement.inserted.sentiment_sum,
+                updated_at=statement.inserted.updated_at,
+            )
+        else:
+            statement = sqlite_insert(table)
+            statement = statement.on_conflict_do_update(
+                index_elements=["day", "district", "shipment_id", "category"],
+                set_={
+                    "count": table.c.count + statement.excluded.count,
+                    "negative_count": table.c.negative_count + statement.excluded.negative_count,
+                    "sentiment_sum": table.c.sentiment_sum + statement.excluded.sentiment_sum,
+                    "updated_at": statement.excluded.updated_at,
+                }
+            )
+        db.execute(statement, buckets)
+
+    def summary(
+        self,
+        db: Session,
+        group_by: str = "category",
+        since: Optional[date] = None,
+        until: Optional[date] = None,
+        district: Optional[str] = None,
+        shipment_id: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Feedback counts and average sentiment from the summary table
+
+        group_by: category, day, district or shipment (each broken down by category)
+        """
+        key = {
+            "category": None,
+            "day": FeedbackSummary.day,
+            "district": FeedbackSummary.district,
+            "shipment": FeedbackSummary.shipment_id,
+        }[group_by]
+        columns = ([key] if key is not None else []) + [FeedbackSummary.category]
+        query = db.query(
+            *columns,
+            func.sum(FeedbackSummary.count),
+            func.sum(FeedbackSummary.negative_count),
+            func.sum(FeedbackSummary.sentiment_sum)
+        )
+        if since:
+            query = query.filter(FeedbackSummary.day >= since)
+        if until:
+            query = query.filter(FeedbackSummary.day < until)
+        if district:
+            query = query.filter(FeedbackSummary.district == district)
+        if shipment_id is not None:
+            query = query.filter(FeedbackSummary.shipment_id == shipment_id)
+
+        result = []
+        for row in query.group_by(*columns).order_by(*columns).all():
+            *keys, count, negative_count, sentiment_sum = row
+            entry = {"category": keys[-1], "count": int(count or 0), "negative_count": int(negative_count or 0),
+                     "average_sentiment": round(float(sentiment_sum or 0) / count, 3) if count else 0.0}
+            if key is not None:
+                entry[group_by] = keys[0]
+            result.append(entry)
+        return result
+
+    # --- Background worker ---
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="feedback-analytics", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            processed = 0
+            db = self.session_factory()
+            try:
+                processed = self.process_batch(db)
+            except Exception as e:
+                print(f"Error classifying feedback: {e}")
+                db.rollback()
+            finally:
+                db.close()
+            if processed < self.batch_size:
+                self._stop.wait(self.poll_seconds)
+
+
+# Global instance
+feedback_analytics = FeedbackAnalytics()
@@ -0,0 +1,207 @@
+import bisect
+import threading
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterator, List, Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.models.food_aid import Feedback
+from app.models.issue import Issue
+from app.services.sms_parser import normalize_text, split_words
+
+
+MAX_PAGE_SIZE = 500
+
+# Columns for streamed exports, in output order
+FEEDBACK_FIELDS = {column.name: column for column in Feedback.__table__.columns}
+ISSUE_FIELDS = {column.name: column for column in Issue.__table__.columns}
+
+# Words too common to be worth indexing
+STOPWORDS = frozenset({"the", "a", "an", "and", "or", "of", "to", "in", "is", "it", "for", "on", "from", "sms",
+                       "le", "la", "les", "de", "des", "et", "un", "une", "na", "ni", "ya", "ku"})
+
+
+def search_terms(query: str) -> List[str]:
+    return [word for word in split_words(normalize_text(query)) if word not in STOPWORDS and len(word) > 1]
+
+
+class FeedbackTextIndex:
+    """
+    In-process inverted index over Feedback.comment
+
+    Used where the database has no full-text index (SQLite). Each term maps
+    to an ascending list of feedback ids; the index is caught up by id
+    watermark before each search, so new feedback is searchable immediately.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, List[int]] = {}
+        self._max_id = 0
+        self._lock = threading.Lock()
+
+    def refresh(self, db: Session, batch_size: int = 5000):
+        with self._lock:
+            while True:
+                rows = db.query(Feedback.id, Feedback.comment).filter(
+                    Feedback.id > self._max_id
+                ).order_by(Feedback.id).limit(batch_size).all()
+                for feedback_id, comment in rows:
+                    for term in set(search_terms(comment or "")):
+                        self._postings.setdefault(term, []).append(feedback_id)
+                if rows:
+                    self._max_id = rows[-1][0]
+                if len(rows) < batch_size:
+                    break
+
+    def search(self, db: Session, query: str, before_id: Optional[int] = None) -> Iterator[int]:
+        """
+        Ids of feedback containing every term, newest first (lazily)
+        """
+        terms = search_terms(query)
+        if not terms:
+            return
+        self.refresh(db)
+        postings = sorted((self._postings.get(term, []) for term in terms), key=len)
+        # Walk the rarest term's list backwards; binary-search the others
+        rarest, others = postings[0], postings[1:]
+        position = bisect.bisect_left(rarest, before_id) if before_id else len(rarest)
+        while position > 0:
+            position -= 1
+            feedback_id = rarest[position]
+            if all(_contains(posting, feedback_id) for posting in others):
+                yield feedback_id
+
+
+def _contains(posting: List[int], value: int) -> bool:
+    index = bisect.bisect_left(posting, value)
+    return index < len(posting) and posting[index] == value
+
+
+def filter_feedback(
+    query,
+    shipment_id: Optional[int] = None,
+    feedback_type: Optional[str] = None,
+    anonymous: Optional[bool] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
+    if shipment_id is not None:
+        query = query.filter(Feedback.shipment_id == shipment_id)
+    if feedback_type:
+        query = query.filter(Feedback.feedback_type == feedback_type)
+    if anonymous is not None:
+        query = query.filter(Feedback.anonymous == anonymous)
+    if since:
+        query = query.filter(Feedback.submitted_at >= since)
+    if until:
+        query = query.filter(Feedback.submitted_at < until)
+    return query
+
+
+def feedback_page(
+    db: Session,
+    shipment_id: Optional[int] = None,
+    feedback_type: Optional[str] = None,
+    anonymous: Optional[bool] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    q: Optional[str] = None,
+    before_id: Optional[int] = None,
+    limit: int = 50
+) -> List[Feedback]:
+    """
+    One page of feedback, newest first, using keyset pagination on id
+
+    Pass the id of the last row of a page as `before_id` to get the next one.
+    Every filter maps onto an index, so a page costs the same at any table size.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    query = filter_feedback(db.query(Feedback), shipment_id, feedback_type, anonymous, since, until)
+
+    if q:
+        terms = search_terms(q)
+        if not terms:
+            return []
+        if db.bind.dialect.name == "mysql":
+            query = query.filter(text("MATCH (feedbacks.comment) AGAINST (:q IN BOOLEAN MODE)")).params(
+                q=" ".join(f"+{term}" for term in terms)
+            )
+        else:
+            return _search_page(db, query, q, before_id, limit)
+
+    if before_id:
+        query = query.filter(Feedback.id < before_id)
+    return query.order_by(Feedback.id.desc()).limit(limit).all()
+
+
+def feedback_export_query(db: Session, before_id: Optional[int] = None, **filters):
+    """
+    All matching feedback as column tuples, newest first, for streaming
+    """
+    query = filter_feedback(db.query(*FEEDBACK_FIELDS.values()), **filters)
+    if before_id:
+        query = query.filter(Feedback.id < before_id)
+    return query.order_by(Feedback.id.desc())
+
+
+def _search_page(db: Session, query, q: str, before_id: Optional[int], limit: int, chunk_size: int = 500) -> List[Feedback]:
+    # Apply the other filters to candidate ids from the text index, a chunk at a time
+    candidates = feedback_text_index.search(db, q, before_id)
+    page: List[Feedback] = []
+    while len(page) < limit:
+        chunk = list(islice(candidates, chunk_size))
+        if not chunk:
+            break
+        page.extend(query.filter(Feedback.id.in_(chunk)).order_by(Feedback.id.desc()).limit(limit - len(page)).all())
+    return page
+
+
+def filter_issues(
+    query,
+    shipment_id: Optional[int] = None,
+    reported: Optional[bool] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
+    if shipment_id is not None:
+        query = query.filter(Issue.shipment_id == shipment_id)
+    if reported is not None:
+        query = query.filter(Issue.issue_reported == reported)
+    if since:
+        query = query.filter(Issue.report_timestamp >= since)
+    if until:
+        query = query.filter(Issue.report_timestamp < until)
+    return query
+
+
+def issue_page(
+    db: Session,
+    shipment_id: Optional[int] = None,
+    reported: Optional[bool] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+    limit: int = 50
+) -> List[Issue]:
+    """
+    One page of issues, newest first, using keyset pagination on issue_id
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    query = filter_issues(db.query(Issue), shipment_id, reported, since, until)
+    if before_id:
+        query = query.filter(Issue.issue_id < before_id)
+    return query.order_by(Issue.issue_id.desc()).limit(limit).all()
+
+
+def issue_export_query(db: Session, before_id: Optional[int] = None, **filters):
+    """
+    All matching issues as column tuples, newest first, for streaming
+    """
+    query = filter_issues(db.query(*ISSUE_FIELDS.values()), **filters)
+    if before_id:
+        query = query.filter(Issue.issue_id < before_id)
+    return query.order_by(Issue.issue_id.desc())
+
+
+# Global instance
+feedback_text_index = FeedbackTextIndex()
@@ -1,7 +1,5 @@
 import numpy as np
-from sklearn.ensemble import IsolationForest
-from sklearn.preprocessing import StandardScaler
-import pandas as pd
+from collections import defaultdict
 from typing import List, Tuple, Optional
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
@@ -11,21 +9,32 @@ from app.models.fraud_detection import FraudDetection
 
 class FraudDetectionService:
     def __init__(self):
-        # Initialize the isolation forest model for anomaly detection
-        self.model = IsolationForest(
+        # Built on first training, so scikit-learn is not imported at startup
+        self.model = None
+        self.scaler = None
+        self.is_trained = False
+
+    def _new_model(self):
+        """
+        Isolation forest for anomaly detection, with its feature scaler
+        """
+        from sklearn.ensemble import IsolationForest
+        from sklearn.preprocessing import StandardScaler
+
+        model = IsolationForest(
             contamination=0.1,  # Expected proportion of outliers
             random_state=42,
             n_estimators=100
         )
-        self.scaler = StandardScaler()
-        self.is_trained = False
+        return model, StandardScaler()
         
-    def extract_features(self, shipment: Shipment, db: Session) -> np.ndarray:
+    def extract_features(self, shipment: Shipment, db: Session, scan_logs: Optional[List[ScanLog]] = None) -> np.ndarray:
         """
         Extract features from shipment data for fraud detection
         """
-        # Get scan logs for this shipment
-        scan_logs = db.query(ScanLog).filter(ScanLog.shipment_id == shipment.id).all()
+        # Get scan logs for this shipment (train_model passes them preloaded)
+        if scan_logs is None:
+            scan_logs = db.query(ScanLog).filter(ScanLog.shipment_id == shipment.id).all()
         
         # Feature extraction
         features = []
@@ -50,8 +59,8 @@ class FraudDetectionService:
         if len(scan_logs) > 1:
             distances = []
             for i in range(len(scan_logs)-1):
-                lat1, lon1 = scan_logs[i].latitude or 0, scan_logs[i].longitude or 0
-                lat2, lon2 = scan_logs[i+1].latitude or 0, scan_logs[i+1].longitude or 0
+                lat1, lon1 = scan_logs[i].checkpoint_lat or 0, scan_logs[i].checkpoint_lon or 0
+                lat2, lon2 = scan_logs[i+1].checkpoint_lat or 0, scan_logs[i+1].checkpoint_lon or 0
                 # Simple distance calculation (in practice, use haversine formula)
                 distance = np.sqrt((lat2-lat1)**2 + (lon2-lon1)**2)
                 distances.append(distance)
@@ -67,8 +76,8 @@ class FraudDetectionService:
         else:
             features.append(0)
             
-        # Status changes
-        status_changes = len(set([scan.status for scan in scan_logs])) if scan_logs else 0
+        # Distinct checkpoints (scan logs carry no status of their own)
+        status_changes = len(set([scan.location for scan in scan_logs])) if scan_logs else 0
         features.append(status_changes)
         
         return np.array(features).reshape(1, -1)
@@ -80,10 +89,18 @@ class FraudDetectionService:
         if not shipments:
             return
             
+        # Load the scan logs of all shipments in one query instead of one per shipment
+        scan_logs_by_shipment = defaultdict(list)
+        shipment_ids = [shipment.id for shipment in shipments]
+        for start in range(0, len(shipment_ids), 1000):
+            chunk = shipment_ids[start:start + 1000]
+            for scan in db.query(ScanLog).filter(ScanLog.shipment_id.in_(chunk)).order_by(ScanLog.id):
+                scan_logs_by_shipment[scan.shipment_id].append(scan)
+
         # Extract features for all shipments
         features_list = []
         for shipment in shipments:
-            features = self.extract_features(shipment, db)
+            features = self.extract_features(shipment, db, scan_logs_by_shipment[shipment.id])
             features_list.append(features.flatten())
             
         # Convert to numpy array
@@ -94,10 +111,12 @@ class FraudDetectionService:
             return
             
         # Scale features
-        X_scaled = self.scaler.fit_transform(X)
+        model, scaler = self._new_model()
+        X_scaled = scaler.fit_transform(X)
         
         # Train the model
-        self.model.fit(X_scaled)
+        model.fit(X_scaled)
+        self.model, self.scaler = model, scaler
         self.is_trained = True
     
     def predict_fraud(self, shipment: Shipment, db: Session) -> Tuple[float, bool, str]:
@@ -0,0 +1,93 @@
+import threading
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.db_config import SessionLocal
+from app.models.food_aid import Shipment, ScanLog
+from app.utils.geo_grid import Bounds, GeoGridIndex
+
+
+class GeoClusterService:
+    """
+    Live Tracking Map clusters, computed server-side
+
+    Holds each shipment's latest scan position and status in a GeoGridIndex
+    so the map receives one marker per grid cell instead of every shipment.
+    Positions are loaded once at startup, then kept current by the scan,
+    status-change and delete hooks in the shipment routes (each clears the
+    per-zoom cluster cache). A background reload corrects any drift from
+    writes made outside this process.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal, reload_seconds: float = 300):
+        self.session_factory = session_factory
+        self.reload_seconds = reload_seconds
+        self.index = GeoGridIndex()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def load(self, db: Session):
+        # Latest scan per shipment: scan ids grow with time
+        latest = db.query(func.max(ScanLog.id).label("scan_id")).filter(
+            ScanLog.checkpoint_lat.isnot(None), ScanLog.checkpoint_lon.isnot(None)
+        ).group_by(ScanLog.shipment_id).subquery()
+        rows = db.query(
+            Shipment.id, ScanLog.checkpoint_lat, ScanLog.checkpoint_lon, Shipment.status
+        ).join(ScanLog, ScanLog.shipment_id == Shipment.id).join(
+            latest, ScanLog.id == latest.c.scan_id
+        ).all()
+        self.index.set_points(
+            [row[0] for row in rows], [row[1] for row in rows], [row[2] for row in rows], [row[3] for row in rows]
+        )
+
+    # --- Hooks ---
+    def on_scan(self, shipment: Shipment, lat: Optional[float], lon: Optional[float]):
+        if lat is None or lon is None:
+            return
+        self.index.upsert(shipment.id, lat, lon, shipment.status)
+
+    def on_status_change(self, shipment: Shipment):
+        self.index.upsert(shipment.id, status=shipment.status)
+
+    def on_shipment_deleted(self, shipment_id: int):
+        self.index.remove(shipment_id)
+
+    # --- Reads ---
+    def clusters(self, zoom: float, bounds: Optional[Bounds] = None) -> List[Dict]:
+        return self.index.clusters(zoom, bounds)
+
+    # --- Background reload ---
+    def start(self):
+        if self._thread is not None:
+            return
+        db = self.session_factory()
+        try:
+            self.load(db)
+        except Exception as e:
+            print(f"Error loading map positions: {e}")
+        finally:
+            db.close()
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="geo-clusters", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.reload_seconds):
+            db = self.session_factory()
+            try:
+                self.load(db)
+            except Exception as e:
+                print(f"Error reloading map positions: {e}")
+            finally:
+                db.close()
+
+
+# Global instance
+geo_clusters = GeoClusterService()
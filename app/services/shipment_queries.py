@@ -0,0 +1,32 @@
+from typing import Optional
+from sqlalchemy.orm import Session, joinedload, selectinload
+from app.models.food_aid import Shipment, ShipmentItem
+
+# Shipment relationships are lazy="raise_on_sql", so anything serialising
+# them has to load them up front with one of these builders; a forgotten one
+# fails loudly instead of issuing one query per shipment.
+
+
+def with_references(query):
+    """
+    Join in the food aid item, origin warehouse and destination centre (many-to-one, same query)
+    """
+    return query.options(
+        joinedload(Shipment.aid_item),
+        joinedload(Shipment.origin),
+        joinedload(Shipment.destination),
+    )
+
+
+def with_items(query):
+    """
+    Line items and their food aid item, in one extra query for the whole result
+    """
+    return query.options(selectinload(Shipment.items).joinedload(ShipmentItem.food_aid_item))
+
+
+def shipment_detail(db: Session, shipment_id: int) -> Optional[Shipment]:
+    """
+    One shipment with its references and line items: two queries in total
+    """
+    return with_items(with_references(db.query(Shipment))).filter(Shipment.id == shipment_id).first()
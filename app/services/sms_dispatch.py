@@ -0,0 +1,228 @@
+import hashlib
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+from app.db_config import SessionLocal
+from app.models.outbound_message import OutboundMessage
+from app.services.sms_service import sms_service
+from app.utils.rate_limit import TokenBucket
+
+
+def message_key(to: str, body: str, scope: Optional[str] = None) -> str:
+    """
+    Default dedupe key: the same text to the same number is sent once per
+    scope, the current UTC day unless given, so a re-run job is a no-op
+    while next month's identical reminder still goes out
+    """
+    scope = scope or datetime.utcnow().strftime("%Y-%m-%d")
+    return hashlib.sha256(f"{scope}\n{to}\n{body}".encode("utf-8")).hexdigest()
+
+
+class SMSDispatchQueue:
+    """
+    Persistent outbound SMS queue
+
+    Messages are written to outbound_messages (deduplicated on message_key)
+    and sent in the background: a dispatcher thread claims due messages in
+    batches and a pool of sender threads delivers them through the provider,
+    sharing a token bucket so the provider's rate limit is respected. Failed
+    sends are retried with exponential backoff and jitter, up to max_attempts.
+
+    A claimed message is leased (next_attempt_at is pushed lease_seconds into
+    the future), so messages held by a crashed worker become due again.
+    """
+
+    def __init__(
+        self,
+        provider=None,
+        session_factory: Callable[[], Session] = SessionLocal,
+        rate_per_second: float = 10,
+        burst: int = 10,
+        senders: int = 8,
+        batch_size: int = 100,
+        poll_seconds: float = 1.0,
+        max_attempts: int = 5,
+        base_backoff_seconds: float = 30,
+        max_backoff_seconds: float = 3600,
+        lease_seconds: float = 600
+    ):
+        self.provider = provider or sms_service.provider
+        self.session_factory = session_factory
+        self.bucket = TokenBucket(rate_per_second, burst)
+        self.senders = senders
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.max_attempts = max_attempts
+        self.base_backoff_seconds = base_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.lease_seconds = lease_seconds
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # --- Producers ---
+    def enqueue(self, db: Session, to: str, body: str, key: Optional[str] = None) -> bool:
+        """
+        Queue one message; returns False if its key was already queued
+        """
+        return self.enqueue_many(db, [(to, body, key)]) == 1
+
+    def enqueue_many(self, db: Session, messages: Iterable[Tuple[str, str, Optional[str]]], chunk_size: int = 1000) -> int:
+        """
+        Queue (to, body, key) messages in bulk and return how many were new
+
+        Keys already present are skipped by the unique index, so re-running a
+        notification job does not message anyone twice.
+        """
+        prefix = "IGNORE" if db.bind.dialect.name == "mysql" else "OR IGNORE"
+        statement = insert(OutboundMessage.__table__).prefix_with(prefix)
+        now = datetime.utcnow()
+        queued = 0
+        chunk: List[Dict] = []
+        for to, body, key in messages:
+            chunk.append({
+                "message_key": key or message_key(to, body),
+                "channel": "sms",
+                "to_number": to,
+                "body": body,
+                "status": "queued",
+                "attempts": 0,
+                "next_attempt_at": now,
+                "created_at": now,
+            })
+            if len(chunk) >= chunk_size:
+                queued += db.execute(statement, chunk).rowcount
+                chunk = []
+        if chunk:
+            queued += db.execute(statement, chunk).rowcount
+        db.commit()
+        self._wake.set()
+        return queued
+
+    # --- Dispatching ---
+    def claim_batch(self, db: Session) -> List[Tuple[int, str, str, int]]:
+        """
+        Lease up to batch_size due messages to this worker
+        """
+        now = datetime.utcnow()
+        rows = db.query(
+            OutboundMessage.id, OutboundMessage.to_number, OutboundMessage.body, OutboundMessage.attempts
+        ).filter(
+            OutboundMessage.status.in_(("queued", "sending")),
+            OutboundMessage.next_attempt_at <= now
+        ).order_by(OutboundMessage.next_attempt_at).limit(self.batch_size).with_for_update(skip_locked=True).all()
+        if rows:
+            db.query(OutboundMessage).filter(OutboundMessage.id.in_([row[0] for row in rows])).update(
+                {"status": "sending", "next_attempt_at": now + timedelta(seconds=self.lease_seconds)},
+                synchronize_session=False
+            )
+        db.commit()
+        return rows
+
+    def _backoff(self, attempts: int) -> timedelta:
+        delay = min(self.max_backoff_seconds, self.base_backoff_seconds * 2 ** (attempts - 1))
+        return timedelta(seconds=delay * random.uniform(0.5, 1.0))
+
+    def _send(self, message: Tuple[int, str, str, int]) -> Dict:
+        message_id, to, body, attempts = message
+        attempts += 1
+        self.bucket.acquire()
+        now = datetime.utcnow()
+        try:
+            provider_id = self.provider.send(to, body)
+            return {"id": message_id, "status": "sent", "attempts": attempts, "provider_message_id": provider_id,
+                    "sent_at": now, "last_error": None}
+        except Exception as e:
+            # Unexpected errors (not SMSSendError) are treated as transient
+            retryable = getattr(e, "retryable", True)
+            result = {"id": message_id, "attempts": attempts, "last_error": str(e)[:255]}
+            if retryable and attempts < self.max_attempts:
+                result.update(status="queued", next_attempt_at=now + self._backoff(attempts))
+            else:
+                result.update(status="failed")
+            return result
+
+    def dispatch_once(self, db: Session) -> int:
+        """
+        Claim one batch, send it through the sender pool and record the results
+
+        Returns the number of messages processed.
+        """
+        batch = self.claim_batch(db)
+        if not batch:
+            return 0
+        results = list(self._pool().map(self._send, batch))
+        db.bulk_update_mappings(OutboundMessage, results)
+        db.commit()
+        return len(results)
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.senders, thread_name_prefix="sms-sender")
+        return self._executor
+
+    # --- Delivery reports and monitoring ---
+    def record_delivery_status(self, db: Session, provider_message_id: str, delivery_status: str) -> bool:
+        values = {"delivery_status": delivery_status[:20]}
+        if delivery_status == "delivered":
+            values["delivered_at"] = datetime.utcnow()
+        updated = db.query(OutboundMessage).filter(
+            OutboundMessage.provider_message_id == provider_message_id
+        ).update(values, synchronize_session=False)
+        db.commit()
+        return bool(updated)
+
+    def stats(self, db: Session) -> Dict:
+        counts = dict(db.query(OutboundMessage.status, func.count(OutboundMessage.id)).group_by(OutboundMessage.status).all())
+        oldest_due = db.query(func.min(OutboundMessage.next_attempt_at)).filter(OutboundMessage.status == "queued").scalar()
+        return {
+            "queued": counts.get("queued", 0),
+            "sending": counts.get("sending", 0),
+            "sent": counts.get("sent", 0),
+            "failed": counts.get("failed", 0),
+            "oldest_due_at": oldest_due,
+        }
+
+    # --- Background worker ---
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sms-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            processed = 0
+            db = self.session_factory()
+            try:
+                processed = self.dispatch_once(db)
+            except Exception as e:
+                print(f"Error dispatching SMS: {e}")
+                db.rollback()
+            finally:
+                db.close()
+            # Keep draining while batches come back full; otherwise wait for
+            # new messages or the next poll
+            if processed < self.batch_size:
+                self._wake.wait(self.poll_seconds)
+                self._wake.clear()
+
+
+# Global instance
+sms_dispatcher = SMSDispatchQueue()
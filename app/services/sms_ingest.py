@@ -0,0 +1,207 @@
+import hashlib
+import json
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.db_config import SessionLocal
+from app.models.audit_trail import AuditTrail
+from app.models.food_aid import Feedback, Shipment
+from app.models.inbound_message import InboundMessage
+from app.models.user import User
+from app.services.sms_service import sms_service
+
+
+def fallback_message_id(from_number: str, body: str, raw: bytes) -> str:
+    """
+    Stable id for providers that send no message id: retries of the same
+    request carry the same payload, so they hash to the same id
+    """
+    return "sha256:" + hashlib.sha256(f"{from_number}\n{body}\n".encode("utf-8") + raw).hexdigest()[:56]
+
+
+class InboundSMSWorker:
+    """
+    Turns inbound SMS into feedback in the background
+
+    The webhook only stores the raw message (deduplicated on the provider's
+    message id, so provider retries are no-ops) and returns. This worker
+    drains pending messages in micro-batches: one transaction per batch
+    parses the messages, inserts the feedback and audit rows and marks the
+    messages processed. The system user id is looked up once at startup.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        batch_size: int = 200,
+        poll_seconds: float = 1.0
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.system_user_id: Optional[int] = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # --- Webhook side ---
+    def accept(self, db: Session, provider_message_id: str, from_number: str, body: str) -> bool:
+        """
+        Store a raw inbound message; returns False if it was already received
+        """
+        prefix = "IGNORE" if db.bind.dialect.name == "mysql" else "OR IGNORE"
+        result = db.execute(insert(InboundMessage.__table__).prefix_with(prefix), {
+            "provider_message_id": provider_message_id,
+            "from_number": from_number,
+            "body": body,
+            "received_at": datetime.utcnow(),
+            "status": "pending",
+        })
+        db.commit()
+        self._wake.set()
+        return result.rowcount == 1
+
+    # --- Processing ---
+    def load_system_user(self, db: Session):
+        system_user = db.query(User.id).filter(User.username == "system").first()
+        self.system_user_id = system_user[0] if system_user else None
+        if self.system_user_id is None:
+            print("Inbound SMS: no 'system' user found, SMS feedback will not be audited")
+
+    def _feedback_values(self, message: InboundMessage, parsed: Dict, known_shipments: set) -> Dict:
+        shipment_id = int(parsed["shipment_id"]) if parsed.get("shipment_id") else None
+        return {
+            "shipment_id": shipment_id if shipment_id in known_shipments else None,
+            "feedback_type": parsed.get("status") or "general",
+            "comment": f"SMS from {message.from_number}: {message.body}",
+            "anonymous": True,  # SMS feedback is typically anonymous
+            "submitted_at": message.received_at,
+        }
+
+    def _parse(self, message: InboundMessage) -> Dict:
+        # The citizen's feedback is stored even when the parser fails on it, just unclassified
+        try:
+            return sms_service.receive_sms(message.from_number, message.body or "")["parsed_feedback"]
+        except Exception as e:
+            print(f"Error parsing inbound SMS {message.id}, storing it unparsed: {e}")
+            return {}
+
+    def _process(self, db: Session, messages: List[InboundMessage]):
+        """
+        Create feedback for a batch of messages in the current transaction
+        """
+        parsed = [self._parse(message) for message in messages]
+        # Shipment references in free text are often wrong; keep only real ones
+        candidates = {int(fields["shipment_id"]) for fields in parsed if fields.get("shipment_id")}
+        known_shipments = {
+            row[0] for row in db.query(Shipment.id).filter(Shipment.id.in_(candidates)).all()
+        } if candidates else set()
+
+        now = datetime.utcnow()
+        feedbacks = [
+            Feedback(**self._feedback_values(message, fields, known_shipments))
+            for message, fields in zip(messages, parsed)
+        ]
+        db.add_all(feedbacks)
+        db.flush()
+
+        for message, feedback in zip(messages, feedbacks):
+            message.status = "processed"
+            message.feedback_id = feedback.id
+            message.processed_at = now
+            if self.system_user_id is not None:
+                db.add(AuditTrail(
+                    user_id=self.system_user_id,
+                    action="create",
+                    table_name="feedbacks",
+                    record_id=feedback.id,
+                    new_values=json.dumps({
+                        "shipment_id": feedback.shipment_id,
+                        "feedback_type": feedback.feedback_type,
+                        # audit_trails.new_values is VARCHAR(500)
+                        "comment": feedback.comment[:300],
+                        "anonymous": feedback.anonymous,
+                        "submitted_at": str(feedback.submitted_at) if feedback.submitted_at else None,
+                        "inbound_message_id": message.id,
+                    })
+                ))
+
+    def process_batch(self, db: Session) -> int:
+        """
+        Process up to batch_size pending messages; returns how many were claimed
+        """
+        messages = db.query(InboundMessage).filter(
+            InboundMessage.status == "pending"
+        ).order_by(InboundMessage.id).limit(self.batch_size).with_for_update(skip_locked=True).all()
+        if not messages:
+            db.commit()
+            return 0
+        try:
+            self._process(db, messages)
+            db.commit()
+        except Exception as e:
+            # Retry one by one so a single bad message does not block the batch
+            print(f"Error processing inbound SMS batch, retrying individually: {e}")
+            db.rollback()
+            ids = [message.id for message in messages]
+            for message_id in ids:
+                message = db.query(InboundMessage).filter(
+                    InboundMessage.id == message_id, InboundMessage.status == "pending"
+                ).with_for_update(skip_locked=True).first()
+                if message is None:
+                    continue
+                try:
+                    self._process(db, [message])
+                    db.commit()
+                except Exception as e:
+                    db.rollback()
+                    db.query(InboundMessage).filter(InboundMessage.id == message_id).update(
+                        {"status": "failed", "error": str(e)[:255], "processed_at": datetime.utcnow()},
+                        synchronize_session=False
+                    )
+                    db.commit()
+        return len(messages)
+
+    # --- Background worker ---
+    def start(self):
+        if self._thread is not None:
+            return
+        db = self.session_factory()
+        try:
+            self.load_system_user(db)
+        except Exception as e:
+            print(f"Error loading system user: {e}")
+        finally:
+            db.close()
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sms-ingest", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            processed = 0
+            db = self.session_factory()
+            try:
+                processed = self.process_batch(db)
+            except Exception as e:
+                print(f"Error ingesting inbound SMS: {e}")
+                db.rollback()
+            finally:
+                db.close()
+            if processed < self.batch_size:
+                self._wake.wait(self.poll_seconds)
+                self._wake.clear()
+
+
+# Global instance
+inbound_sms_worker = InboundSMSWorker()
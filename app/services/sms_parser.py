@@ -0,0 +1,300 @@
+import re
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+
+# Per-language keyword tables: phrase -> (field, value)
+# Phrases are matched on whole words, case- and accent-insensitively, and the
+# longest phrase wins ("not received" beats "received").
+KEYWORD_TABLES: Dict[str, Dict[str, Tuple[str, str]]] = {
+    "en": {
+        "received": ("status", "received"),
+        "got": ("status", "received"),
+        # Only a status when negated ("did not get"); "when will we get it" reports nothing
+        "get": (None, "received"),
+        "arrived": ("status", "received"),
+        "not received": ("status", "not received"),
+        "never received": ("status", "not received"),
+        "did not receive": ("status", "not received"),
+        "didn't receive": ("status", "not received"),
+        "missing": ("status", "missing"),
+        "stolen": ("status", "missing"),
+        "delayed": ("status", "delayed"),
+        "late": ("status", "delayed"),
+        "damaged": ("issue_type", "damaged"),
+        "broken": ("issue_type", "damaged"),
+        "spoiled": ("issue_type", "spoiled"),
+        "rotten": ("issue_type", "spoiled"),
+        "expired": ("issue_type", "spoiled"),
+        "quantity": ("quantity_issue", "short"),
+        "short": ("quantity_issue", "short"),
+        "less than": ("quantity_issue", "short"),
+        "shipment": ("reference", "shipment"),
+    },
+    "fr": {
+        "recu": ("status", "received"),
+        "arrive": ("status", "received"),
+        "pas recu": ("status", "not received"),
+        "jamais recu": ("status", "not received"),
+        "manquant": ("status", "missing"),
+        "manquants": ("status", "missing"),
+        "manque": ("status", "missing"),
+        "vole": ("status", "missing"),
+        "retard": ("status", "delayed"),
+        "en retard": ("status", "delayed"),
+        "endommage": ("issue_type", "damaged"),
+        "endommagee": ("issue_type", "damaged"),
+        "endommages": ("issue_type", "damaged"),
+        "abime": ("issue_type", "damaged"),
+        "abimee": ("issue_type", "damaged"),
+        "casse": ("issue_type", "damaged"),
+        "pourri": ("issue_type", "spoiled"),
+        "pourrie": ("issue_type", "spoiled"),
+        "perime": ("issue_type", "spoiled"),
+        "perimee": ("issue_type", "spoiled"),
+        "quantite": ("quantity_issue", "short"),
+        "insuffisant": ("quantity_issue", "short"),
+        "envoi": ("reference", "shipment"),
+        "livraison": ("reference", "shipment"),
+    },
+    "rw": {
+        "nabonye": ("status", "received"),
+        "twabonye": ("status", "received"),
+        "byageze": ("status", "received"),
+        "yageze": ("status", "received"),
+        "sinabonye": ("status", "not received"),
+        "ntitwabonye": ("status", "not received"),
+        "ntibyageze": ("status", "not received"),
+        "ntiyageze": ("status", "not received"),
+        "byabuze": ("status", "missing"),
+        "yabuze": ("status", "missing"),
+        "byibwe": ("status", "missing"),
+        "byatinze": ("status", "delayed"),
+        "yatinze": ("status", "delayed"),
+        "gutinda": ("status", "delayed"),
+        "byangiritse": ("issue_type", "damaged"),
+        "yangiritse": ("issue_type", "damaged"),
+        "byaboze": ("issue_type", "spoiled"),
+        "byarangiye": ("issue_type", "spoiled"),
+        "ingano": ("quantity_issue", "short"),
+        "bike": ("quantity_issue", "short"),
+        "ubufasha": ("reference", "shipment"),
+    },
+}
+
+# Words that negate a keyword appearing shortly after them
+NEGATORS: Dict[str, List[str]] = {
+    "en": ["not", "no", "never", "didn't", "didnt", "haven't", "havent", "hasn't", "hasnt", "wasn't", "wasnt"],
+    "fr": ["pas", "jamais", "aucun", "aucune"],
+    "rw": ["ntabwo", "nta", "oya"],
+}
+
+# Contrastive conjunctions start a new clause: "not damaged but late" is a delay report
+CLAUSE_BREAKERS: Dict[str, List[str]] = {
+    "en": ["but", "however", "although", "though"],
+    "fr": ["mais", "cependant", "pourtant"],
+    "rw": ["ariko", "nyamara"],
+}
+
+# What a negated keyword means; keywords not listed are dropped when negated
+# ("not damaged" is not a damage report)
+NEGATED_VALUES = {
+    ("status", "received"): ("status", "not received"),
+    (None, "received"): ("status", "not received"),
+}
+
+# Most severe status wins when a message mentions several
+STATUS_PRIORITY = {"not received": 4, "missing": 3, "delayed": 2, "received": 1}
+
+
+_PUNCTUATION = ".!?;,:()[]\"/-_*+=<>&@"
+_CLAUSE_PUNCTUATION = ".!?;,"
+# ASCII text is tokenized with a byte-level translate (all punctuation -> space)
+_ASCII_TO_SPACE = bytes.maketrans(_PUNCTUATION.encode(), b" " * len(_PUNCTUATION))
+_TEXT_TO_SPACE = str.maketrans(_PUNCTUATION, " " * len(_PUNCTUATION))
+CLAUSE_BREAK = "|"
+
+
+def _strip_accents(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+# Latin letters with diacritics -> ASCII, as one translate table ("ç" -> "c")
+_ACCENTS = {
+    code: _strip_accents(chr(code))
+    for code in range(0x80, 0x250)
+    if _strip_accents(chr(code)) != chr(code) and _strip_accents(chr(code)).isascii()
+}
+_ACCENTS[ord("’")] = "'"
+
+
+def normalize_text(text: str) -> str:
+    """
+    Lowercase and strip accents ("Reçu" -> "recu")
+    """
+    text = text.lower()
+    if text.isascii():
+        return text
+    text = text.translate(_ACCENTS)
+    return text if text.isascii() else _strip_accents(text)
+
+
+def split_words(text: str) -> List[str]:
+    if text.isascii():
+        return text.encode("ascii").translate(_ASCII_TO_SPACE).decode("ascii").split()
+    return text.translate(_TEXT_TO_SPACE).split()
+
+
+class SMSFeedbackParser:
+    """
+    Single-pass parser for free-text SMS feedback
+
+    Keywords of every language and the negators are compiled into one
+    word-level phrase table (first word -> candidate phrases, longest first).
+    A message is normalized and split once, and a set intersection with the
+    table's first words finds the hits in C. Most messages are resolved from
+    that set directly; only messages containing a negator or the start of a
+    multi-word phrase are walked token by token, resolving negation from the
+    position of the last negator in the current clause.
+    """
+
+    def __init__(
+        self,
+        tables: Optional[Dict[str, Dict[str, Tuple[str, str]]]] = None,
+        negators: Optional[Dict[str, List[str]]] = None,
+        negation_window: int = 3,
+        clause_breakers: Optional[Dict[str, List[str]]] = None
+    ):
+        tables = tables or KEYWORD_TABLES
+        negators = negators or NEGATORS
+        clause_breakers = CLAUSE_BREAKERS if clause_breakers is None else clause_breakers
+        self.negation_window = negation_window
+
+        # First word -> [(phrase words, (kind, field, value, language))], longest phrase first
+        self.phrases: Dict[str, List[Tuple[Tuple[str, ...], Tuple[str, str, str, str]]]] = {}
+        for language, table in tables.items():
+            for phrase, (field, value) in table.items():
+                self._add(phrase, ("kw", field, value, language))
+        for language, words in negators.items():
+            for word in words:
+                self._add(word, ("neg", None, None, language))
+        for language, words in clause_breakers.items():
+            for word in words:
+                self._add(word, ("break", None, None, language))
+        for candidates in self.phrases.values():
+            candidates.sort(key=lambda candidate: len(candidate[0]), reverse=True)
+
+        self.trigger_words = frozenset(self.phrases)
+        # Words that need the positional walk: negators, clause breakers and multi-word phrase starts
+        self.positional_words = frozenset(
+            word for word, candidates in self.phrases.items()
+            if any(len(phrase) > 1 or entry[0] != "kw" for phrase, entry in candidates)
+        )
+        # 4+ digit numbers, not part of a decimal or a longer word
+        self.shipment_id_pattern = re.compile(r"(?<![\w.])#?(\d{4,})(?![\w.])")
+        # Words and clause punctuation, for the positional walk
+        self.token_pattern = re.compile(
+            "[^\\s" + re.escape(_PUNCTUATION) + "]+|[" + re.escape(_CLAUSE_PUNCTUATION) + "]"
+        )
+
+    def _add(self, phrase: str, entry: Tuple):
+        words = tuple(normalize_text(phrase).split())
+        candidates = self.phrases.setdefault(words[0], [])
+        # Later tables override earlier ones for the same phrase
+        candidates[:] = [candidate for candidate in candidates if candidate[0] != words]
+        candidates.append((words, entry))
+
+    def parse(self, message: str) -> Dict:
+        """
+        Parse a message into structured feedback fields
+
+        Returns the same keys as the old keyword parser (keywords_found,
+        shipment_id, status, issue_type, quantity_issue) plus language and
+        negated_keywords.
+        """
+        text = normalize_text(message or "")
+        result = {
+            "keywords_found": [],
+            "shipment_id": None,
+            "status": None,
+            "issue_type": None,
+            "quantity_issue": None,
+            "language": None,
+            "negated_keywords": [],
+        }
+        shipment_id = self.shipment_id_pattern.search(text)
+        if shipment_id:
+            result["shipment_id"] = shipment_id.group(1)
+
+        words = split_words(text)
+        hits = self.trigger_words.intersection(words)
+        if not hits:
+            return result
+
+        language_hits: Dict[str, int] = {}
+        if self.positional_words.isdisjoint(hits):
+            # Only single-word keywords: order of appearance is all that matters
+            for word in sorted(hits, key=words.index):
+                _, field, value, language = self.phrases[word][0][1]
+                self._record(result, language_hits, word, field, value, language)
+        else:
+            self._walk(result, language_hits, self.token_pattern.findall(text))
+
+        # Only the first word of a multi-word phrase (e.g. "en" without "route") matches nothing
+        if language_hits:
+            result["language"] = max(language_hits, key=language_hits.get)
+        return result
+
+    def _walk(self, result: Dict, language_hits: Dict[str, int], tokens: List[str]):
+        negation_at = -1
+        position = 0
+        count = len(tokens)
+        while position < count:
+            candidates = self.phrases.get(tokens[position])
+            if candidates is None:
+                if tokens[position] in _CLAUSE_PUNCTUATION:
+                    negation_at = -1
+                position += 1
+                continue
+            for phrase, entry in candidates:
+                if len(phrase) == 1 or tuple(tokens[position:position + len(phrase)]) == phrase:
+                    break
+            else:
+                position += 1
+                continue
+
+            kind, field, value, language = entry
+            if kind == "break":
+                negation_at = -1
+            elif kind == "neg":
+                language_hits[language] = language_hits.get(language, 0) + 1
+                negation_at = position
+            else:
+                keyword = " ".join(phrase)
+                if negation_at >= 0 and position - negation_at <= self.negation_window:
+                    result["negated_keywords"].append(keyword)
+                    field, value = NEGATED_VALUES.get((field, value), (None, value))
+                self._record(result, language_hits, keyword, field, value, language)
+            position += len(phrase)
+
+    def _record(self, result: Dict, language_hits: Dict[str, int], keyword: str, field, value, language: str):
+        language_hits[language] = language_hits.get(language, 0) + 1
+        if keyword not in result["keywords_found"]:
+            result["keywords_found"].append(keyword)
+        if field is not None:
+            self._apply(result, field, value)
+
+    def _apply(self, result: Dict, field: str, value: str):
+        if field == "status":
+            current = result["status"]
+            if current is None or STATUS_PRIORITY[value] > STATUS_PRIORITY[current]:
+                result["status"] = value
+        elif field == "issue_type":
+            result["issue_type"] = result["issue_type"] or value
+        elif field == "quantity_issue":
+            result["quantity_issue"] = value
+
+
+# Global instance
+sms_feedback_parser = SMSFeedbackParser()
@@ -1,7 +1,80 @@
 from typing import Optional
+import random
+import time
+import uuid
 import requests
-from twilio.rest import Client
 import os
+from app.services.sms_parser import sms_feedback_parser
+
+
+class SMSSendError(Exception):
+    """
+    Raised by providers when a message could not be sent
+
+    retryable=False means retrying will not help (e.g. invalid number).
+    """
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class TwilioSMSProvider:
+    def __init__(self, client, from_number: str):
+        self.client = client
+        self.from_number = from_number
+
+    def send(self, to: str, body: str) -> str:
+        """
+        Send one message and return the provider message id
+        """
+        from twilio.base.exceptions import TwilioRestException
+
+        try:
+            message = self.client.messages.create(body=body, from_=self.from_number, to=to)
+        except TwilioRestException as e:
+            # Throttling and server errors are worth retrying; other 4xx are not
+            raise SMSSendError(str(e), retryable=e.status == 429 or (e.status or 500) >= 500)
+        except Exception as e:
+            raise SMSSendError(str(e))
+        return message.sid
+
+
+class MockSMSProvider:
+    """
+    Local provider for development and offline benchmarks
+
+    Simulates network latency and transient/permanent failures.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        permanent_failure_rate: float = 0.0,
+        echo: bool = True,
+        seed: Optional[int] = None
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.permanent_failure_rate = permanent_failure_rate
+        self.echo = echo
+        self._random = random.Random(seed)
+
+    def send(self, to: str, body: str) -> str:
+        delay = self.latency + self._random.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+        roll = self._random.random()
+        if roll < self.permanent_failure_rate:
+            raise SMSSendError(f"Mock permanent failure for {to}", retryable=False)
+        if roll < self.permanent_failure_rate + self.failure_rate:
+            raise SMSSendError(f"Mock transient failure for {to}")
+        if self.echo:
+            print(f"MOCK SMS sent to {to}: {body}")
+        return f"MOCK{uuid.uuid4().hex[:28]}"
 
 
 class SMSService:
@@ -11,29 +84,43 @@ class SMSService:
         self.auth_token = os.getenv('TWILIO_AUTH_TOKEN', '')
         self.twilio_phone_number = os.getenv('TWILIO_PHONE_NUMBER', '')
         
-        # Fallback to a mock service if Twilio credentials are not available
+        # Fallback to a mock service if Twilio credentials are not available;
+        # the Twilio SDK is only imported when it is actually used
         if self.account_sid and self.auth_token:
+            from twilio.rest import Client
+
             self.client = Client(self.account_sid, self.auth_token)
             self.use_twilio = True
+            self.provider = TwilioSMSProvider(self.client, self.twilio_phone_number)
         else:
             self.use_twilio = False
+            self.provider = MockSMSProvider()
+        # Public URL Twilio posts to, if it differs from what the app sees behind a proxy
+        self.webhook_url = os.getenv('TWILIO_WEBHOOK_URL', '')
+
+    def verify_webhook(self, url: str, params: dict, signature: str) -> bool:
+        """
+        Check the X-Twilio-Signature of an inbound webhook
+
+        Always passes in mock mode (no Twilio credentials configured).
+        """
+        if not self.use_twilio:
+            return True
+        if not signature:
+            return False
+        from twilio.request_validator import RequestValidator
+
+        return RequestValidator(self.auth_token).validate(self.webhook_url or url, params, signature)
     
     def send_sms(self, to: str, message: str) -> bool:
         """
-        Send SMS to a phone number
+        Send SMS to a phone number, synchronously in the caller's thread
+
+        For anything beyond a single message use the dispatch queue
+        (app.services.sms_dispatch), which batches, rate-limits and retries.
         """
         try:
-            if self.use_twilio:
-                # Use Twilio to send SMS
-                self.client.messages.create(
-                    body=message,
-                    from_=self.twilio_phone_number,
-                    to=to
-                )
-            else:
-                # Mock implementation for development
-                print(f"MOCK SMS sent to {to}: {message}")
-            
+            self.provider.send(to, message)
             return True
         except Exception as e:
             print(f"Failed to send SMS: {e}")
@@ -70,45 +157,11 @@ class SMSService:
     def _parse_feedback_message(self, message: str) -> dict:
         """
         Parse feedback message to extract structured data
-        This is a simple implementation - in practice, you might use NLP
+
+        English, French and Kinyarwanda keywords, with negation
+        ("not received", "ntabwo twabonye"); see app.services.sms_parser.
         """
-        # Simple keyword-based parsing
-        keywords = {
-            "shipment": "shipment_id",
-            "delayed": "status",
-            "missing": "status",
-            "received": "status",
-            "not received": "status",
-            "damaged": "issue_type",
-            "quantity": "quantity_issue"
-        }
-        
-        parsed_data = {
-            "keywords_found": [],
-            "shipment_id": None,
-            "status": None,
-            "issue_type": None,
-            "quantity_issue": None
-        }
-        
-        message_lower = message.lower()
-        
-        # Extract potential shipment ID (assuming it's a number)
-        import re
-        shipment_ids = re.findall(r'\b\d{4,}\b', message)
-        if shipment_ids:
-            parsed_data["shipment_id"] = shipment_ids[0]
-        
-        # Check for keywords
-        for keyword, field in keywords.items():
-            if keyword in message_lower:
-                parsed_data["keywords_found"].append(keyword)
-                if field == "status":
-                    parsed_data["status"] = keyword
-                elif field == "issue_type":
-                    parsed_data["issue_type"] = keyword
-        
-        return parsed_data
+        return sms_feedback_parser.parse(message)
 
 
 # Global instance
@@ -0,0 +1,145 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models.food_aid import Shipment
+from app.models.status_history import ShipmentStatusHistory, ShipmentStatusDwell
+
+
+DELIVERED_STATUS = "delivered"
+
+
+class StatusHistoryService:
+    def record_status_change(
+        self,
+        db: Session,
+        shipment: Shipment,
+        old_status: Optional[str],
+        new_status: str,
+        location: Optional[str] = None,
+        changed_by: Optional[str] = None,
+        notes: Optional[str] = None,
+        changed_at: Optional[datetime] = None
+    ) -> ShipmentStatusHistory:
+        """
+        Append a status change to the shipment's history
+
+        The entry and the dwell-time update are only added to the session, so they
+        are committed in the same transaction as the status change itself.
+
+        Args:
+            db: Session the caller will commit
+            shipment: The shipment whose status changed
+            old_status: Status before the change (None for a new shipment)
+            new_status: Status after the change
+            location: Where the change happened
+            changed_by: Person or system responsible for the change
+            notes: Free text notes
+            changed_at: When the change happened (defaults to now)
+        """
+        changed_at = changed_at or datetime.utcnow()
+
+        old_status_seconds = None
+        if old_status is not None:
+            # The previous entry tells us when the old status started; the
+            # (shipment_id, changed_at) index makes this a single index probe
+            entered_at = (
+                db.query(ShipmentStatusHistory.changed_at)
+                .filter(ShipmentStatusHistory.shipment_id == shipment.id)
+                .order_by(ShipmentStatusHistory.changed_at.desc(), ShipmentStatusHistory.id.desc())
+                .limit(1)
+                .scalar()
+            ) or shipment.timestamp
+
+            if entered_at is not None:
+                old_status_seconds = max(0.0, (changed_at - entered_at).total_seconds())
+                self._add_dwell(db, shipment.id, old_status, old_status_seconds, changed_at)
+
+        entry = ShipmentStatusHistory(
+            shipment_id=shipment.id,
+            old_status=old_status,
+            new_status=new_status,
+            location=location,
+            changed_by=changed_by,
+            notes=notes,
+            changed_at=changed_at,
+            old_status_seconds=old_status_seconds
+        )
+        db.add(entry)
+        return entry
+
+    def _add_dwell(self, db: Session, shipment_id: int, status: str, seconds: float, changed_at: datetime):
+        """
+        Fold a completed stay in a status into the per-shipment dwell totals
+        """
+        dwell = db.query(ShipmentStatusDwell).filter(
+            ShipmentStatusDwell.shipment_id == shipment_id,
+            ShipmentStatusDwell.status == status
+        ).first()
+        if dwell is None:
+            dwell = ShipmentStatusDwell(shipment_id=shipment_id, status=status, total_seconds=0, visits=0)
+            db.add(dwell)
+        dwell.total_seconds = (dwell.total_seconds or 0) + seconds
+        dwell.visits = (dwell.visits or 0) + 1
+        dwell.updated_at = changed_at
+
+    def get_timeline(
+        self,
+        db: Session,
+        shipment_id: int,
+        since: Optional[datetime] = None,
+        limit: int = 100
+    ) -> List[ShipmentStatusHistory]:
+        """
+        Return the status history of a shipment, oldest first
+        """
+        query = db.query(ShipmentStatusHistory).filter(ShipmentStatusHistory.shipment_id == shipment_id)
+        if since:
+            query = query.filter(ShipmentStatusHistory.changed_at > since)
+        return query.order_by(ShipmentStatusHistory.changed_at, ShipmentStatusHistory.id).limit(limit).all()
+
+    def get_dwell_times(self, db: Session, shipment_id: int) -> List[ShipmentStatusDwell]:
+        """
+        Return the accumulated time a shipment spent in each status
+        """
+        return db.query(ShipmentStatusDwell).filter(
+            ShipmentStatusDwell.shipment_id == shipment_id
+        ).order_by(ShipmentStatusDwell.status).all()
+
+    def average_transit_hours(self, db: Session) -> float:
+        """
+        Average time from the first recorded status to delivery, in hours
+
+        Uses the precomputed dwell totals of delivered shipments, so this is a
+        single aggregate query instead of a loop over shipments.
+        """
+        delivered = db.query(ShipmentStatusHistory.shipment_id).filter(
+            func.lower(ShipmentStatusHistory.new_status) == DELIVERED_STATUS
+        )
+        per_shipment = db.query(
+            func.sum(ShipmentStatusDwell.total_seconds).label("transit_seconds")
+        ).filter(
+            ShipmentStatusDwell.shipment_id.in_(delivered),
+            func.lower(ShipmentStatusDwell.status) != DELIVERED_STATUS
+        ).group_by(ShipmentStatusDwell.shipment_id).subquery()
+
+        avg_seconds = db.query(func.avg(per_shipment.c.transit_seconds)).scalar()
+        return float(avg_seconds) / 3600 if avg_seconds else 0.0
+
+    def average_dwell_hours_by_status(self, db: Session) -> Dict[str, float]:
+        """
+        Average time spent per stay in each status across all shipments, in hours
+        """
+        rows = db.query(
+            ShipmentStatusDwell.status,
+            func.sum(ShipmentStatusDwell.total_seconds),
+            func.sum(ShipmentStatusDwell.visits)
+        ).group_by(ShipmentStatusDwell.status).all()
+        return {
+            status: (float(total) / visits / 3600 if visits else 0.0)
+            for status, total, visits in rows
+        }
+
+
+# Global instance
+status_history_service = StatusHistoryService()
@@ -0,0 +1,206 @@
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.db_config import SessionLocal
+from app.models.food_aid import Shipment, ScanLog
+from app.models.status_history import ShipmentStatusHistory, ShipmentStatusDwell
+from app.services.status_history_service import status_history_service
+
+
+# Normalized shipment status -> tracking summary bucket
+STATUS_BUCKETS = {
+    "dispatched": "in_transit",
+    "in transit": "in_transit",
+    "in_transit": "in_transit",
+    "delivered": "delivered",
+    "completed": "delivered",
+    "delayed": "delayed",
+    "created": "at_warehouses",
+    "pending": "at_warehouses",
+    "at warehouse": "at_warehouses",
+    "at distribution center": "at_distribution_centers",
+    "arrived": "at_distribution_centers",
+}
+
+BUCKETS = ["in_transit", "delivered", "delayed", "at_warehouses", "at_distribution_centers"]
+
+
+def _normalize(status: Optional[str]) -> str:
+    return (status or "").strip().lower()
+
+
+class TrackingCounterStore:
+    """
+    In-memory shipment counters behind the tracking summary endpoint
+
+    Counters are seeded from one GROUP BY query, then kept current by the
+    create/update/delete/scan hooks in the routes. A background reconciliation
+    periodically recounts from the database to correct any drift (e.g. writes
+    made by another worker or directly in MySQL). Reads return a prebuilt dict
+    and never touch the database.
+    """
+
+    def __init__(self, reconcile_seconds: float = 300):
+        self.reconcile_seconds = reconcile_seconds
+        self._lock = threading.Lock()
+        self._status_counts: Counter = Counter()
+        self._total_scans = 0
+        self._derived = {"average_transit_time_hours": 0.0, "on_time_delivery_rate": 0.0}
+        self._last_updated = datetime.utcnow()
+        self._summary: Optional[Dict] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # --- Incremental updates ---
+    def on_shipment_created(self, status: Optional[str]):
+        with self._lock:
+            self._status_counts[_normalize(status)] += 1
+            self._touch()
+
+    def on_status_changed(self, old_status: Optional[str], new_status: Optional[str]):
+        old_key, new_key = _normalize(old_status), _normalize(new_status)
+        if old_key == new_key:
+            return
+        with self._lock:
+            self._status_counts[old_key] -= 1
+            self._status_counts[new_key] += 1
+            self._touch()
+
+    def on_shipment_deleted(self, status: Optional[str]):
+        with self._lock:
+            self._status_counts[_normalize(status)] -= 1
+            self._touch()
+
+    def on_scan(self):
+        with self._lock:
+            self._total_scans += 1
+            self._touch()
+
+    def _touch(self):
+        self._last_updated = datetime.utcnow()
+        self._summary = None
+
+    # --- Reads ---
+    def summary(self) -> Dict:
+        """
+        Return the tracking summary; rebuilt only after a counter changed
+        """
+        summary = self._summary
+        if summary is not None:
+            return summary
+
+        with self._lock:
+            buckets = dict.fromkeys(BUCKETS, 0)
+            for status, count in self._status_counts.items():
+                bucket = STATUS_BUCKETS.get(status)
+                if bucket:
+                    buckets[bucket] += count
+            summary = {
+                "total_shipments": sum(self._status_counts.values()),
+                **buckets,
+                "total_scans": self._total_scans,
+                "average_transit_time_hours": round(self._derived["average_transit_time_hours"], 2),
+                "on_time_delivery_rate": round(self._derived["on_time_delivery_rate"], 2),
+                "last_updated": self._last_updated,
+            }
+            self._summary = summary
+        return summary
+
+    # --- Seeding and reconciliation ---
+    def _load(self, db: Session):
+        status_counts = Counter({
+            _normalize(status): count
+            for status, count in db.query(Shipment.status, func.count(Shipment.id)).group_by(Shipment.status).all()
+        })
+        total_scans = db.query(func.count(ScanLog.id)).scalar() or 0
+        derived = {
+            "average_transit_time_hours": status_history_service.average_transit_hours(db),
+            "on_time_delivery_rate": self._on_time_delivery_rate(db),
+        }
+        return status_counts, total_scans, derived
+
+    def _on_time_delivery_rate(self, db: Session) -> float:
+        """
+        Share of delivered shipments that never spent time in a delayed status
+        """
+        delivered = db.query(ShipmentStatusHistory.shipment_id).filter(
+            func.lower(ShipmentStatusHistory.new_status) == "delivered"
+        ).distinct()
+        delivered_count = db.query(func.count()).select_from(delivered.subquery()).scalar() or 0
+        if not delivered_count:
+            return 0.0
+        late_count = db.query(func.count(func.distinct(ShipmentStatusDwell.shipment_id))).filter(
+            ShipmentStatusDwell.shipment_id.in_(delivered),
+            func.lower(ShipmentStatusDwell.status) == "delayed"
+        ).scalar() or 0
+        return (delivered_count - late_count) / delivered_count * 100
+
+    def seed(self, db: Session):
+        status_counts, total_scans, derived = self._load(db)
+        with self._lock:
+            self._status_counts = status_counts
+            self._total_scans = total_scans
+            self._derived = derived
+            self._touch()
+
+    def reconcile(self, db: Session) -> Dict[str, int]:
+        """
+        Recount from the database and return the drift that was corrected
+        """
+        status_counts, total_scans, derived = self._load(db)
+        with self._lock:
+            drift = {
+                status: status_counts.get(status, 0) - self._status_counts.get(status, 0)
+                for status in set(status_counts) | set(self._status_counts)
+                if status_counts.get(status, 0) != self._status_counts.get(status, 0)
+            }
+            if total_scans != self._total_scans:
+                drift["scans"] = total_scans - self._total_scans
+            self._status_counts = status_counts
+            self._total_scans = total_scans
+            self._derived = derived
+            self._touch()
+        if drift:
+            print(f"Tracking counters corrected drift: {drift}")
+        return drift
+
+    def start(self):
+        """
+        Seed the counters and start periodic reconciliation
+        """
+        if self._thread is not None:
+            return
+        db = SessionLocal()
+        try:
+            self.seed(db)
+        except Exception as e:
+            print(f"Error seeding tracking counters: {e}")
+        finally:
+            db.close()
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="tracking-counters", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.reconcile_seconds):
+            db = SessionLocal()
+            try:
+                self.reconcile(db)
+            except Exception as e:
+                print(f"Error reconciling tracking counters: {e}")
+            finally:
+                db.close()
+
+
+# Global instance
+tracking_counters = TrackingCounterStore()
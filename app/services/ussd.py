@@ -0,0 +1,310 @@
+import hmac
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.db_config import SessionLocal
+from app.models.audit_trail import AuditTrail
+from app.models.food_aid import DistributionCenter, Feedback, FoodAidItem, Shipment
+from app.services.sms_ingest import inbound_sms_worker
+
+
+# Declarative menu tree. A node is one of:
+#   options: numbered choices -> next node
+#   input:   free text stored in session data under `input`, checked by `validate`
+#   end:     final message; `feedback` (feedback_type) is recorded first, if set
+# Prompts are formatted with the session data (shipment_id, item, ...).
+MENU_TREE: Dict[str, Dict] = {
+    "main": {
+        "prompt": "Digital Aid\n1. Confirm receipt\n2. Report a problem\n3. Shipment status",
+        "options": {"1": "receipt.shipment", "2": "issue.shipment", "3": "status.shipment"},
+    },
+
+    "receipt.shipment": {"prompt": "Enter shipment number:", "input": "shipment_id", "validate": "shipment", "next": "receipt.confirm"},
+    "receipt.confirm": {
+        "prompt": "Shipment {shipment_id}: {item} to {destination}\n1. I received it\n2. I did not receive it",
+        "options": {"1": "receipt.received", "2": "receipt.not_received"},
+    },
+    "receipt.received": {"end": "Thank you. Receipt of shipment {shipment_id} is confirmed.", "feedback": "received"},
+    "receipt.not_received": {"end": "Thank you. We recorded that shipment {shipment_id} did not reach you.", "feedback": "not received"},
+
+    "issue.shipment": {"prompt": "Enter shipment number:", "input": "shipment_id", "validate": "shipment", "next": "issue.type"},
+    "issue.type": {
+        "prompt": "What is the problem?\n1. Damaged\n2. Spoiled\n3. Short quantity\n4. Missing\n5. Delayed",
+        "options": {"1": "issue.damaged", "2": "issue.spoiled", "3": "issue.short", "4": "issue.missing", "5": "issue.delayed"},
+    },
+    "issue.damaged": {"end": "Thank you. Your report on shipment {shipment_id} was recorded.", "feedback": "damaged"},
+    "issue.spoiled": {"end": "Thank you. Your report on shipment {shipment_id} was recorded.", "feedback": "spoiled"},
+    "issue.short": {"end": "Thank you. Your report on shipment {shipment_id} was recorded.", "feedback": "short quantity"},
+    "issue.missing": {"end": "Thank you. Your report on shipment {shipment_id} was recorded.", "feedback": "missing"},
+    "issue.delayed": {"end": "Thank you. Your report on shipment {shipment_id} was recorded.", "feedback": "delayed"},
+
+    "status.shipment": {"prompt": "Enter shipment number:", "input": "shipment_id", "validate": "shipment", "next": "status.show"},
+    "status.show": {"end": "Shipment {shipment_id} ({item}) to {destination}: {status}"},
+}
+
+# Shown instead of a node's end message when its feedback could not be stored
+FEEDBACK_FAILED = "Sorry, we could not record your answer. Please try again later."
+
+# Gateway callback authentication: a shared token (X-USSD-Token header, or a
+# token query parameter for gateways that only let you set a URL) and/or the
+# gateway's source addresses. With neither configured every callback is refused.
+USSD_CALLBACK_TOKEN = os.getenv("USSD_CALLBACK_TOKEN", "")
+USSD_ALLOWED_IPS = frozenset(ip.strip() for ip in os.getenv("USSD_ALLOWED_IPS", "").split(",") if ip.strip())
+
+# Longest shipment number accepted; anything longer cannot be an id and would overflow the bind
+MAX_SHIPMENT_DIGITS = 10
+
+
+class USSDSession:
+    __slots__ = ("session_id", "phone_number", "node", "data", "consumed", "last_text", "last_response", "expires_at", "lock")
+
+    def __init__(self, session_id: str, phone_number: str, expires_at: float):
+        self.session_id = session_id
+        self.phone_number = phone_number
+        self.node = "main"
+        self.data: Dict[str, str] = {}
+        self.consumed = 0  # Inputs of the cumulative "1*2*..." text already handled
+        self.last_text: Optional[str] = None
+        self.last_response: Optional[str] = None
+        self.expires_at = expires_at
+        # Concurrent hops of one session (gateway retries) are handled one at a time
+        self.lock = threading.Lock()
+
+
+class USSDSessionStore:
+    """
+    In-memory session store with TTL eviction
+
+    Sessions are kept in least-recently-used order, so expired ones are
+    always at the front and eviction only looks at the oldest entries.
+    """
+
+    def __init__(self, ttl_seconds: float = 180, max_sessions: int = 100_000):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, USSDSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def get_or_create(self, session_id: str, phone_number: str) -> USSDSession:
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = USSDSession(session_id, phone_number, now + self.ttl_seconds)
+                self._sessions[session_id] = session
+            else:
+                session.expires_at = now + self.ttl_seconds
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def _evict(self, now: float):
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if session.expires_at > now and len(self._sessions) < self.max_sessions:
+                break
+            self._sessions.popitem(last=False)
+
+
+class ShipmentLookupCache:
+    """
+    Short-lived cache of shipment summaries for USSD hops
+
+    Unknown shipment numbers are cached too, so mistyped numbers do not
+    turn into repeated queries.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal, ttl_seconds: float = 30, max_entries: int = 50_000):
+        self.session_factory = session_factory
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[int, Tuple[float, Optional[Dict]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, shipment_id: int) -> Optional[Dict]:
+        now = time.monotonic()
+        entry = self._entries.get(shipment_id)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        db = self.session_factory()
+        try:
+            row = db.query(
+                Shipment.id, Shipment.status, FoodAidItem.name, DistributionCenter.name
+            ).outerjoin(FoodAidItem, Shipment.aid_item_id == FoodAidItem.id).outerjoin(
+                DistributionCenter, Shipment.destination_id == DistributionCenter.id
+            ).filter(Shipment.id == shipment_id).first()
+        finally:
+            db.close()
+        summary = None
+        if row is not None:
+            summary = {
+                "shipment_id": str(row[0]),
+                "status": row[1] or "unknown",
+                "item": row[2] or "aid",
+                "destination": row[3] or "your area",
+            }
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries = {key: value for key, value in self._entries.items() if value[0] > now}
+            self._entries[shipment_id] = (now + self.ttl_seconds, summary)
+        return summary
+
+    def invalidate(self, shipment_id: int):
+        self._entries.pop(shipment_id, None)
+
+
+class USSDMenuEngine:
+    """
+    Runs USSD sessions through MENU_TREE
+
+    Gateways post the whole input chain on every hop ("1*2*12345"); the
+    session remembers how many inputs it has consumed, so each hop only
+    processes the new ones. A repeated hop (gateway retry) gets the same
+    response without being processed again. Responses use the common
+    "CON ..." (continue) / "END ..." (close) convention.
+    """
+
+    def __init__(
+        self,
+        menu: Optional[Dict[str, Dict]] = None,
+        store: Optional[USSDSessionStore] = None,
+        shipments: Optional[ShipmentLookupCache] = None,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        self.menu = menu or MENU_TREE
+        self.store = store or USSDSessionStore()
+        self.shipments = shipments or ShipmentLookupCache(session_factory)
+        self.session_factory = session_factory
+
+    def verify_callback(self, token: str, client_ip: str) -> bool:
+        """
+        Check a gateway callback against the configured token and allowlist
+        """
+        if not USSD_CALLBACK_TOKEN and not USSD_ALLOWED_IPS:
+            return False
+        if USSD_CALLBACK_TOKEN and not hmac.compare_digest(token.encode("utf-8"), USSD_CALLBACK_TOKEN.encode("utf-8")):
+            return False
+        if USSD_ALLOWED_IPS and client_ip not in USSD_ALLOWED_IPS:
+            return False
+        return True
+
+    def handle(self, session_id: str, phone_number: str, text: str) -> str:
+        session = self.store.get_or_create(session_id, phone_number)
+        text = text or ""
+        with session.lock:
+            if session.last_response is not None and text == session.last_text:
+                return session.last_response
+            # A finished session only repeats its final message; input after END is ignored
+            if "end" in self.menu[session.node]:
+                return session.last_response or self._render(session, session.node)
+
+            inputs: List[str] = text.split("*") if text else []
+            response = None
+            for value in inputs[session.consumed:]:
+                session.consumed += 1
+                response = self._advance(session, value.strip())
+                if response.startswith("END"):
+                    break
+            if response is None:
+                response = self._render(session, session.node)
+
+            session.last_text = text
+            session.last_response = response
+            return response
+
+    def _advance(self, session: USSDSession, value: str) -> str:
+        node = self.menu[session.node]
+        if "options" in node:
+            target = node["options"].get(value)
+            if target is None:
+                return self._render(session, session.node, error="Invalid choice.")
+            return self._enter(session, target)
+
+        error, value = self._validate(session, node.get("validate"), value)
+        if error:
+            return self._render(session, session.node, error=error)
+        session.data[node["input"]] = value
+        return self._enter(session, node["next"])
+
+    def _validate(self, session: USSDSession, rule: Optional[str], value: str) -> Tuple[Optional[str], str]:
+        """
+        (error, normalized value) for one input
+        """
+        if rule != "shipment":
+            return None, value
+        digits = value.lstrip("#")
+        # isdigit() alone accepts "²" and other Unicode digits that int() rejects
+        if not (digits.isascii() and digits.isdigit()) or len(digits) > MAX_SHIPMENT_DIGITS:
+            return "Please enter numbers only.", value
+        summary = self.shipments.get(int(digits))
+        if summary is None:
+            return f"Shipment {value} not found.", value
+        session.data.update(summary)
+        return None, summary["shipment_id"]
+
+    def _enter(self, session: USSDSession, target: str) -> str:
+        session.node = target
+        node = self.menu[target]
+        if "end" in node and node.get("feedback"):
+            if not self._record_feedback(session, node["feedback"]):
+                return "END " + FEEDBACK_FAILED
+        return self._render(session, target)
+
+    def _render(self, session: USSDSession, name: str, error: Optional[str] = None) -> str:
+        node = self.menu[name]
+        if "end" in node:
+            return "END " + node["end"].format(**session.data)
+        prompt = node["prompt"].format(**session.data)
+        return "CON " + (f"{error}\n{prompt}" if error else prompt)
+
+    def _record_feedback(self, session: USSDSession, feedback_type: str) -> bool:
+        """
+        Store the feedback in one short transaction; the system user id is the
+        one the SMS ingest worker loaded at startup. Returns False if it was
+        not stored, so the caller is not thanked for nothing.
+        """
+        db = self.session_factory()
+        try:
+            feedback = Feedback(
+                shipment_id=int(session.data["shipment_id"]),
+                feedback_type=feedback_type,
+                comment=f"USSD from {session.phone_number}: {feedback_type}",
+                anonymous=True,
+                submitted_at=datetime.utcnow(),
+            )
+            db.add(feedback)
+            db.flush()
+            if inbound_sms_worker.system_user_id is not None:
+                db.add(AuditTrail(
+                    user_id=inbound_sms_worker.system_user_id,
+                    action="create",
+                    table_name="feedbacks",
+                    record_id=feedback.id,
+                    new_values=json.dumps({
+                        "shipment_id": feedback.shipment_id,
+                        "feedback_type": feedback.feedback_type,
+                        "channel": "ussd",
+                        "session_id": session.session_id,
+                    })
+                ))
+            db.commit()
+            return True
+        except Exception as e:
+            print(f"Error recording USSD feedback: {e}")
+            db.rollback()
+            return False
+        finally:
+            db.close()
+
+
+# Global instance
+ussd_engine = USSDMenuEngine()
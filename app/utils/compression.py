@@ -0,0 +1,169 @@
+import zlib
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+
+# Already-compressed payloads gain nothing from another pass
+INCOMPRESSIBLE_TYPES = ("application/gzip", "application/zip", "image/", "video/", "audio/")
+
+CODINGS = ("br", "gzip")
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Best supported content coding for an Accept-Encoding header ("br" over "gzip")
+    """
+    accepted = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    candidates = (["br"] if brotli is not None else []) + ["gzip"]
+    wildcard = accepted.get("*", 0.0)
+    ranked = [(accepted.get(coding, wildcard), -index, coding) for index, coding in enumerate(candidates)]
+    quality, _, coding = max(ranked)
+    return coding if quality > 0 else None
+
+
+def encoded_etag(etag: str, coding: str) -> str:
+    """
+    ETag for a coding's representation: '"abc"' becomes '"abc-br"'
+
+    A strong ETag names exact bytes, so a compressed body cannot reuse the
+    one computed over the identity body.
+    """
+    if not etag.endswith('"'):
+        return etag
+    return etag[:-1] + "-" + coding + '"'
+
+
+def identity_etag(etag: str) -> str:
+    """
+    Undo encoded_etag, so a tag the client got with a compressed body still
+    revalidates against the identity ETag
+    """
+    for coding in CODINGS:
+        suffix = "-" + coding + '"'
+        if etag.endswith(suffix):
+            return etag[: -len(suffix)] + '"'
+    return etag
+
+
+class _Encoder:
+    def __init__(self, coding: str, gzip_level: int, brotli_quality: int):
+        if coding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+            self.compress, self.flush, self.finish = self._compressor.process, self._compressor.flush, self._compressor.finish
+        else:
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)  # 31: gzip container
+            self.compress = self._compressor.compress
+            self.flush = lambda: self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            self.finish = self._compressor.flush
+
+
+class CompressionMiddleware:
+    """
+    Negotiated brotli/gzip compression for responses
+
+    Complete bodies below minimum_size are sent as is. Streaming responses
+    (NDJSON exports) are compressed chunk by chunk and flushed after every
+    chunk, so rows reach the client as soon as they are encoded instead of
+    waiting for the compressor's window to fill.
+
+    Every compressible response carries Vary: Accept-Encoding, including the
+    ones sent as is, and when a coding is negotiated the coding is appended to
+    the ETag, so caches never hand one representation to a client that asked
+    for another.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        coding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        await _CompressedResponse(self, coding, send).run(scope, receive)
+
+
+class _CompressedResponse:
+    def __init__(self, middleware: CompressionMiddleware, coding: Optional[str], send: Send):
+        self.middleware = middleware
+        self.coding = coding
+        self.send = send
+        self.start: Optional[Message] = None
+        self.encoder: Optional[_Encoder] = None
+        self.passthrough = False
+
+    async def run(self, scope: Scope, receive: Receive):
+        await self.middleware.app(scope, receive, self.on_message)
+
+    def _headers(self) -> MutableHeaders:
+        return MutableHeaders(raw=self.start["headers"])
+
+    async def on_message(self, message: Message):
+        if message["type"] == "http.response.start":
+            self.start = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self.passthrough = "content-encoding" in headers or content_type.startswith(INCOMPRESSIBLE_TYPES)
+            if not self.passthrough:
+                headers = self._headers()
+                headers.add_vary_header("Accept-Encoding")
+                if self.coding is None:
+                    self.passthrough = True
+                elif "etag" in headers:
+                    # Tagged per coding even when the body turns out too small to
+                    # encode, so 200s and 304s for this client agree
+                    headers["ETag"] = encoded_etag(headers["etag"], self.coding)
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+        if self.passthrough:
+            if self.start is not None:
+                await self.send(self.start)
+                self.start = None
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.encoder is None:
+            if not more_body and len(body) < self.middleware.minimum_size:
+                await self.send(self.start)
+                await self.send(message)
+                return
+            self.encoder = _Encoder(self.coding, self.middleware.gzip_level, self.middleware.brotli_quality)
+            headers = self._headers()
+            headers["Content-Encoding"] = self.coding
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                compressed = self.encoder.compress(body) + self.encoder.finish()
+                headers["Content-Length"] = str(len(compressed))
+                await self.send(self.start)
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+            await self.send(self.start)
+
+        if more_body:
+            chunk = self.encoder.compress(body) + self.encoder.flush()
+        else:
+            chunk = self.encoder.compress(body) + self.encoder.finish()
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
@@ -0,0 +1,80 @@
+import decimal
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence
+import orjson
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from sqlalchemy.orm import Query, Session
+
+
+def _default(value: Any):
+    # Types orjson does not serialize natively (datetimes, dates and UUIDs it does)
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode("utf-8", "replace")
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(ORJSONResponse):
+    """
+    Default response class: orjson encoding, with Decimal support
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def encode_rows(names: Sequence[str], rows: Iterable[Sequence]) -> bytes:
+    """
+    Encode SQL row tuples as a JSON array of objects in one orjson call
+    """
+    return dumps([dict(zip(names, row)) for row in rows])
+
+
+def rows_response(names: Sequence[str], rows: Iterable[Sequence], headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    Pre-encoded JSON response for a list endpoint
+
+    Returning a Response skips FastAPI's response_model validation and
+    jsonable_encoder pass, so select plain columns (not entities) and keep
+    the names in step with the route's response_model.
+    """
+    return Response(content=encode_rows(names, rows), media_type="application/json", headers=headers)
+
+
+def encode_ndjson(names: Sequence[str], rows: Iterable[Sequence]) -> bytes:
+    return b"".join([dumps(dict(zip(names, row))) + b"\n" for row in rows])
+
+
+def ndjson_response(
+    session_factory: Callable[[], Session],
+    build_query: Callable[[Session], Query],
+    names: Sequence[str],
+    batch_size: int = 1000,
+    first_batch_size: int = 100
+) -> StreamingResponse:
+    """
+    Stream a column query as NDJSON through a server-side cursor
+
+    Rows are encoded and sent in batches as they arrive, so memory stays
+    flat; the first batch is small to get the first byte out quickly. The
+    stream outlives the request dependencies, so it opens its own session.
+    """
+    def stream():
+        db = session_factory()
+        try:
+            batch, limit = [], first_batch_size
+            for row in build_query(db).yield_per(batch_size):
+                batch.append(row)
+                if len(batch) >= limit:
+                    yield encode_ndjson(names, batch)
+                    batch, limit = [], batch_size
+            if batch:
+                yield encode_ndjson(names, batch)
+        finally:
+            db.close()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
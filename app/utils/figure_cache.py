@@ -0,0 +1,34 @@
+import json
+import threading
+import uuid
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class FigureCache:
+    """
+    Serialized Plotly figures keyed by name and data version
+
+    A figure is built and serialized once per data version; later callbacks
+    for the same version get the cached JSON-ready dict, so neither the
+    figure objects nor their validation are rebuilt. Version tokens include
+    a per-process id, so a token a browser kept from before a restart never
+    matches a new one.
+    """
+
+    def __init__(self):
+        self.run_id = uuid.uuid4().hex[:8]
+        self._entries: Dict[str, Tuple[Hashable, Dict]] = {}
+        self._lock = threading.Lock()
+
+    def token(self, version: Hashable) -> str:
+        return f"{self.run_id}:{version}"
+
+    def get(self, name: str, version: Hashable, build: Callable[[], Any]) -> Dict:
+        entry = self._entries.get(name)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        figure = build()
+        serialized = json.loads(figure.to_json()) if hasattr(figure, "to_json") else figure
+        with self._lock:
+            self._entries[name] = (version, serialized)
+        return serialized
@@ -0,0 +1,169 @@
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+
+
+# (min_lat, min_lon, max_lat, max_lon)
+Bounds = Tuple[float, float, float, float]
+
+MAX_ZOOM = 20
+
+
+def cell_degrees(zoom: int, cells_per_tile: int = 4) -> float:
+    """
+    Grid cell size in degrees at a map zoom level
+
+    A 256px map tile spans 360 / 2**zoom degrees; splitting it into
+    cells_per_tile cells gives clusters roughly 64px apart on screen.
+    """
+    return 360.0 / (2 ** zoom) / cells_per_tile
+
+
+def viewport_bounds(center_lat: float, center_lon: float, zoom: float, width_px: int = 800, height_px: int = 400) -> Bounds:
+    """
+    Approximate viewport bounds for a map center, zoom and size
+    """
+    degrees_per_px = 360.0 / (256 * 2 ** zoom)
+    half_lon = degrees_per_px * width_px / 2
+    half_lat = degrees_per_px * height_px / 2
+    return (max(center_lat - half_lat, -90.0), center_lon - half_lon, min(center_lat + half_lat, 90.0), center_lon + half_lon)
+
+
+class GeoGridIndex:
+    """
+    Zoom-dependent grid clustering of point positions
+
+    Points (id, lat, lon, status) are held in NumPy arrays. For a zoom level
+    every point is binned into a grid cell in one vectorized pass, giving
+    per-cell counts, centroids and per-status counts; the result is cached
+    per zoom until the points change. Viewport queries only filter the
+    cached cells, so panning costs no re-binning.
+    """
+
+    def __init__(self, cells_per_tile: int = 4):
+        self.cells_per_tile = cells_per_tile
+        self.statuses: List[str] = []
+        self._status_codes: Dict[str, int] = {}
+        self._ids = np.empty(0, dtype=np.int64)
+        self._lat = np.empty(0, dtype=np.float64)
+        self._lon = np.empty(0, dtype=np.float64)
+        self._status = np.empty(0, dtype=np.int64)
+        self._position: Dict[int, int] = {}
+        self._clusters: Dict[int, Dict[str, np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _code(self, status: Optional[str]) -> int:
+        status = status if isinstance(status, str) and status else "Unknown"
+        code = self._status_codes.get(status)
+        if code is None:
+            code = self._status_codes[status] = len(self.statuses)
+            self.statuses.append(status)
+        return code
+
+    # --- Points ---
+    def set_points(self, ids: Sequence[int], lats: Sequence[float], lons: Sequence[float], statuses: Iterable[Optional[str]]):
+        """
+        Replace all points; rows without a position are skipped
+        """
+        lat = np.asarray(lats, dtype=np.float64)
+        lon = np.asarray(lons, dtype=np.float64)
+        keep = ~(np.isnan(lat) | np.isnan(lon))
+        with self._lock:
+            self.statuses, self._status_codes = [], {}
+            codes = np.fromiter((self._code(status) for status in statuses), dtype=np.int64, count=len(lat))
+            self._ids = np.asarray(ids, dtype=np.int64)[keep]
+            self._lat, self._lon, self._status = lat[keep], lon[keep], codes[keep]
+            self._position = {int(point_id): index for index, point_id in enumerate(self._ids)}
+            self._clusters.clear()
+
+    def upsert(self, point_id: int, lat: Optional[float] = None, lon: Optional[float] = None, status: Optional[str] = None):
+        """
+        Move a point and/or change its status; unknown points need a position
+        """
+        with self._lock:
+            index = self._position.get(point_id)
+            if index is None:
+                if lat is None or lon is None:
+                    return
+                self._ids = np.append(self._ids, point_id)
+                self._lat = np.append(self._lat, lat)
+                self._lon = np.append(self._lon, lon)
+                self._status = np.append(self._status, self._code(status))
+                self._position[point_id] = len(self._ids) - 1
+            else:
+                if lat is not None and lon is not None:
+                    self._lat[index], self._lon[index] = lat, lon
+                if status is not None:
+                    self._status[index] = self._code(status)
+            self._clusters.clear()
+
+    def remove(self, point_id: int):
+        with self._lock:
+            index = self._position.pop(point_id, None)
+            if index is None:
+                return
+            keep = np.arange(len(self._ids)) != index
+            self._ids, self._lat, self._lon, self._status = (
+                self._ids[keep], self._lat[keep], self._lon[keep], self._status[keep]
+            )
+            self._position = {int(value): position for position, value in enumerate(self._ids)}
+            self._clusters.clear()
+
+    # --- Clusters ---
+    def _build(self, zoom: int) -> Dict[str, np.ndarray]:
+        cell = cell_degrees(zoom, self.cells_per_tile)
+        rows = int(np.ceil(180.0 / cell)) + 1
+        column = np.floor((self._lon + 180.0) / cell).astype(np.int64)
+        row = np.floor((self._lat + 90.0) / cell).astype(np.int64)
+        cells, inverse, counts = np.unique(column * rows + row, return_inverse=True, return_counts=True)
+        size = len(cells)
+        status_count = max(len(self.statuses), 1)
+        # Any member's id; only meaningful for single-point cells
+        representative = np.zeros(size, dtype=np.int64)
+        representative[inverse] = self._ids
+        return {
+            "lat": np.bincount(inverse, weights=self._lat, minlength=size) / np.maximum(counts, 1),
+            "lon": np.bincount(inverse, weights=self._lon, minlength=size) / np.maximum(counts, 1),
+            "count": counts,
+            "status_counts": np.bincount(
+                inverse * status_count + self._status, minlength=size * status_count
+            ).reshape(size, status_count),
+            "id": representative,
+        }
+
+    def clusters(self, zoom: float, bounds: Optional[Bounds] = None) -> List[Dict]:
+        """
+        Clusters at a zoom level, limited to the viewport bounds if given
+
+        Each cluster has its centroid, point count and per-status counts;
+        single-point clusters also carry the point's id.
+        """
+        zoom = int(min(max(zoom, 0), MAX_ZOOM))
+        with self._lock:
+            cached = self._clusters.get(zoom)
+            if cached is None:
+                cached = self._clusters[zoom] = self._build(zoom)
+            statuses = list(self.statuses)
+
+        mask = np.ones(len(cached["count"]), dtype=bool)
+        if bounds is not None:
+            min_lat, min_lon, max_lat, max_lon = bounds
+            mask = (cached["lat"] >= min_lat) & (cached["lat"] <= max_lat) & \
+                   (cached["lon"] >= min_lon) & (cached["lon"] <= max_lon)
+
+        result = []
+        for lat, lon, count, status_counts, point_id in zip(
+            cached["lat"][mask], cached["lon"][mask], cached["count"][mask],
+            cached["status_counts"][mask], cached["id"][mask]
+        ):
+            result.append({
+                "latitude": float(lat),
+                "longitude": float(lon),
+                "count": int(count),
+                "statuses": {statuses[code]: int(value) for code, value in enumerate(status_counts[:len(statuses)]) if value},
+                "id": int(point_id) if count == 1 else None,
+            })
+        return result
@@ -0,0 +1,203 @@
+import contextvars
+import os
+import re
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+try:
+    import pytest
+except ImportError:  # fixture only defined under pytest
+    pytest = None
+
+
+# Profiling mode for requests (QueryProfilerMiddleware) and jobs (profiled())
+PROFILE_QUERIES = os.getenv("QUERY_PROFILE") == "1"
+# Same statement shape this many times in one request/job is reported as N+1
+REPEAT_THRESHOLD = int(os.getenv("QUERY_PROFILE_REPEATS", "10"))
+# Statements slower than this are reported with their plan
+SLOW_QUERY_MS = float(os.getenv("QUERY_PROFILE_SLOW_MS", "100"))
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%s|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|:\w+))*\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """
+    Statement with literals and IN lists collapsed, so per-row queries group together
+    """
+    shape = _STRING.sub("?", statement)
+    shape = _NUMBER.sub("?", shape)
+    shape = _PLACEHOLDER_LIST.sub("(?)", shape)
+    return _SPACE.sub(" ", shape).strip()
+
+
+class SlowQuery:
+    __slots__ = ("statement", "parameters", "seconds", "plan")
+
+    def __init__(self, statement, parameters, seconds, plan):
+        self.statement = statement
+        self.parameters = parameters
+        self.seconds = seconds
+        self.plan = plan
+
+
+class QueryProfile:
+    """
+    Statements run by one request or job, grouped by shape
+    """
+
+    def __init__(self, label: str, slow_ms: float = SLOW_QUERY_MS, explain: bool = True):
+        self.label = label
+        self.slow_seconds = slow_ms / 1000
+        self.explain = explain
+        self.shapes: Dict[str, List[float]] = {}  # shape -> [count, total seconds]
+        self.slow: List[SlowQuery] = []
+
+    @property
+    def count(self) -> int:
+        return sum(int(count) for count, _ in self.shapes.values())
+
+    @property
+    def seconds(self) -> float:
+        return sum(total for _, total in self.shapes.values())
+
+    def record(self, conn, cursor, statement: str, parameters, seconds: float, executemany: bool):
+        entry = self.shapes.setdefault(statement_shape(statement), [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+        if seconds >= self.slow_seconds:
+            plan = None if executemany or not self.explain else explain(conn, statement, parameters)
+            self.slow.append(SlowQuery(statement, parameters, seconds, plan))
+
+    def repeated(self, threshold: int = REPEAT_THRESHOLD):
+        """
+        (shape, count, seconds) for shapes run at least threshold times, most frequent first
+        """
+        found = [(shape, int(count), total) for shape, (count, total) in self.shapes.items() if count >= threshold]
+        return sorted(found, key=lambda item: -item[1])
+
+    def report(self, threshold: int = REPEAT_THRESHOLD) -> str:
+        lines = [f"{self.label}: {self.count} queries, {self.seconds * 1000:.1f} ms in database"]
+        for shape, count, total in self.repeated(threshold):
+            lines.append(f"  repeated {count}x ({total * 1000:.1f} ms): {shape}")
+        for query in self.slow:
+            lines.append(f"  slow {query.seconds * 1000:.1f} ms: {_SPACE.sub(' ', query.statement).strip()}")
+            for row in query.plan or []:
+                lines.append(f"      {row}")
+        return "\n".join(lines)
+
+    def has_findings(self, threshold: int = REPEAT_THRESHOLD) -> bool:
+        return bool(self.slow or self.repeated(threshold))
+
+
+def explain(conn, statement: str, parameters) -> Optional[list]:
+    """
+    Plan of a SELECT, fetched on a raw cursor so the profiler does not see it
+    """
+    if not statement.lstrip().upper().startswith("SELECT"):
+        return None
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return [tuple(row) for row in cursor.fetchall()]
+    except Exception as e:
+        return [f"EXPLAIN failed: {e}"]
+    finally:
+        cursor.close()
+
+
+_current: contextvars.ContextVar[Optional[QueryProfile]] = contextvars.ContextVar("query_profile", default=None)
+_installed = False
+
+
+def install():
+    """
+    Listen on every engine; statements outside a profile only cost a context lookup
+    """
+    global _installed
+    if _installed:
+        return
+    _installed = True
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current.get() is not None:
+            conn.info.setdefault("profile_started", []).append(time.perf_counter())
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        profile = _current.get()
+        started = conn.info.get("profile_started")
+        if profile is None or not started:
+            return
+        profile.record(conn, cursor, statement, parameters, time.perf_counter() - started.pop(), executemany)
+
+
+@contextmanager
+def profiled(label: str, threshold: int = REPEAT_THRESHOLD, slow_ms: float = SLOW_QUERY_MS, report: bool = True):
+    """
+    Profile the queries of a job (or test); prints repeated shapes and slow statements
+
+        with profiled("train_model"):
+            fraud_detection_service.train_model(shipments, db)
+    """
+    install()
+    profile = QueryProfile(label, slow_ms)
+    token = _current.set(profile)
+    try:
+        yield profile
+    finally:
+        _current.reset(token)
+        if report and profile.has_findings(threshold):
+            print(f"Query profile {profile.report(threshold)}")
+
+
+class QueryProfilerMiddleware:
+    """
+    Per-request query profiling, enabled with QUERY_PROFILE=1
+
+    Requests that repeat a statement shape REPEAT_THRESHOLD times or run a
+    statement slower than SLOW_QUERY_MS are reported with the offending
+    shapes and EXPLAIN plans.
+    """
+
+    def __init__(self, app: ASGIApp, threshold: int = REPEAT_THRESHOLD, slow_ms: float = SLOW_QUERY_MS):
+        self.app = app
+        self.threshold = threshold
+        self.slow_ms = slow_ms
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with profiled(f"{scope['method']} {scope['path']}", self.threshold, self.slow_ms):
+            await self.app(scope, receive, send)
+
+
+if pytest is not None:
+    @pytest.fixture
+    def query_budget():
+        """
+        Fail a test when a block runs more queries than its budget
+
+            pytest_plugins = ["app.utils.query_profiler"]
+
+            def test_list_shipments(client, query_budget):
+                with query_budget(3):
+                    client.get("/shipments/")
+        """
+        @contextmanager
+        def budget(max_queries: int, threshold: int = REPEAT_THRESHOLD):
+            with profiled("query budget", threshold, report=False) as profile:
+                yield profile
+            if profile.count > max_queries:
+                pytest.fail(f"Query budget of {max_queries} exceeded\n{profile.report(threshold)}", pytrace=False)
+
+        return budget
@@ -0,0 +1,102 @@
+import hashlib
+import json
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+from app.utils.compression import identity_etag
+
+
+class CachedPayload:
+    __slots__ = ("version", "body", "etag", "loaded_at")
+
+    def __init__(self, version: int, body: bytes, etag: str, loaded_at: float):
+        self.version = version
+        self.body = body
+        self.etag = etag
+        self.loaded_at = loaded_at
+
+
+def table_loader(model) -> Callable[[Session], List[Dict]]:
+    """
+    Build a loader that reads every column of a table as plain dicts
+
+    Selecting columns instead of entities skips ORM instantiation entirely.
+    """
+    columns = list(model.__table__.columns)
+    names = [column.name for column in columns]
+
+    def load(db: Session) -> List[Dict]:
+        rows = db.query(*columns).order_by(columns[0]).all()
+        return [dict(zip(names, row)) for row in rows]
+
+    return load
+
+
+class ReferenceDataCache:
+    """
+    Read-through cache for small, rarely-changing reference tables
+
+    Each table has a version stamp that the create/update/delete routes bump.
+    The JSON body is encoded once per version and served as pre-encoded bytes
+    with a strong ETag (a hash of the body), so clients revalidating with
+    If-None-Match get a 304 without a database query. Entries are also
+    reloaded after max_age seconds to pick up changes made by other workers;
+    if the content did not change the ETag stays the same.
+    """
+
+    def __init__(self, max_age: float = 60):
+        self.max_age = max_age
+        self._versions: Dict[str, int] = {}
+        self._entries: Dict[str, CachedPayload] = {}
+        self._lock = threading.Lock()
+
+    def bump(self, table: str):
+        """
+        Invalidate a table after a write
+        """
+        with self._lock:
+            self._versions[table] = self._versions.get(table, 0) + 1
+            self._entries.pop(table, None)
+
+    def get(self, table: str, db: Session, loader: Callable[[Session], List[Dict]]) -> CachedPayload:
+        entry = self._entries.get(table)
+        version = self._versions.get(table, 0)
+        if entry is not None and entry.version == version and time.monotonic() - entry.loaded_at < self.max_age:
+            return entry
+
+        rows = loader(db)
+        body = json.dumps(rows, default=str, separators=(",", ":")).encode("utf-8")
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        entry = CachedPayload(version, body, etag, time.monotonic())
+        with self._lock:
+            # Only publish if no write happened while we were loading
+            if self._versions.get(table, 0) == version:
+                self._entries[table] = entry
+        return entry
+
+    def respond(self, request: Request, table: str, db: Session, loader: Callable[[Session], List[Dict]]) -> Response:
+        """
+        Serve a table from the cache, honoring If-None-Match
+        """
+        entry = self.get(table, db, loader)
+        headers = {"ETag": entry.etag, "Cache-Control": "private, no-cache"}
+        if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so ignore any W/ prefix; tags
+    # issued with a compressed body carry the coding (see encoded_etag)
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(identity_etag(tag[2:] if tag.startswith("W/") else tag) == etag for tag in candidates)
+
+
+# Global instance
+reference_cache = ReferenceDataCache()
@@ -0,0 +1,160 @@
+import re
+import threading
+from datetime import date, timedelta
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import text
+
+
+# One "{column} operator value" term of a DataTable filter_query
+_FILTER_TERM = re.compile(
+    r"\{(?P<column>[^}]+)\}\s+(?P<operator>\S+)\s+(?P<value>\"(?:[^\"\\]|\\.)*\"|'(?:[^'\\]|\\.)*'|\S+)"
+)
+
+_COMPARISONS = {
+    "=": "=", "eq": "=",
+    "!=": "<>", "ne": "<>",
+    "<": "<", "lt": "<",
+    "<=": "<=", "le": "<=",
+    ">": ">", "gt": ">",
+    ">=": ">=", "ge": ">=",
+}
+
+
+def date_prefix_range(prefix: str) -> Optional[Tuple[str, str]]:
+    """
+    [start, end) of a "YYYY", "YYYY-MM" or "YYYY-MM-DD" prefix, so a
+    datestartswith filter becomes an indexable range
+    """
+    parts = prefix.strip().split("-")
+    try:
+        numbers = [int(part) for part in parts[:3]]
+        if len(numbers) == 1:
+            start, end = date(numbers[0], 1, 1), date(numbers[0] + 1, 1, 1)
+        elif len(numbers) == 2:
+            start = date(numbers[0], numbers[1], 1)
+            end = date(numbers[0] + numbers[1] // 12, numbers[1] % 12 + 1, 1)
+        else:
+            start = date(*numbers)
+            end = start + timedelta(days=1)
+    except ValueError:
+        return None
+    return start.isoformat(), end.isoformat()
+
+
+class TableQuery:
+    """
+    Translates DataTable custom paging/sorting/filtering into SQL
+
+    `columns` maps each DataTable column id to its SQL expression and type
+    ("text", "number" or "datetime"); only those columns can be sorted or
+    filtered, and values are always bound parameters. Pages are fetched by
+    keyset: the sort key of the last row of every page served is kept, so
+    "next page" continues from it with an indexed range condition instead of
+    an OFFSET. Jumping to a page whose predecessor was never served falls
+    back to OFFSET.
+    """
+
+    def __init__(
+        self,
+        select: str,
+        columns: Dict[str, Tuple[str, str]],
+        key: str = "id",
+        default_sort: Optional[List[Dict]] = None,
+        max_cursors: int = 1000
+    ):
+        self.select = select
+        self.columns = columns
+        self.key = key
+        self.default_sort = default_sort or [{"column_id": key, "direction": "desc"}]
+        self.max_cursors = max_cursors
+        # (filter, sort, page_size, page) -> (sort value, key value) of the page's last row
+        self._cursors: "OrderedDict[Tuple, Tuple[Any, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def parse_filter(self, filter_query: Optional[str]) -> Tuple[List[str], Dict[str, Any]]:
+        clauses: List[str] = []
+        params: Dict[str, Any] = {}
+        for index, term in enumerate((filter_query or "").split(" && ")):
+            match = _FILTER_TERM.match(term.strip())
+            if not match or match.group("column") not in self.columns:
+                continue
+            expression, kind = self.columns[match.group("column")]
+            # Case variants (icontains, s=, ...) behave alike under the database collation
+            operator = match.group("operator").lower().lstrip("is")
+            value = match.group("value")
+            if value[:1] in "\"'":
+                value = value[1:-1].replace("\\" + value[0], value[0])
+            name = f"f{index}"
+
+            if operator == "contains":
+                clauses.append(f"{expression} LIKE :{name}")
+                params[name] = f"%{value}%"
+            elif operator == "datestartswith":
+                bounds = date_prefix_range(value)
+                if bounds is None:
+                    continue
+                clauses.append(f"{expression} >= :{name}_start AND {expression} < :{name}_end")
+                params[f"{name}_start"], params[f"{name}_end"] = bounds
+            elif operator in _COMPARISONS:
+                if kind == "number":
+                    try:
+                        value = float(value) if "." in value else int(value)
+                    except ValueError:
+                        continue
+                clauses.append(f"{expression} {_COMPARISONS[operator]} :{name}")
+                params[name] = value
+        return clauses, params
+
+    def _sort(self, sort_by: Optional[List[Dict]]) -> Tuple[str, str, bool]:
+        sort_by = [sort for sort in (sort_by or []) if sort.get("column_id") in self.columns] or self.default_sort
+        column_id = sort_by[0]["column_id"]
+        return column_id, self.columns[column_id][0], sort_by[0].get("direction") == "desc"
+
+    def page(self, conn, page_current: int, page_size: int, sort_by: Optional[List[Dict]] = None, filter_query: Optional[str] = None) -> Tuple[List[Dict], bool]:
+        """
+        Rows of one page and whether another page follows
+        """
+        page_current = max(page_current or 0, 0)
+        clauses, params = self.parse_filter(filter_query)
+        column_id, sort_expression, descending = self._sort(sort_by)
+        key_expression = self.columns[self.key][0]
+        comparison = "<" if descending else ">"
+        direction = "DESC" if descending else "ASC"
+
+        cursor_id = (filter_query or "", column_id, descending, page_size)
+        cursor = self._cursors.get(cursor_id + (page_current - 1,)) if page_current else None
+        offset = 0
+        if cursor is not None and (cursor[0] is not None or column_id == self.key):
+            sort_value, key_value = cursor
+            if column_id == self.key:
+                clauses.append(f"{key_expression} {comparison} :cursor_key")
+            else:
+                # NULLs sort first (MySQL and SQLite), so descending pages end with them
+                clauses.append(
+                    f"({sort_expression} {comparison} :cursor_sort OR "
+                    f"({sort_expression} = :cursor_sort AND {key_expression} {comparison} :cursor_key)"
+                    + (f" OR {sort_expression} IS NULL)" if descending else ")")
+                )
+                params["cursor_sort"] = sort_value
+            params["cursor_key"] = key_value
+        else:
+            offset = page_current * page_size
+
+        order = f"{key_expression} {direction}" if column_id == self.key else f"{sort_expression} {direction}, {key_expression} {direction}"
+        statement = self.select
+        if clauses:
+            statement += " WHERE " + " AND ".join(clauses)
+        statement += f" ORDER BY {order} LIMIT {int(page_size) + 1}"
+        if offset:
+            statement += f" OFFSET {int(offset)}"
+
+        rows = [dict(row._mapping) for row in conn.execute(text(statement), params)]
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if rows:
+            with self._lock:
+                self._cursors[cursor_id + (page_current,)] = (rows[-1][column_id], rows[-1][self.key])
+                while len(self._cursors) > self.max_cursors:
+                    self._cursors.popitem(last=False)
+        return rows, has_more
@@ -0,0 +1,87 @@
+import threading
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+
+class TimerWheel:
+    """
+    Hashed timing wheel for keyed, time-based checks
+
+    Timers are bucketed by tick into a fixed ring of slots, so scheduling and
+    cancelling are O(1) and each advance only visits the slots that elapsed.
+    Scheduling a key that already has a timer replaces it, which is what
+    "no scan in N hours" style checks need: every new scan pushes the deadline.
+    """
+
+    def __init__(self, tick_seconds: float = 60, wheel_size: int = 1024, start: float = 0):
+        self.tick_seconds = tick_seconds
+        self.wheel_size = wheel_size
+        self.current_tick = int(start // tick_seconds)
+        self._slots: List[Dict[Hashable, Tuple[int, Any]]] = [dict() for _ in range(wheel_size)]
+        self._slot_of: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._slot_of)
+
+    def schedule(self, key: Hashable, deadline: float, payload: Any = None):
+        """
+        Schedule (or reschedule) a timer to fire at the given deadline
+
+        Args:
+            key: Identifies the timer; an existing timer with this key is replaced
+            deadline: Time in seconds on the same clock passed to advance()
+            payload: Returned with the key when the timer fires
+        """
+        with self._lock:
+            self._cancel(key)
+            deadline_tick = max(int(deadline // self.tick_seconds), self.current_tick + 1)
+            slot = deadline_tick % self.wheel_size
+            self._slots[slot][key] = (deadline_tick, payload)
+            self._slot_of[key] = slot
+
+    def cancel(self, key: Hashable) -> bool:
+        """
+        Cancel a timer, returning whether one was pending
+        """
+        with self._lock:
+            return self._cancel(key)
+
+    def _cancel(self, key: Hashable) -> bool:
+        slot = self._slot_of.pop(key, None)
+        if slot is None:
+            return False
+        self._slots[slot].pop(key, None)
+        return True
+
+    def advance(self, now: float) -> List[Tuple[Hashable, Any]]:
+        """
+        Move the wheel forward to `now` and return the timers that fired
+        """
+        target_tick = int(now // self.tick_seconds)
+        due: List[Tuple[Hashable, Any]] = []
+        with self._lock:
+            if target_tick <= self.current_tick:
+                return due
+
+            # After a long pause every slot has elapsed at least once
+            steps = min(target_tick - self.current_tick, self.wheel_size)
+            for step in range(1, steps + 1):
+                slot = self._slots[(self.current_tick + step) % self.wheel_size]
+                for key, (deadline_tick, payload) in list(slot.items()):
+                    # Timers more than one revolution ahead stay in the slot
+                    if deadline_tick <= target_tick:
+                        del slot[key]
+                        del self._slot_of[key]
+                        due.append((key, payload))
+            self.current_tick = target_tick
+        return due
+
+    def pending(self, key: Hashable) -> Optional[float]:
+        """
+        Return the deadline of a pending timer in seconds, or None
+        """
+        with self._lock:
+            slot = self._slot_of.get(key)
+            if slot is None:
+                return None
+            return self._slots[slot][key][0] * self.tick_seconds
@@ -0,0 +1,148 @@
+"""
+Golden-set check and throughput benchmark for the SMS feedback parser
+
+First checks the parser against benchmarks/data/sms_parser_golden.jsonl
+(exits with status 1 on any mismatch), then parses a synthetic corpus built
+from the golden messages with random shipment ids and padding words, and
+compares throughput with the previous English-only keyword loop and with
+that loop naively extended to the multilingual tables.
+
+    python -m benchmarks.bench_sms_parser --messages 1000000
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from app.services.sms_parser import KEYWORD_TABLES, NEGATORS, SMSFeedbackParser, normalize_text
+
+
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), "data", "sms_parser_golden.jsonl")
+FIELDS = ["status", "issue_type", "quantity_issue", "shipment_id", "language"]
+FILLER = ["please", "help", "urgent", "murakoze", "merci", "today", "ejo", "hier", "village", "umudugudu"]
+
+
+def legacy_parse(message: str) -> dict:
+    """
+    The parser this replaces (SMSService._parse_feedback_message), kept as a baseline
+    """
+    keywords = {
+        "shipment": "shipment_id",
+        "delayed": "status",
+        "missing": "status",
+        "received": "status",
+        "not received": "status",
+        "damaged": "issue_type",
+        "quantity": "quantity_issue"
+    }
+    parsed_data = {"keywords_found": [], "shipment_id": None, "status": None, "issue_type": None, "quantity_issue": None}
+    message_lower = message.lower()
+    shipment_ids = re.findall(r'\b\d{4,}\b', message)
+    if shipment_ids:
+        parsed_data["shipment_id"] = shipment_ids[0]
+    for keyword, field in keywords.items():
+        if keyword in message_lower:
+            parsed_data["keywords_found"].append(keyword)
+            if field == "status":
+                parsed_data["status"] = keyword
+            elif field == "issue_type":
+                parsed_data["issue_type"] = keyword
+    return parsed_data
+
+
+def naive_multilingual_parser():
+    """
+    The old keyword loop extended to the same tables: one substring check per
+    phrase, plus a negation regex per phrase found
+    """
+    phrases = [
+        (normalize_text(phrase), field, value)
+        for table in KEYWORD_TABLES.values() for phrase, (field, value) in table.items()
+    ]
+    negators = "|".join(re.escape(normalize_text(word)) for words in NEGATORS.values() for word in words)
+    negation = {
+        phrase: re.compile(r"\b(?:" + negators + r")\s+(?:\w+\s+){0,2}" + re.escape(phrase) + r"\b")
+        for phrase, _, _ in phrases
+    }
+
+    def parse(message: str) -> dict:
+        text = normalize_text(message)
+        parsed_data = {"keywords_found": [], "shipment_id": None, "status": None, "issue_type": None, "quantity_issue": None}
+        shipment_ids = re.findall(r'\b\d{4,}\b', text)
+        if shipment_ids:
+            parsed_data["shipment_id"] = shipment_ids[0]
+        for phrase, field, value in phrases:
+            if phrase in text:
+                parsed_data["keywords_found"].append(phrase)
+                if negation[phrase].search(text):
+                    continue
+                if field in parsed_data and field != "shipment_id":
+                    parsed_data[field] = value
+        return parsed_data
+
+    return parse
+
+
+def check_golden(parser: SMSFeedbackParser) -> int:
+    failures = 0
+    total = 0
+    with open(GOLDEN_PATH, encoding="utf-8") as golden:
+        for line in golden:
+            case = json.loads(line)
+            total += 1
+            result = parser.parse(case["message"])
+            mismatches = {field: (result[field], case[field]) for field in FIELDS if result[field] != case[field]}
+            if mismatches:
+                failures += 1
+                print(f"FAIL {case['message']!r}: " + ", ".join(
+                    f"{field} got {got!r}, expected {expected!r}" for field, (got, expected) in mismatches.items()
+                ))
+    print(f"Golden set: {total - failures}/{total} passed")
+    return failures
+
+
+def build_corpus(size: int, seed: int = 7):
+    rng = random.Random(seed)
+    with open(GOLDEN_PATH, encoding="utf-8") as golden:
+        templates = [json.loads(line)["message"] for line in golden]
+    corpus = []
+    for _ in range(size):
+        words = rng.choice(templates).split()
+        words.insert(rng.randint(0, len(words)), str(rng.randint(1000, 99999)))
+        words.extend(rng.sample(FILLER, rng.randint(0, 4)))
+        corpus.append(" ".join(words))
+    return corpus
+
+
+def timed(label: str, parse, corpus) -> float:
+    started = time.perf_counter()
+    for message in corpus:
+        parse(message)
+    seconds = time.perf_counter() - started
+    print(f"{label:<10} {seconds:6.2f}s  {len(corpus) / seconds:>10,.0f} messages/s")
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    feedback_parser = SMSFeedbackParser()
+    if check_golden(feedback_parser):
+        sys.exit(1)
+
+    corpus = build_corpus(args.messages)
+    print(f"Corpus: {len(corpus):,} messages")
+    legacy = timed("legacy", legacy_parse, corpus)
+    naive = timed("naive", naive_multilingual_parser(), corpus)
+    compiled = timed("compiled", feedback_parser.parse, corpus)
+    print(f"Compiled vs naive multilingual loop: {naive / compiled:.2f}x faster")
+    print(f"Compiled vs legacy English-only loop: {legacy / compiled:.2f}x "
+          f"(legacy checks 7 English substrings and misreads negations)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Worker cold start: import time of app.main, startup hooks and first-request latency
+
+Each run is a fresh interpreter (as an autoscaled worker would be) against
+a throwaway SQLite database migrated beforehand with app.migrate. Reports
+the median of the runs, which heavy packages were loaded by the import, and
+with --importtime the slowest top-level imports (python -X importtime).
+
+    python -m benchmarks.bench_startup --runs 5 --importtime
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+HEAVY_PACKAGES = ["sklearn", "scipy", "pandas", "numpy", "twilio", "plotly", "dash"]
+
+CHILD = r"""
+import json, sys, time
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+heavy = [name for name in {heavy!r} if name in sys.modules]
+with TestClient(app) as client:
+    ready = time.perf_counter()
+    first_started = time.perf_counter()
+    status = client.get({path!r}).status_code
+    first = time.perf_counter() - first_started
+    second_started = time.perf_counter()
+    client.get({path!r})
+    second = time.perf_counter() - second_started
+print(json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (ready - imported) * 1000,
+    "first_request_ms": first * 1000,
+    "second_request_ms": second * 1000,
+    "status": status,
+    "heavy_at_import": heavy,
+}}))
+"""
+
+
+def top_imports(stderr: str, count: int):
+    # "import time: self [us] | cumulative | imported package"; top-level packages are not indented
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name.startswith(" ") and not name.startswith("  ") and cumulative.strip().isdigit():
+            entries.append((int(cumulative) / 1000, name.strip()))
+    return sorted(entries, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--path", default="/total-shipments/", help="Route for the first request (unauthenticated)")
+    parser.add_argument("--importtime", action="store_true", help="List the slowest top-level imports")
+    parser.add_argument("--output", help="Write the medians as JSON")
+    args = parser.parse_args()
+
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'startup_bench.db')}")
+    subprocess.run([sys.executable, "-m", "app.migrate"], env=env, check=True, stdout=subprocess.DEVNULL)
+
+    child = CHILD.format(heavy=HEAVY_PACKAGES, path=args.path)
+    runs = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", child], env=env, capture_output=True, text=True)
+        if result.returncode != 0:
+            sys.exit(f"Startup run failed:\n{result.stderr}")
+        run = json.loads(result.stdout.strip().splitlines()[-1])
+        run["process_ms"] = (time.perf_counter() - started) * 1000
+        runs.append(run)
+
+    medians = {
+        key: round(statistics.median(run[key] for run in runs), 1)
+        for key in ("process_ms", "import_ms", "startup_ms", "first_request_ms", "second_request_ms")
+    }
+    print(f"{args.runs} cold starts (median)")
+    for key, value in medians.items():
+        print(f"  {key:<20} {value:>9.1f}")
+    print(f"  first request status {runs[0]['status']}")
+    print(f"  heavy packages loaded by import: {', '.join(runs[0]['heavy_at_import']) or 'none'}")
+
+    if args.importtime:
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app.main"],
+                                env=env, capture_output=True, text=True)
+        print("\nSlowest top-level imports (cumulative ms):")
+        for ms, name in top_imports(result.stderr, 15):
+            print(f"  {ms:>9.1f}  {name}")
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump({**medians, "runs": runs}, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""
+In-process load test of the API with a realistic mix of distributors, officials and citizens
+
+Loads synthetic data (benchmarks.synthetic_data) into a throwaway SQLite
+database (or --database-url), creates accounts for each role and runs
+virtual users as asyncio tasks against the app in the same process: requests
+are ASGI calls, with no server or sockets in between. Every virtual user
+logs in through /auth/login, then replays its role's weighted mix with an
+optional think time:
+
+    distributor  scan posts, shipment listing and lookups
+    official     dashboard KPIs, shipment listing, feedback listing and summary
+    citizen      feedback submission, shipment lookups and listing
+
+Concurrency ramps up in steps. Each step reports throughput and
+p50/p95/p99 per route; the ramp stops at the saturation point, when more
+users stop adding throughput (or errors pass --max-error-rate).
+
+    python -m benchmarks.load_test --shipments 5000 --start-users 8 --step-users 8 --max-users 256
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+import numpy as np
+import orjson
+from benchmarks.run_suite import build_app, create_users, open_database
+from benchmarks.synthetic_data import SyntheticData
+
+
+PASSWORD = "load-test"
+
+# role -> share of virtual users, weighted actions
+ROLES = {
+    "distributor": (0.3, {"scan": 6, "list_shipments": 3, "get_shipment": 1}),
+    "official": (0.2, {"dashboard_kpis": 4, "list_shipments": 3, "list_feedback": 2, "feedback_summary": 1}),
+    "citizen": (0.5, {"submit_feedback": 5, "get_shipment": 3, "list_shipments": 2}),
+}
+
+# action -> route label (the path template, as in /metrics)
+ROUTES = {
+    "scan": "POST /shipments/{shipment_id}/scan",
+    "list_shipments": "GET /shipments/",
+    "get_shipment": "GET /shipments/{shipment_id}",
+    "dashboard_kpis": "GET /dashboard/kpis",
+    "list_feedback": "GET /feedbacks/",
+    "feedback_summary": "GET /feedbacks/summary",
+    "submit_feedback": "POST /feedbacks/",
+}
+
+
+async def asgi_request(
+    app, method: str, path: str, params: Optional[dict] = None, body: Optional[dict] = None, token: Optional[str] = None
+) -> Tuple[int, bytes]:
+    """
+    One HTTP request straight through the ASGI app
+    """
+    headers = [(b"host", b"loadtest"), (b"accept-encoding", b"gzip")]
+    payload = b""
+    if body is not None:
+        payload = orjson.dumps(body)
+        headers += [(b"content-type", b"application/json"), (b"content-length", str(len(payload)).encode())]
+    if token:
+        headers.append((b"authorization", f"Bearer {token}".encode()))
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "scheme": "http",
+        "method": method, "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": urlencode(params or {}).encode(), "headers": headers,
+        "client": ("127.0.0.1", 50000), "server": ("loadtest", 80),
+    }
+    done = asyncio.Event()
+    sent = False
+    status, chunks = 500, []
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                done.set()
+
+    await app(scope, receive, send)
+    done.set()
+    return status, b"".join(chunks)
+
+
+class Recorder:
+    def __init__(self):
+        self.samples: List[Tuple[float, str, float, int]] = []  # (finished at, route, ms, status)
+
+    def add(self, route: str, started: float, status: int):
+        finished = time.perf_counter()
+        self.samples.append((finished, route, (finished - started) * 1000, status))
+
+    def window(self, since: float, until: float) -> List[Tuple[float, str, float, int]]:
+        return [sample for sample in self.samples if since <= sample[0] < until]
+
+
+def summarize(samples, seconds: float) -> dict:
+    by_route: Dict[str, List[Tuple[float, int]]] = {}
+    for _, route, ms, status in samples:
+        by_route.setdefault(route, []).append((ms, status))
+    errors = sum(1 for *_, status in samples if status >= 400)
+    routes = {}
+    for route, entries in sorted(by_route.items()):
+        latencies = np.array([ms for ms, _ in entries])
+        routes[route] = {
+            "requests": len(entries),
+            "throughput": round(len(entries) / seconds, 2),
+            "errors": sum(1 for _, status in entries if status >= 400),
+            "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+            "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+            "p99_ms": round(float(np.percentile(latencies, 99)), 2),
+        }
+    latencies = np.array([ms for _, _, ms, _ in samples]) if samples else np.zeros(1)
+    return {
+        "requests": len(samples),
+        "throughput": round(len(samples) / seconds, 2),
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 2),
+        "routes": routes,
+    }
+
+
+class VirtualUser:
+    def __init__(self, app, role: str, username: str, actions: Dict[str, int], data: SyntheticData, rng: random.Random,
+                 recorder: Recorder, think_seconds: float):
+        self.app = app
+        self.role = role
+        self.username = username
+        self.actions = list(actions)
+        self.weights = list(actions.values())
+        self.data = data
+        self.rng = rng
+        self.recorder = recorder
+        self.think_seconds = think_seconds
+        self.token = None
+
+    async def login(self):
+        started = time.perf_counter()
+        status, body = await asgi_request(
+            self.app, "POST", "/auth/login", body={"username": self.username, "password": PASSWORD}
+        )
+        self.recorder.add("POST /auth/login", started, status)
+        if status != 200:
+            raise RuntimeError(f"Login failed for {self.username}: {status} {body[:200]!r}")
+        self.token = orjson.loads(body)["access_token"]
+
+    def request(self, action: str):
+        shipment_id = self.rng.randint(1, self.data.shipments)
+        if action == "scan":
+            district = self.rng.choice(self.data.districts)
+            return "POST", f"/shipments/{shipment_id}/scan", None, {
+                "location": district,
+                "checkpoint_lat": round(-1.95 + self.rng.uniform(-0.7, 0.7), 6),
+                "checkpoint_lon": round(29.9 + self.rng.uniform(-1.0, 0.8), 6),
+                "scanned_by": self.username,
+            }
+        if action == "list_shipments":
+            return "GET", "/shipments/", {"limit": 100, "after_id": self.rng.randint(0, max(self.data.shipments - 100, 0))}, None
+        if action == "get_shipment":
+            return "GET", f"/shipments/{shipment_id}", None, None
+        if action == "dashboard_kpis":
+            return "GET", "/dashboard/kpis", None, None
+        if action == "list_feedback":
+            return "GET", "/feedbacks/", {"limit": 50}, None
+        if action == "feedback_summary":
+            return "GET", "/feedbacks/summary", {"group_by": "district"}, None
+        return "POST", "/feedbacks/", None, {
+            "shipment_id": shipment_id,
+            "feedback_type": self.rng.choice(["received", "missing", "delayed"]),
+            "comment": self.rng.choice(["Received, thank you", "Nothing arrived yet", "Bags were damaged"]),
+            "anonymous": self.rng.random() < 0.6,
+        }
+
+    async def run(self, stop: asyncio.Event):
+        await self.login()
+        while not stop.is_set():
+            action = self.rng.choices(self.actions, self.weights)[0]
+            method, path, params, body = self.request(action)
+            started = time.perf_counter()
+            status, _ = await asgi_request(self.app, method, path, params, body, self.token)
+            self.recorder.add(ROUTES[action], started, status)
+            if self.think_seconds:
+                await asyncio.sleep(self.rng.expovariate(1 / self.think_seconds))
+
+
+async def ramp(app, data: SyntheticData, usernames: Dict[str, List[str]], actions: Dict[str, Dict[str, int]], args) -> dict:
+    recorder = Recorder()
+    stop = asyncio.Event()
+    rng = random.Random(args.seed)
+    tasks, steps = [], []
+    counts = {role: 0 for role in ROLES}
+    best, stalled = 0.0, 0
+
+    users = args.start_users
+    while users <= args.max_users:
+        # Add virtual users up to this step's concurrency, keeping the role shares
+        while len(tasks) < users:
+            role = min(ROLES, key=lambda name: counts[name] / ROLES[name][0])
+            username = usernames[role][counts[role] % len(usernames[role])]
+            counts[role] += 1
+            user = VirtualUser(app, role, username, actions[role], data, random.Random(rng.random()), recorder,
+                               args.think_ms / 1000)
+            tasks.append(asyncio.ensure_future(user.run(stop)))
+
+        await asyncio.sleep(args.warmup_seconds)
+        started = time.perf_counter()
+        await asyncio.sleep(args.step_seconds)
+        for task in tasks:
+            if task.done() and task.exception():
+                raise task.exception()
+        step = {"users": users, **summarize(recorder.window(started, time.perf_counter()), args.step_seconds)}
+        steps.append(step)
+        print(f"{users:>5} users  {step['throughput']:>9.1f} req/s  p50 {step['p50_ms']:>8.1f}  "
+              f"p95 {step['p95_ms']:>8.1f}  p99 {step['p99_ms']:>8.1f} ms  errors {step['error_rate']:.2%}")
+
+        if step["error_rate"] > args.max_error_rate:
+            print(f"Error rate above {args.max_error_rate:.0%}, stopping")
+            break
+        if step["throughput"] > best * (1 + args.min_gain):
+            best, stalled = step["throughput"], 0
+        else:
+            stalled += 1
+            if stalled >= args.patience:
+                break
+        users += args.step_users
+
+    stop.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return {"steps": steps, "saturation": saturation_point(steps, args.min_gain, args.max_error_rate)}
+
+
+def saturation_point(steps: List[dict], min_gain: float, max_error_rate: float) -> Optional[dict]:
+    """
+    Last step whose extra users still raised throughput by at least min_gain, error budget kept
+    """
+    knee = None
+    for step in steps:
+        if step["error_rate"] > max_error_rate:
+            break
+        if knee is None or step["throughput"] > knee["throughput"] * (1 + min_gain):
+            knee = step
+    if knee is None:
+        return None
+    return {key: knee[key] for key in ("users", "throughput", "p50_ms", "p95_ms", "p99_ms", "error_rate")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--shipments", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--database-url", help="Empty database to load (default: throwaway SQLite file)")
+    parser.add_argument("--accounts-per-role", type=int, default=50)
+    parser.add_argument("--start-users", type=int, default=8)
+    parser.add_argument("--step-users", type=int, default=8)
+    parser.add_argument("--max-users", type=int, default=256)
+    parser.add_argument("--step-seconds", type=float, default=15)
+    parser.add_argument("--warmup-seconds", type=float, default=3, help="Settling time after adding users (logins)")
+    parser.add_argument("--think-ms", type=float, default=0, help="Mean pause between a user's requests (0: closed loop)")
+    parser.add_argument("--min-gain", type=float, default=0.05, help="Throughput gain per step below which a step counts as stalled")
+    parser.add_argument("--patience", type=int, default=2, help="Stalled steps before stopping")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--output", help="Write the steps and saturation point as JSON")
+    args = parser.parse_args()
+
+    engine = open_database(args.database_url)
+    data = SyntheticData(args.shipments, args.seed, beneficiaries=args.shipments)
+    data.load(engine)
+    app = build_app(engine)
+
+    # Actions whose route is not mounted in this tree are left out of the mix
+    mounted = {f"{method} {route.path}" for route in app.routes for method in getattr(route, "methods", ())}
+    skipped = {action for action, route in ROUTES.items() if route not in mounted}
+    if skipped:
+        print(f"Not mounted, left out of the mix: {', '.join(sorted(ROUTES[action] for action in skipped))}")
+    actions = {
+        role: {action: weight for action, weight in mix.items() if action not in skipped}
+        for role, (_, mix) in ROLES.items()
+    }
+    usernames = {role: [f"load-{role}-{n}" for n in range(args.accounts_per_role)] for role in ROLES}
+    for role, names in usernames.items():
+        create_users(engine, role, names, PASSWORD)
+
+    print(f"{args.shipments:,} shipments on {engine.dialect.name}; ramping {args.start_users} -> {args.max_users} users "
+          f"by {args.step_users}, {args.step_seconds:.0f}s per step")
+    results = asyncio.run(ramp(app, data, usernames, actions, args))
+
+    knee = results["saturation"]
+    if knee:
+        print(f"\nSaturation: ~{knee['users']} concurrent users, {knee['throughput']:.1f} req/s "
+              f"(p95 {knee['p95_ms']:.1f} ms, p99 {knee['p99_ms']:.1f} ms)")
+        last = next(step for step in results["steps"] if step["users"] == knee["users"])
+        print(f"\n{'route':<40} {'req/s':>9} {'p50':>8} {'p95':>8} {'p99':>8} {'errors':>7}")
+        for route, entry in last["routes"].items():
+            print(f"{route:<40} {entry['throughput']:>9.1f} {entry['p50_ms']:>8.1f} {entry['p95_ms']:>8.1f} "
+                  f"{entry['p99_ms']:>8.1f} {entry['errors']:>7}")
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump({"args": vars(args), **results}, handle, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+"""
+End-to-end benchmark suite: import, API latency, fraud model and dashboard callbacks
+
+Loads a synthetic dataset (benchmarks.synthetic_data) into an empty
+database (a throwaway SQLite file by default, or --database-url for a MySQL
+stand-in), then measures:
+
+    import     bulk-load throughput per table
+    api        latency percentiles of the main routes, through the production
+               middleware stack, with an authenticated official user
+    fraud      model training time and per-shipment scoring latency
+    dashboard  cold and warm time of each plotydash callback
+
+Results are written as JSON; --compare reports changes against an earlier
+run and flags regressions beyond --tolerance.
+
+    python -m benchmarks.run_suite --shipments 10000 --output benchmarks/results/baseline.json
+    python -m benchmarks.run_suite --shipments 10000 --compare benchmarks/results/baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from sqlalchemy import create_engine
+from benchmarks.synthetic_data import SyntheticData
+
+
+def connect_args_for(database_url: str) -> dict:
+    # Concurrent writers wait for SQLite's lock instead of failing at once
+    return {"check_same_thread": False, "timeout": 30} if database_url.startswith("sqlite") else {}
+
+
+def open_database(database_url: Optional[str] = None):
+    """
+    Engine on an empty database (a throwaway SQLite file by default) with every table created
+    """
+    from app.db_config import Base
+    from app.migrate import load_models
+    load_models()
+
+    database_url = database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'aid_bench.db')}"
+    engine = create_engine(database_url, future=True, connect_args=connect_args_for(database_url))
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def percentiles(samples_ms: List[float]) -> Dict[str, float]:
+    values = np.asarray(samples_ms)
+    return {
+        "count": int(values.size),
+        "mean_ms": round(float(values.mean()), 3),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "max_ms": round(float(values.max()), 3),
+    }
+
+
+def timed(call: Callable) -> float:
+    started = time.perf_counter()
+    call()
+    return (time.perf_counter() - started) * 1000
+
+
+def guarded(name: str, run: Callable) -> dict:
+    """
+    Run one benchmark; a failure is recorded in the results instead of ending the suite
+    """
+    print(f"-- {name}")
+    try:
+        return run()
+    except Exception as e:
+        traceback.print_exc()
+        return {"error": f"{type(e).__name__}: {e}"}
+
+
+def bench_import(data: SyntheticData, engine) -> dict:
+    started = time.perf_counter()
+    tables = data.load(engine)
+    seconds = time.perf_counter() - started
+    rows = sum(entry["rows"] for entry in tables.values())
+    return {"tables": tables, "rows": rows, "seconds": round(seconds, 3), "rows_per_second": round(rows / seconds)}
+
+
+def build_app(engine):
+    """
+    The API's routers and middleware in process, every session bound to the benchmark database
+    """
+    from fastapi import FastAPI
+    from app.db_config import SessionLocal
+    from app.routes import auth_routes, shipment_routes, feedback_routes, beneficiary_routes, alert_routes, dashboard_routes
+    from app.utils.compression import CompressionMiddleware
+    from app.utils.fast_json import FastJSONResponse
+    from app.utils.metrics import MetricsMiddleware, instrument_engine
+
+    # Dependencies, streams and services all open sessions through SessionLocal
+    SessionLocal.configure(bind=engine)
+    app = FastAPI(default_response_class=FastJSONResponse)
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    app.add_middleware(MetricsMiddleware)
+    instrument_engine(engine)
+    app.include_router(auth_routes.router, prefix="/auth")
+    app.include_router(shipment_routes.router, prefix="/shipments")
+    app.include_router(feedback_routes.router, prefix="/feedbacks")
+    app.include_router(beneficiary_routes.router, prefix="/beneficiaries")
+    app.include_router(alert_routes.router, prefix="/alerts")
+    app.include_router(dashboard_routes.router, prefix="/dashboard")
+    return app
+
+
+def create_users(engine, role: str, usernames: List[str], password: str):
+    from sqlalchemy.orm import Session
+    from app.models.user import User, UserRole
+    from app.utils.security import hash_password
+
+    password_hash = hash_password(password)  # bcrypt is slow by design; one hash serves every account
+    with Session(engine) as db:
+        db.add_all([User(username=username, password_hash=password_hash, role=UserRole(role)) for username in usernames])
+        db.commit()
+
+
+def bench_api(engine, data: SyntheticData, requests_per_route: int, seed: int) -> dict:
+    from fastapi.testclient import TestClient
+    from app.utils.security import create_access_token
+
+    app = build_app(engine)
+    create_users(engine, "official", ["bench-official"], "bench")
+    client = TestClient(app)
+    client.headers["Authorization"] = f"Bearer {create_access_token('bench-official')}"
+
+    rng = random.Random(seed)
+    shipment = lambda: rng.randint(1, data.shipments)
+    district = lambda: rng.choice(data.districts)
+    routes = {
+        "GET /shipments/": lambda: f"/shipments/?limit=100&after_id={rng.randint(0, max(data.shipments - 100, 0))}",
+        "GET /shipments/{shipment_id}": lambda: f"/shipments/{shipment()}",
+        "GET /shipments/{shipment_id}/status-history": lambda: f"/shipments/{shipment()}/status-history",
+        "GET /shipments/{shipment_id}/fraud-analysis": lambda: f"/shipments/{shipment()}/fraud-analysis",
+        "GET /feedbacks/": lambda: "/feedbacks/?limit=50",
+        "GET /feedbacks/?shipment_id": lambda: f"/feedbacks/?shipment_id={shipment()}",
+        "GET /feedbacks/summary": lambda: "/feedbacks/summary?group_by=district",
+        "GET /beneficiaries/all": lambda: f"/beneficiaries/all?limit=100&district={district()}",
+        "GET /alerts/active": lambda: "/alerts/active",
+    }
+
+    results = {}
+    for name, url in routes.items():
+        for _ in range(min(5, requests_per_route)):
+            client.get(url())
+        samples, statuses = [], {}
+        for _ in range(requests_per_route):
+            started = time.perf_counter()
+            response = client.get(url())
+            samples.append((time.perf_counter() - started) * 1000)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+        results[name] = {**percentiles(samples), "statuses": statuses}
+        print(f"   {name:<46} p50 {results[name]['p50_ms']:8.2f} ms  p95 {results[name]['p95_ms']:8.2f} ms  {statuses}")
+    return results
+
+
+def bench_fraud(engine, sample: int, scored: int) -> dict:
+    from sqlalchemy.orm import sessionmaker
+    from app.models.food_aid import Shipment
+    from app.services.fraud_detection import FraudDetectionService
+
+    db = sessionmaker(bind=engine)()
+    try:
+        shipments = db.query(Shipment).order_by(Shipment.id).limit(sample).all()
+        service = FraudDetectionService()
+        train_ms = timed(lambda: service.train_model(shipments, db))
+        samples = [timed(lambda: service.predict_fraud(shipment, db)) for shipment in shipments[:scored]]
+        return {"shipments": len(shipments), "train_seconds": round(train_ms / 1000, 3), "score": percentiles(samples)}
+    finally:
+        db.close()
+
+
+def bench_dashboard(engine, repeat: int) -> dict:
+    # plotydash is a script (run as python app/plotydash.py) with imports relative to app/
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+    import plotydash
+    # plotydash passes raw SQL strings to pd.read_sql, which a future=True engine rejects,
+    # so it gets a legacy engine on the same database, as in production
+    url = engine.url.render_as_string(hide_password=False)
+    plotydash.engine = create_engine(url, connect_args=connect_args_for(url))
+
+    callbacks = {
+        "update_kpi_cards": (0,),
+        "update_map": (0, None),
+        "update_shipment_table": (0, 0, 25, [], ""),
+        "update_shipment_table(sorted, filtered)": (0, 3, 25, [{"column_id": "created_at", "direction": "desc"}], "{status} = Delivered"),
+        "update_trend_charts": (0, None),
+        "update_alerts_panel": (0,),
+        "update_feedback_chart": (0, None),
+        "update_audit_table": (0, 0, 25, [], ""),
+    }
+    results = {}
+    for name, args in callbacks.items():
+        callback = getattr(plotydash, name.split("(")[0])
+        callback = getattr(callback, "__wrapped__", callback)
+
+        def run():
+            cold = timed(lambda: callback(*args))
+            warm = [timed(lambda: callback(*args)) for _ in range(repeat)]
+            return {"cold_ms": round(cold, 3), "warm": percentiles(warm)}
+
+        results[name] = guarded(f"dashboard {name}", run)
+    return results
+
+
+def flatten(results: dict, prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, path))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> List[str]:
+    """
+    Print metric changes against a baseline run; returns the regressed metrics
+    """
+    now, before = flatten(current["benchmarks"]), flatten(baseline["benchmarks"])
+    regressions = []
+    print(f"\nCompared with {baseline['meta'].get('commit')} ({baseline['meta'].get('started_at')}):")
+    for key in sorted(now.keys() & before.keys()):
+        if key.endswith("_ms") or key.endswith("seconds"):
+            worse = now[key] > before[key] * (1 + tolerance)
+        elif key.endswith("per_second"):
+            worse = now[key] < before[key] * (1 - tolerance)
+        else:
+            continue
+        change = (now[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+        if worse:
+            regressions.append(key)
+        if worse or abs(change) > tolerance * 100:
+            print(f"  {'REGRESSION' if worse else 'improved':<10} {key:<70} {before[key]:>12} -> {now[key]:>12} ({change:+.1f}%)")
+    for key in sorted(before.keys() - now.keys()):
+        print(f"  {'missing':<10} {key}")
+    return regressions
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--shipments", type=int, default=10_000)
+    parser.add_argument("--beneficiaries", type=int, default=None, help="Default: twice the shipments")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--database-url", help="Empty database to load (default: throwaway SQLite file)")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per API route")
+    parser.add_argument("--fraud-sample", type=int, default=5_000, help="Shipments to train the fraud model on")
+    parser.add_argument("--fraud-scored", type=int, default=200, help="Shipments to score")
+    parser.add_argument("--dashboard-repeat", type=int, default=10)
+    parser.add_argument("--only", nargs="+", choices=["api", "fraud", "dashboard"], help="Benchmarks to run after the import")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/<time>.json)")
+    parser.add_argument("--compare", help="Earlier results file to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Relative change counted as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    engine = open_database(args.database_url)
+    data = SyntheticData(args.shipments, args.seed, args.beneficiaries)
+    only = set(args.only or ["api", "fraud", "dashboard"])
+
+
+    started_at = datetime.utcnow()
+    results = {
+        "meta": {
+            "started_at": started_at.isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": engine.dialect.name,
+            "shipments": data.shipments,
+            "beneficiaries": data.beneficiaries,
+            "seed": args.seed,
+            "requests_per_route": args.requests,
+        },
+        "benchmarks": {},
+    }
+    benchmarks = results["benchmarks"]
+    benchmarks["import"] = guarded("import", lambda: bench_import(data, engine))
+    if "api" in only:
+        benchmarks["api"] = guarded("api", lambda: bench_api(engine, data, args.requests, args.seed))
+    if "fraud" in only:
+        benchmarks["fraud"] = guarded("fraud", lambda: bench_fraud(engine, args.fraud_sample, args.fraud_scored))
+    if "dashboard" in only:
+        benchmarks["dashboard"] = guarded("dashboard", lambda: bench_dashboard(engine, args.dashboard_repeat))
+
+    output = args.output or os.path.join("benchmarks", "results", f"{started_at:%Y%m%dT%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as handle:
+        json.dump(results, handle, indent=2, default=str)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare) as handle:
+            regressions = compare(results, json.load(handle), args.tolerance)
+        print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Local USSD gateway simulator for load testing
+
+Plays thousands of concurrent USSD sessions the way a mobile operator's
+gateway does: every hop re-posts the whole input chain ("1*12345*2") with the
+same sessionId. Each session picks a random flow (confirm receipt, report a
+problem, check status, or a mistyped input). Reports per-hop latency
+percentiles against the operator's budget.
+
+In-process (no server or database; shipment lookups and feedback writes are
+simulated):
+    python -m benchmarks.ussd_simulator --sessions 5000 --concurrency 500
+
+Against a running server:
+    USSD_CALLBACK_TOKEN=... python -m benchmarks.ussd_simulator --url http://localhost:8000/ussd/callback --shipments 1,2,3
+"""
+import argparse
+import os
+import random
+import statistics
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+
+FLOWS = [
+    ["1", "{shipment}", "1"],          # confirm receipt
+    ["1", "{shipment}", "2"],          # not received
+    ["2", "{shipment}", "{issue}"],    # report a problem
+    ["3", "{shipment}"],               # check status
+    ["3", "abc", "{shipment}"],        # mistyped shipment number, then corrected
+    ["9", "1", "{shipment}", "1"],     # invalid menu choice first
+]
+
+
+def in_process_handler(lookup_latency: float, write_latency: float) -> Callable[[str, str, str], str]:
+    from app.services.ussd import ShipmentLookupCache, USSDMenuEngine
+
+    class SimulatedShipments(ShipmentLookupCache):
+        def get(self, shipment_id: int):
+            now = time.monotonic()
+            entry = self._entries.get(shipment_id)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+            time.sleep(lookup_latency)  # Simulated query on a cache miss
+            summary = {"shipment_id": str(shipment_id), "status": "in transit", "item": "Maize", "destination": "Huye DC"}
+            with self._lock:
+                self._entries[shipment_id] = (now + self.ttl_seconds, summary)
+            return summary
+
+    class SimulatedEngine(USSDMenuEngine):
+        def _record_feedback(self, session, feedback_type):
+            time.sleep(write_latency)  # Simulated insert + commit
+            return True
+
+    engine = SimulatedEngine(shipments=SimulatedShipments(session_factory=None))
+    return engine.handle
+
+
+def http_handler(url: str, token: str = "") -> Callable[[str, str, str], str]:
+    import requests
+    local = threading.local()
+
+    def handle(session_id: str, phone_number: str, text: str) -> str:
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+            local.session.headers["X-USSD-Token"] = token
+        response = local.session.post(url, data={
+            "sessionId": session_id, "serviceCode": "*123#", "phoneNumber": phone_number, "text": text
+        }, timeout=5)
+        return response.text
+
+    return handle
+
+
+def run_session(handle, shipments: List[int], rng: random.Random, latencies: List[float], think_time: float) -> bool:
+    session_id = uuid.uuid4().hex
+    phone_number = f"+25078{rng.randint(0, 9_999_999):07d}"
+    flow = [step.format(shipment=rng.choice(shipments), issue=rng.randint(1, 5)) for step in rng.choice(FLOWS)]
+    inputs: List[str] = []
+    response = ""
+    for step in [None] + flow:
+        if step is not None:
+            inputs.append(step)
+        started = time.perf_counter()
+        response = handle(session_id, phone_number, "*".join(inputs))
+        latencies.append(time.perf_counter() - started)
+        if response.startswith("END"):
+            break
+        if think_time:
+            time.sleep(rng.uniform(0, think_time))
+    return response.startswith("END")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--url", help="Gateway callback URL; in-process engine if omitted")
+    parser.add_argument("--shipments", default="", help="Comma-separated shipment ids (default: 1-2000)")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Max pause between hops (seconds)")
+    parser.add_argument("--lookup-latency", type=float, default=0.005, help="In-process: simulated DB lookup")
+    parser.add_argument("--write-latency", type=float, default=0.01, help="In-process: simulated feedback insert")
+    parser.add_argument("--budget-ms", type=float, default=500, help="Per-hop latency budget")
+    args = parser.parse_args()
+
+    shipments = [int(value) for value in args.shipments.split(",") if value] or list(range(1, 2001))
+    handle = http_handler(args.url, os.getenv("USSD_CALLBACK_TOKEN", "")) if args.url else in_process_handler(args.lookup_latency, args.write_latency)
+
+    latencies: List[float] = []
+    rng = random.Random(7)
+    seeds = [rng.random() for _ in range(args.sessions)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        completed = sum(pool.map(
+            lambda seed: run_session(handle, shipments, random.Random(seed), latencies, args.think_time), seeds
+        ))
+    seconds = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000
+
+    over_budget = sum(1 for latency in ordered if latency * 1000 > args.budget_ms)
+    print(f"{args.sessions:,} sessions ({completed:,} completed), {len(ordered):,} hops in {seconds:.1f}s "
+          f"({len(ordered) / seconds:,.0f} hops/s, concurrency {args.concurrency})")
+    print(f"Hop latency ms: mean {statistics.mean(ordered) * 1000:.1f}, p50 {percentile(0.5):.1f}, "
+          f"p95 {percentile(0.95):.1f}, p99 {percentile(0.99):.1f}, max {ordered[-1] * 1000:.1f}")
+    print(f"Over {args.budget_ms:.0f} ms budget: {over_budget:,} hops")
+
+
+if __name__ == "__main__":
+    main()
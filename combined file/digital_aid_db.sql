@@ -26,10 +26,17 @@ CREATE TABLE `alerts` (
   `id` int NOT NULL AUTO_INCREMENT,
   `shipment_id` int NOT NULL,
   `alert_type` varchar(50) DEFAULT NULL,
+  `severity` varchar(20) NOT NULL DEFAULT 'warning',
   `description` text,
+  `resolved` tinyint(1) NOT NULL DEFAULT '0',
   `created_at` datetime DEFAULT CURRENT_TIMESTAMP,
+  `updated_at` datetime DEFAULT NULL,
+  `resolved_at` datetime DEFAULT NULL,
   PRIMARY KEY (`id`),
   KEY `shipment_id` (`shipment_id`),
+  KEY `ix_alerts_id` (`id`),
+  KEY `ix_alerts_resolved_severity` (`resolved`,`severity`),
+  KEY `ix_alerts_shipment_type_resolved` (`shipment_id`,`alert_type`,`resolved`),
   CONSTRAINT `alerts_ibfk_1` FOREIGN KEY (`shipment_id`) REFERENCES `shipments` (`id`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
@@ -62,6 +69,8 @@ CREATE TABLE `audit_trails` (
   PRIMARY KEY (`id`),
   KEY `user_id` (`user_id`),
   KEY `ix_audit_trails_id` (`id`),
+  KEY `ix_audit_trails_timestamp_id` (`timestamp`,`id`),
+  KEY `ix_audit_trails_table_name_id` (`table_name`,`id`),
   CONSTRAINT `audit_trails_ibfk_1` FOREIGN KEY (`user_id`) REFERENCES `users` (`id`)
 ) ENGINE=InnoDB AUTO_INCREMENT=3 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
@@ -75,6 +84,84 @@ LOCK TABLES `audit_trails` WRITE;
 /*!40000 ALTER TABLE `audit_trails` ENABLE KEYS */;
 UNLOCK TABLES;
 
+--
+-- Table structure for table `beneficiaries`
+--
+
+DROP TABLE IF EXISTS `beneficiaries`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `beneficiaries` (
+  `beneficiary_id` bigint NOT NULL AUTO_INCREMENT,
+  `first_name` varchar(100) NOT NULL,
+  `last_name` varchar(100) NOT NULL,
+  `date_of_birth` date DEFAULT NULL,
+  `gender` varchar(10) DEFAULT NULL,
+  `phone_number` varchar(20) DEFAULT NULL,
+  `national_id` varchar(50) DEFAULT NULL,
+  `village` varchar(100) NOT NULL,
+  `cell` varchar(100) NOT NULL,
+  `sector` varchar(100) NOT NULL,
+  `district` varchar(100) NOT NULL,
+  `registration_date` timestamp NULL DEFAULT CURRENT_TIMESTAMP,
+  `qr_code` varchar(255) DEFAULT NULL,
+  `last_aid_received` timestamp NULL DEFAULT NULL,
+  `feedback_status` varchar(20) DEFAULT 'Pending',
+  `notes` text,
+  `dedupe_key` varchar(160) DEFAULT NULL,
+  PRIMARY KEY (`beneficiary_id`),
+  UNIQUE KEY `ix_beneficiaries_national_id` (`national_id`),
+  UNIQUE KEY `qr_code` (`qr_code`),
+  KEY `ix_beneficiaries_beneficiary_id` (`beneficiary_id`),
+  KEY `ix_beneficiaries_location` (`district`,`sector`,`cell`,`village`,`beneficiary_id`),
+  KEY `ix_beneficiaries_dedupe_key` (`dedupe_key`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Dumping data for table `beneficiaries`
+--
+
+LOCK TABLES `beneficiaries` WRITE;
+/*!40000 ALTER TABLE `beneficiaries` DISABLE KEYS */;
+/*!40000 ALTER TABLE `beneficiaries` ENABLE KEYS */;
+UNLOCK TABLES;
+
+--
+-- Table structure for table `beneficiary_duplicate_candidates`
+--
+
+DROP TABLE IF EXISTS `beneficiary_duplicate_candidates`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `beneficiary_duplicate_candidates` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `beneficiary_id_a` bigint NOT NULL,
+  `beneficiary_id_b` bigint NOT NULL,
+  `score` float NOT NULL,
+  `block_key` varchar(160) DEFAULT NULL,
+  `status` varchar(20) NOT NULL DEFAULT 'pending',
+  `detected_at` datetime DEFAULT NULL,
+  `reviewed_by` int DEFAULT NULL,
+  `reviewed_at` datetime DEFAULT NULL,
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `uq_duplicate_candidate_pair` (`beneficiary_id_a`,`beneficiary_id_b`),
+  KEY `ix_beneficiary_duplicate_candidates_id` (`id`),
+  KEY `ix_beneficiary_duplicate_candidates_beneficiary_id_a` (`beneficiary_id_a`),
+  KEY `ix_beneficiary_duplicate_candidates_beneficiary_id_b` (`beneficiary_id_b`),
+  KEY `ix_duplicate_candidates_status` (`status`,`id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Dumping data for table `beneficiary_duplicate_candidates`
+--
+
+LOCK TABLES `beneficiary_duplicate_candidates` WRITE;
+/*!40000 ALTER TABLE `beneficiary_duplicate_candidates` DISABLE KEYS */;
+/*!40000 ALTER TABLE `beneficiary_duplicate_candidates` ENABLE KEYS */;
+UNLOCK TABLES;
+
 --
 -- Table structure for table `checkpoints`
 --
@@ -126,6 +213,40 @@ LOCK TABLES `distribution_centers` WRITE;
 /*!40000 ALTER TABLE `distribution_centers` ENABLE KEYS */;
 UNLOCK TABLES;
 
+--
+-- Table structure for table `feedback_summary`
+--
+
+DROP TABLE IF EXISTS `feedback_summary`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `feedback_summary` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `day` date NOT NULL,
+  `district` varchar(100) NOT NULL,
+  `shipment_id` int NOT NULL,
+  `category` varchar(50) NOT NULL,
+  `count` int NOT NULL,
+  `negative_count` int NOT NULL,
+  `sentiment_sum` float NOT NULL,
+  `updated_at` datetime DEFAULT NULL,
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `uq_feedback_summary_bucket` (`day`,`district`,`shipment_id`,`category`),
+  KEY `ix_feedback_summary_id` (`id`),
+  KEY `ix_feedback_summary_district_day` (`district`,`day`),
+  KEY `ix_feedback_summary_shipment_day` (`shipment_id`,`day`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Dumping data for table `feedback_summary`
+--
+
+LOCK TABLES `feedback_summary` WRITE;
+/*!40000 ALTER TABLE `feedback_summary` DISABLE KEYS */;
+/*!40000 ALTER TABLE `feedback_summary` ENABLE KEYS */;
+UNLOCK TABLES;
+
 --
 -- Table structure for table `feedbacks`
 --
@@ -140,9 +261,16 @@ CREATE TABLE `feedbacks` (
   `comment` text,
   `anonymous` tinyint(1) DEFAULT NULL,
   `submitted_at` datetime DEFAULT NULL,
+  `category` varchar(50) DEFAULT NULL,
+  `sentiment` float DEFAULT NULL,
   PRIMARY KEY (`id`),
   KEY `shipment_id` (`shipment_id`),
   KEY `ix_feedbacks_id` (`id`),
+  KEY `ix_feedbacks_type_id` (`feedback_type`,`id`),
+  KEY `ix_feedbacks_shipment_id_id` (`shipment_id`,`id`),
+  KEY `ix_feedbacks_submitted_at` (`submitted_at`),
+  KEY `ix_feedbacks_category_id` (`category`,`id`),
+  FULLTEXT KEY `ft_feedbacks_comment` (`comment`),
   CONSTRAINT `feedbacks_ibfk_1` FOREIGN KEY (`shipment_id`) REFERENCES `shipments` (`id`)
 ) ENGINE=InnoDB AUTO_INCREMENT=3 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
@@ -153,7 +281,7 @@ CREATE TABLE `feedbacks` (
 
 LOCK TABLES `feedbacks` WRITE;
 /*!40000 ALTER TABLE `feedbacks` DISABLE KEYS */;
-INSERT INTO `feedbacks` VALUES (1,1254,'insufficient quantity','mmm',1,NULL),(2,5,'not received','mwambeshye',0,NULL);
+INSERT INTO `feedbacks` VALUES (1,1254,'insufficient quantity','mmm',1,NULL,NULL,NULL),(2,5,'not received','mwambeshye',0,NULL,NULL,NULL);
 /*!40000 ALTER TABLE `feedbacks` ENABLE KEYS */;
 UNLOCK TABLES;
 
@@ -243,6 +371,39 @@ INSERT INTO `geographic_health` VALUES (2,5,'Kigali','Nyarugenge',18.60,1),(3,6,
 /*!40000 ALTER TABLE `geographic_health` ENABLE KEYS */;
 UNLOCK TABLES;
 
+--
+-- Table structure for table `inbound_messages`
+--
+
+DROP TABLE IF EXISTS `inbound_messages`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `inbound_messages` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `provider_message_id` varchar(64) NOT NULL,
+  `from_number` varchar(32) DEFAULT NULL,
+  `body` text,
+  `received_at` datetime DEFAULT NULL,
+  `status` varchar(20) NOT NULL,
+  `feedback_id` int DEFAULT NULL,
+  `error` varchar(255) DEFAULT NULL,
+  `processed_at` datetime DEFAULT NULL,
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `provider_message_id` (`provider_message_id`),
+  KEY `ix_inbound_messages_id` (`id`),
+  KEY `ix_inbound_messages_status_id` (`status`,`id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Dumping data for table `inbound_messages`
+--
+
+LOCK TABLES `inbound_messages` WRITE;
+/*!40000 ALTER TABLE `inbound_messages` DISABLE KEYS */;
+/*!40000 ALTER TABLE `inbound_messages` ENABLE KEYS */;
+UNLOCK TABLES;
+
 --
 -- Table structure for table `issues`
 --
@@ -259,6 +420,7 @@ CREATE TABLE `issues` (
   `anonymous_report` tinyint(1) DEFAULT NULL,
   PRIMARY KEY (`issue_id`),
   KEY `shipment_id` (`shipment_id`),
+  KEY `ix_issues_shipment_issue_id` (`shipment_id`,`issue_id`),
   CONSTRAINT `issues_ibfk_1` FOREIGN KEY (`shipment_id`) REFERENCES `shipments` (`id`)
 ) ENGINE=InnoDB AUTO_INCREMENT=1501 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
@@ -304,6 +466,45 @@ LOCK TABLES `ml_features` WRITE;
 /*!40000 ALTER TABLE `ml_features` ENABLE KEYS */;
 UNLOCK TABLES;
 
+--
+-- Table structure for table `outbound_messages`
+--
+
+DROP TABLE IF EXISTS `outbound_messages`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `outbound_messages` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `message_key` varchar(128) NOT NULL,
+  `channel` varchar(10) NOT NULL,
+  `to_number` varchar(32) NOT NULL,
+  `body` text NOT NULL,
+  `status` varchar(20) NOT NULL,
+  `attempts` int NOT NULL,
+  `next_attempt_at` datetime NOT NULL,
+  `last_error` varchar(255) DEFAULT NULL,
+  `provider_message_id` varchar(64) DEFAULT NULL,
+  `delivery_status` varchar(20) DEFAULT NULL,
+  `created_at` datetime DEFAULT NULL,
+  `sent_at` datetime DEFAULT NULL,
+  `delivered_at` datetime DEFAULT NULL,
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `message_key` (`message_key`),
+  KEY `ix_outbound_messages_id` (`id`),
+  KEY `ix_outbound_messages_status_due` (`status`,`next_attempt_at`),
+  KEY `ix_outbound_messages_provider_message_id` (`provider_message_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Dumping data for table `outbound_messages`
+--
+
+LOCK TABLES `outbound_messages` WRITE;
+/*!40000 ALTER TABLE `outbound_messages` DISABLE KEYS */;
+/*!40000 ALTER TABLE `outbound_messages` ENABLE KEYS */;
+UNLOCK TABLES;
+
 --
 -- Table structure for table `roles`
 --
@@ -396,6 +597,70 @@ LOCK TABLES `shipment_items` WRITE;
 /*!40000 ALTER TABLE `shipment_items` ENABLE KEYS */;
 UNLOCK TABLES;
 
+--
+-- Table structure for table `shipment_status_dwell`
+--
+
+DROP TABLE IF EXISTS `shipment_status_dwell`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `shipment_status_dwell` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `shipment_id` int NOT NULL,
+  `status` varchar(50) NOT NULL,
+  `total_seconds` float NOT NULL DEFAULT '0',
+  `visits` int NOT NULL DEFAULT '0',
+  `updated_at` datetime DEFAULT NULL,
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `uq_status_dwell_shipment_status` (`shipment_id`,`status`),
+  KEY `ix_shipment_status_dwell_id` (`id`),
+  CONSTRAINT `shipment_status_dwell_ibfk_1` FOREIGN KEY (`shipment_id`) REFERENCES `shipments` (`id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Dumping data for table `shipment_status_dwell`
+--
+
+LOCK TABLES `shipment_status_dwell` WRITE;
+/*!40000 ALTER TABLE `shipment_status_dwell` DISABLE KEYS */;
+/*!40000 ALTER TABLE `shipment_status_dwell` ENABLE KEYS */;
+UNLOCK TABLES;
+
+--
+-- Table structure for table `shipment_status_history`
+--
+
+DROP TABLE IF EXISTS `shipment_status_history`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `shipment_status_history` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `shipment_id` int NOT NULL,
+  `old_status` varchar(50) DEFAULT NULL,
+  `new_status` varchar(50) NOT NULL,
+  `location` varchar(255) DEFAULT NULL,
+  `changed_by` varchar(100) DEFAULT NULL,
+  `notes` text,
+  `changed_at` datetime NOT NULL,
+  `old_status_seconds` float DEFAULT NULL,
+  PRIMARY KEY (`id`),
+  KEY `ix_status_history_shipment_changed` (`shipment_id`,`changed_at`),
+  KEY `ix_status_history_changed_at` (`changed_at`),
+  KEY `ix_shipment_status_history_id` (`id`),
+  CONSTRAINT `shipment_status_history_ibfk_1` FOREIGN KEY (`shipment_id`) REFERENCES `shipments` (`id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Dumping data for table `shipment_status_history`
+--
+
+LOCK TABLES `shipment_status_history` WRITE;
+/*!40000 ALTER TABLE `shipment_status_history` DISABLE KEYS */;
+/*!40000 ALTER TABLE `shipment_status_history` ENABLE KEYS */;
+UNLOCK TABLES;
+
 --
 -- Table structure for table `shipments`
 --
@@ -420,6 +685,8 @@ CREATE TABLE `shipments` (
   KEY `origin_id` (`origin_id`),
   KEY `destination_id` (`destination_id`),
   KEY `ix_shipments_id` (`id`),
+  KEY `ix_shipments_timestamp_id` (`timestamp`,`id`),
+  KEY `ix_shipments_status_id` (`status`,`id`),
   CONSTRAINT `shipments_ibfk_1` FOREIGN KEY (`aid_item_id`) REFERENCES `food_aid_items` (`id`),
   CONSTRAINT `shipments_ibfk_2` FOREIGN KEY (`origin_id`) REFERENCES `warehouses` (`id`),
   CONSTRAINT `shipments_ibfk_3` FOREIGN KEY (`destination_id`) REFERENCES `distribution_centers` (`id`)
@@ -7,14 +7,13 @@ function AlertsPanel() {
   useEffect(() => {
     const fetchAlerts = async () => {
       try {
-        const res = await api.get("/shipments/"); // fetch shipments with token
-        const delayed = res.data.filter((s) => s.status === "Delayed").length;
-        const lost = res.data.filter((s) => s.status === "Lost").length;
-        const alertList = [];
-
-        if (delayed) alertList.push({ type: "warning", message: `${delayed} shipments delayed.` });
-        if (lost) alertList.push({ type: "danger", message: `${lost} shipments lost.` });
-        if (!delayed && !lost) alertList.push({ type: "success", message: "All systems normal." });
+        const res = await api.get("/alerts/active"); // alerts raised by the backend alert engine
+        const alertList = res.data.map((a) => ({
+          type: a.severity === "danger" ? "danger" : "warning",
+          message: a.description,
+        }));
+
+        if (!alertList.length) alertList.push({ type: "success", message: "All systems normal." });
 
         setAlerts(alertList);
       } catch (err) {
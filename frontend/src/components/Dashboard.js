@@ -10,6 +10,7 @@ function Dashboard() {
   const [shipments, setShipments] = useState([]);
   const [feedbacks, setFeedbacks] = useState([]);
   const [fraudAlerts, setFraudAlerts] = useState([]);
+  const [summary, setSummary] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
 
@@ -20,6 +21,10 @@ function Dashboard() {
         // Fetch shipments
         const shipmentResponse = await api.get('/shipments/');
         setShipments(shipmentResponse.data);
+
+        // KPI counts come from the backend's live counters
+        const summaryResponse = await api.get('/shipments/tracking-summary');
+        setSummary(summaryResponse.data);
         
         // Fetch feedbacks
         const feedbackResponse = await api.get('/feedbacks/');
@@ -54,9 +59,9 @@ function Dashboard() {
   }, []);
 
   // Calculate KPIs
-  const totalShipments = shipments.length;
-  const deliveredShipments = shipments.filter(s => s.status === 'delivered').length;
-  const delayedShipments = shipments.filter(s => s.status === 'delayed').length;
+  const totalShipments = summary ? summary.total_shipments : shipments.length;
+  const deliveredShipments = summary ? summary.delivered : shipments.filter(s => s.status === 'delivered').length;
+  const delayedShipments = summary ? summary.delayed : shipments.filter(s => s.status === 'delayed').length;
   const issuesReported = feedbacks.filter(f => f.feedback_type !== 'received').length;
   
   const deliveryRate = totalShipments > 0 